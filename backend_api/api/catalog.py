@@ -0,0 +1,35 @@
+# Catalog snapshot endpoint
+from fastapi import APIRouter, Depends, Request
+from fastapi.responses import StreamingResponse
+from sqlalchemy.orm import Session
+
+from ..database import get_db # Import DB dependency
+from ..utils.http_cache import Validator
+from ..utils.snapshot import catalog_snapshot
+
+router = APIRouter(
+    prefix="/catalog",
+    tags=["Catalog"],
+)
+
+
+@router.get("/snapshot")
+def get_catalog_snapshot(request: Request, db: Session = Depends(get_db)):
+    """
+    The whole active catalog in one response: {"version", "generated_at",
+    "categories": [CategoryResponse], "products": [ProductResponse]}.
+    Product changes show up within CATALOG_SNAPSHOT_MIN_INTERVAL seconds.
+    Send the ETag back as If-None-Match to get a 304 when nothing changed.
+
+    A plain def on purpose: a (re)build holds the snapshot's threading.Lock
+    around its queries, which must happen in the threadpool, not on the
+    event loop where a second request waiting for the lock would block it.
+    """
+    snapshot = catalog_snapshot.current(db)
+    validator = Validator(request, snapshot.version, last_modified=snapshot.generated_at)
+    if validator.matches(request):
+        return validator.not_modified()
+
+    headers = validator.headers()
+    headers["Content-Length"] = str(snapshot.size)
+    return StreamingResponse(snapshot.chunks(), media_type="application/json", headers=headers)
@@ -1,35 +1,63 @@
 # Category endpoints
 
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Request, Response
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
-from typing import List
+from typing import List, Optional
 
 from ..schemas import CategoryCreate, CategoryResponse, UserResponse # Relative import
 from ..crud import categories as crud_categories # Import crud functions
-from ..database import get_db # Import DB dependency
+from ..database import get_async_db, get_read_db # Import DB dependencies
+from ..utils.http_cache import Validator
+from ..utils.pagination import NEXT_CURSOR_HEADER
 
 router = APIRouter(
     prefix="/categories",
     tags=["Categories"],
 )
 @router.post("/", response_model=CategoryResponse)
-async def create_category_endpoint(category: CategoryCreate, db: Session = Depends(get_db)):
+async def create_category_endpoint(category: CategoryCreate, db: AsyncSession = Depends(get_async_db)):
     """Create a new category"""
     try:
-        return crud_categories.create_category(db, category)
+        return await db.run_sync(
+            lambda session: CategoryResponse.model_validate(
+                crud_categories.create_category(session, category), from_attributes=True
+            )
+        )
     except Exception as e:
         raise HTTPException(status_code=400, detail=str(e))
 
 @router.get("/", response_model=List[CategoryResponse])
-async def read_categories(skip: int = 0, limit: int = 100, db: Session = Depends(get_db)):
-    """Get all active categories"""
-    categories = crud_categories.get_categories(db, skip=skip, limit=limit)
+async def read_categories(
+    request: Request,
+    response: Response,
+    skip: int = 0,
+    limit: int = 100,
+    cursor: Optional[str] = None,
+    db: AsyncSession = Depends(get_read_db)
+):
+    """Get all active categories (304 when the client's ETag / Last-Modified is current)"""
+    return await db.run_sync(_read_categories, request, response, skip, limit, cursor)
+
+def _read_categories(db: Session, request: Request, response: Response, skip: int, limit: int, cursor: Optional[str]):
+    version = crud_categories.get_categories_version(db)
+    validator = Validator(request, *version, last_modified=version[1])
+    if validator.matches(request):
+        return validator.not_modified()
+
+    try:
+        categories, next_cursor = crud_categories.get_categories_page(db, skip=skip, limit=limit, cursor=cursor)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    response.headers.update(validator.headers())
+    if next_cursor:
+        response.headers[NEXT_CURSOR_HEADER] = next_cursor
     return categories
 
 @router.get("/{category_id}", response_model=CategoryResponse)
-async def read_category(category_id: int, db: Session = Depends(get_db)):
+async def read_category(category_id: int, db: AsyncSession = Depends(get_read_db)):
     """Get category by ID"""
-    category = crud_categories.get_category_by_id(db, category_id)
+    category = await db.run_sync(crud_categories.get_category_by_id, category_id)
     if not category:
         raise HTTPException(status_code=404, detail="Category not found")
-    return category
\ No newline at end of file
+    return category
@@ -0,0 +1,32 @@
+# Internal endpoints (operations only; keep them off the public ingress)
+import os
+
+from fastapi import APIRouter
+
+from ..crud.products import product_cache
+from ..crud.users import user_cache
+from ..database import async_pool_metrics, pool_metrics, read_replicas, replica_pool_metrics
+
+router = APIRouter(
+    prefix="/internal",
+    tags=["Internal"],
+)
+
+
+@router.get("/stats")
+def get_stats():
+    """
+    Connection pool and cache counters of this worker process. Pools: size,
+    checked_in / checked_out / overflow right now, and checkout waits since
+    start (avg / max, slow >= 100 ms, timeouts) for sizing DB_POOL_SIZE and
+    DB_MAX_OVERFLOW per worker.
+    """
+    return {
+        "pid": os.getpid(),
+        "pools": {
+            metrics.name: metrics.stats()
+            for metrics in (pool_metrics, async_pool_metrics, *replica_pool_metrics)
+        },
+        "replicas": read_replicas.stats(),
+        "caches": {"product": product_cache.stats(), "user": user_cache.stats()},
+    }
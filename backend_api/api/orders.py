@@ -1,28 +1,35 @@
 # Product endpoints
 from datetime import datetime, timezone
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Request
 from grpc import Status
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 from typing import List, Optional
 
 from ..models import Order, OrderItem
 
-from ..schemas import OrderCreate,OrderResponse, OrderUpdate
+from ..schemas import CartItemOperation, OrderCreate,OrderResponse, OrderUpdate
 from ..crud import orders as crud_orders # Import crud functions
-from ..database import get_db # Import DB dependency
+from ..database import get_async_db # Import DB dependency
+from ..utils.http_cache import Validator
+from ..utils.pagination import NEXT_CURSOR_HEADER
+from ..utils.serialization import order_response, orders_response
 
 router = APIRouter(
     prefix="",
     tags=["Orders"],
 )
 
+# Each endpoint awaits its synchronous handler (_name) through
+# AsyncSession.run_sync; the handler builds the whole response, so the lazy
+# items / shipping address loads happen while the connection is usable.
+
 
 @router.post("/orders/", response_model=OrderResponse)
-async def create_order_endpoint(order: OrderCreate, db: Session = Depends(get_db)):
+async def create_order_endpoint(order: OrderCreate, db: AsyncSession = Depends(get_async_db)):
     """Create a new order with items"""
     try:
-        db_order = crud_orders.create_order(db, order)
-        return db_order
+        return await db.run_sync(lambda session: order_response(crud_orders.create_order(session, order)))
     except ValueError as e:
         # This will catch the ValueError from the CRUD function
         raise HTTPException(status_code=400, detail=str(e))
@@ -31,33 +38,54 @@ async def create_order_endpoint(order: OrderCreate, db: Session = Depends(get_db
         raise HTTPException(status_code=500, detail=str(e))
 
 @router.get("/orders/{order_id}", response_model=OrderResponse)
-async def get_order(order_id: int, db: Session = Depends(get_db)):
+async def get_order(order_id: int, db: AsyncSession = Depends(get_async_db)):
     """Get order by ID"""
+    return await db.run_sync(_get_order, order_id)
+
+def _get_order(db: Session, order_id: int):
     order = crud_orders.get_order_by_id(db, order_id)
     if not order:
         raise HTTPException(status_code=404, detail="Order not found")
-    return order
+    return order_response(order)
 
 @router.get("/users/{user_uid}/orders/", response_model=List[OrderResponse])
 async def get_user_orders(
     user_uid: str, 
     skip: int = 0, 
     limit: int = 100, 
-    db: Session = Depends(get_db)
+    cursor: Optional[str] = None,
+    status: Optional[int] = None,
+    db: AsyncSession = Depends(get_async_db)
 ):
-    """Get all orders for a specific user"""
-    orders = crud_orders.get_orders_by_user(db, user_uid, skip=skip, limit=limit)
-    
-    return orders
+    """Get all orders for a specific user (optionally by status), newest first"""
+    try:
+        orders, next_cursor = await db.run_sync(
+            crud_orders.get_orders_by_user_page, user_uid, skip=skip, limit=limit, cursor=cursor, status=status
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    # items and addresses are eager-loaded, so the page can be encoded here
+    headers = {NEXT_CURSOR_HEADER: next_cursor} if next_cursor else None
+    return orders_response(orders, headers=headers)
 
 @router.get("/users/{user_uid}/cart/", response_model=OrderResponse)
-async def get_user_cart_endpoint(user_uid: str, db: Session = Depends(get_db)):
-    """Get user's active cart"""
+async def get_user_cart_endpoint(user_uid: str, request: Request, db: AsyncSession = Depends(get_async_db)):
+    """Get user's active cart (304 when the client's ETag / Last-Modified is current)"""
+    return await db.run_sync(_get_user_cart, user_uid, request)
+
+def _get_user_cart(db: Session, user_uid: str, request: Request):
+    version = crud_orders.get_user_cart_version(db, user_uid)
+    if version is None:
+        raise HTTPException(status_code=404, detail="Cart not found")
+    validator = Validator(request, *version, last_modified=version[1])
+    if validator.matches(request):
+        return validator.not_modified()
+
     cart = crud_orders.get_user_cart(db, user_uid)
     if not cart:
         raise HTTPException(status_code=404, detail="Cart not found")
     
-    return cart
+    return order_response(cart, headers=validator.headers())
 
 
 # USING TO ADD ITEM TO CART
@@ -66,39 +94,65 @@ async def add_to_cart(
     user_uid: str,
     product_id: int,
     quantity: int = 1,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Add item to user's cart"""
     try:
-        cart = crud_orders.add_item_to_cart(db, user_uid, product_id, quantity)
-        return {"message": "Item added to cart", "cart_id": cart.id}
+        cart_id = await db.run_sync(
+            lambda session: crud_orders.add_item_to_cart(session, user_uid, product_id, quantity).id
+        )
+        return {"message": "Item added to cart", "cart_id": cart_id}
     except Exception as e:
         raise HTTPException(status_code=400, detail=str(e))
 
+@router.post("/users/{user_uid}/cart/items:batch", response_model=OrderResponse)
+async def batch_update_cart(
+    user_uid: str,
+    operations: List[CartItemOperation],
+    db: AsyncSession = Depends(get_async_db)
+):
+    """Apply several add/set/remove operations to the cart at once and return the cart"""
+    try:
+        return await db.run_sync(_batch_update_cart, user_uid, operations)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+def _batch_update_cart(db: Session, user_uid: str, operations: List[CartItemOperation]):
+    cart = crud_orders.apply_cart_operations(db, user_uid, operations)
+    if cart is None:  # no cart, and the batch adds nothing
+        raise HTTPException(status_code=404, detail="Cart not found")
+    return order_response(cart)
+
 @router.put("/orders/{order_id}", response_model=OrderResponse)
 async def update_order_endpoint(
     order_id: int,
     order_update: OrderUpdate,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Update an order"""
     try:
-        if order_update.status != 1 and order_update.status: #can only update the status 1 or no status for this api
-            raise HTTPException(status_code=404, detail=order_update.status)
-        db_order = crud_orders.update_order(db, order_id, order_update)
-        if not db_order:
-            raise HTTPException(status_code=404, detail="Order not found")
-        return db_order
+        return await db.run_sync(_update_order, order_id, order_update)
     except Exception as e:
         raise HTTPException(status_code=400, detail=str(e))
 
-@router.put("/orders/{order_id}/status/{status}")
+def _update_order(db: Session, order_id: int, order_update: OrderUpdate):
+    if order_update.status != 1 and order_update.status: #can only update the status 1 or no status for this api
+        raise HTTPException(status_code=404, detail=order_update.status)
+    db_order = crud_orders.update_order(db, order_id, order_update)
+    if not db_order:
+        raise HTTPException(status_code=404, detail="Order not found")
+    return order_response(db_order)
+
+@router.put("/orders/{order_id}/status/{status}", response_model=OrderResponse)
 async def update_order_status(
     order_id: int,
     status: int,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Update order status (0: deactivated, 1: cart, 2: processing, 3: completed)"""
+    return await db.run_sync(_update_order_status, order_id, status)
+
+def _update_order_status(db: Session, order_id: int, status: int):
     order = crud_orders.get_order_by_id(db, order_id)
     if not order:
         raise HTTPException(status_code=404, detail="Order not found")
@@ -120,12 +174,35 @@ async def update_order_status(
     # except Exception as e:
     #     raise HTTPException(status_code=400, detail=str(e))
     
+    if order.status == 1 and status in [2, 3]:
+        # Leaving the cart takes stock, so it always goes through checkout
+        order = _checkout_order_row(db, order_id)
+        if status == 2:
+            return order_response(order)
+
     updated_order = crud_orders.update_order(db, order_id, OrderUpdate(status=status))
-    return updated_order
+    return order_response(updated_order)
+
+@router.post("/orders/{order_id}/checkout", response_model=OrderResponse)
+async def checkout_order_endpoint(order_id: int, db: AsyncSession = Depends(get_async_db)):
+    """Check out a cart: re-price it, take the stock and move it to processing"""
+    return await db.run_sync(_checkout_order, order_id)
+
+def _checkout_order(db: Session, order_id: int):
+    return order_response(_checkout_order_row(db, order_id))
+
+def _checkout_order_row(db: Session, order_id: int):
+    try:
+        return crud_orders.checkout_order(db, order_id)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
 
 @router.delete("/orders/{order_id}")
-async def delete_order(order_id: int, db: Session = Depends(get_db)):
+async def delete_order(order_id: int, db: AsyncSession = Depends(get_async_db)):
     """Delete an order (soft delete by setting status to 0)"""
+    return await db.run_sync(_delete_order, order_id)
+
+def _delete_order(db: Session, order_id: int):
     order = crud_orders.get_order_by_id(db, order_id)
     if not order:
         raise HTTPException(status_code=404, detail="Order not found")
@@ -136,9 +213,12 @@ async def delete_order(order_id: int, db: Session = Depends(get_db)):
     
     return {"message": "Order deleted successfully"}
 
-@router.delete("/order-items/{item_id}")
-async def delete_order_item(item_id: int, db: Session = Depends(get_db)):
+@router.delete("/order-items/{item_id}", response_model=Optional[OrderResponse])
+async def delete_order_item(item_id: int, db: AsyncSession = Depends(get_async_db)):
     """Remove an item from an order and recalculate total"""
+    return await db.run_sync(_delete_order_item, item_id)
+
+def _delete_order_item(db: Session, item_id: int):
     item = db.query(OrderItem).filter(OrderItem.id == item_id).first()
     if not item:
         raise HTTPException(status_code=404, detail="Order item not found")
@@ -151,29 +231,31 @@ async def delete_order_item(item_id: int, db: Session = Depends(get_db)):
     order = crud_orders.get_order_by_id(db, order_id)
     if order:
         total_amount = crud_orders.calculate_order_total(db, order_id)
-        order.total_amount = str(total_amount)
+        order.total_amount = total_amount
         order.updated_at = datetime.utcnow()
         db.commit()
+        return order_response(order)
     
-    return order
+    return None
 
 # ----------------------------------------
 # Additional Utility Endpoints
 # ----------------------------------------
 
-@router.get("/orders/")
+@router.get("/orders/", response_model=List[OrderResponse])
 async def get_all_orders(
     skip: int = 0,
     limit: int = 100,
     status: Optional[int] = None,
-    db: Session = Depends(get_db)
+    cursor: Optional[str] = None,
+    db: AsyncSession = Depends(get_async_db)
 ):
-    """Get all orders (admin endpoint)"""
-    query = db.query(Order)
-    
-    if status is not None:
-        query = query.filter(Order.status == status)
-    
-    orders = query.offset(skip).limit(limit).all()
-    
-    return orders
\ No newline at end of file
+    """Get all orders (admin endpoint), newest first"""
+    try:
+        orders, next_cursor = await db.run_sync(
+            crud_orders.get_orders_page, status=status, skip=skip, limit=limit, cursor=cursor
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    headers = {NEXT_CURSOR_HEADER: next_cursor} if next_cursor else None
+    return orders_response(orders, headers=headers)
@@ -1,219 +1,173 @@
 # Product endpoints
 from datetime import datetime, timezone
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Body, Depends, HTTPException, Query, Request
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
-from typing import List, Optional
+from typing import Any, List, Optional
 
-from ..schemas import CategoryResponse, ProductCreate, ProductResponse, ProductUpdate, UserResponse # Relative import
+from ..schemas import ProductCreate, ProductImportResult, ProductResponse, ProductUpdate, UserResponse # Relative import
 from ..crud import products as crud_products # Import crud functions
-from ..database import get_db # Import DB dependency
+from ..database import get_async_db, get_read_db # Import DB dependencies
+from ..utils.http_cache import Validator
+from ..utils.pagination import NEXT_CURSOR_HEADER
+from ..utils.search import product_search
+from ..utils.serialization import product_response, products_response
 
 router = APIRouter(
     prefix="/products",
     tags=["Products"],
 )
 
+# Each endpoint awaits its synchronous handler (_name) through
+# AsyncSession.run_sync; the handler builds the whole response, so lazy
+# loads happen while the connection is usable.
+
+
+def _latest(*values):
+    present = [value for value in values if value is not None]
+    return max(present) if present else None
+
 
 @router.post("/", response_model=ProductResponse)
-async def create_product_endpoint(product: ProductCreate, db: Session = Depends(get_db)):
+async def create_product_endpoint(product: ProductCreate, db: AsyncSession = Depends(get_async_db)):
     """Create a new product"""
     try:
-        db_product = crud_products.create_product(db, product)
-        
-        # Get categories for response
-        categories_data = crud_products.get_product_categories(db, db_product.id)
-        categories = []
-        for cat_data in categories_data:
-            categories.append(CategoryResponse(
-                id=cat_data[0],
-                name=cat_data[1],
-                description=cat_data[2],
-                is_active=cat_data[3],
-                created_at=cat_data[4],
-                updated_at=cat_data[5]
-            ))
-        
-        # Convert string fields back to appropriate types for response
-        response_data = {
-            "id": db_product.id,
-            "name": db_product.name,
-            "description": db_product.description,
-            "image_url": db_product.image_url,
-            "price": float(db_product.price),
-            "sold_count": db_product.sold_count,
-            "rating": float(db_product.rating),
-            "review_count": db_product.review_count,
-            "delivery_info": db_product.delivery_info,
-            "seller_info": db_product.seller_info,
-            "stock_quantity": db_product.stock_quantity,
-            "is_active": db_product.is_active,
-            "categories": categories,
-            "created_at": db_product.created_at,
-            "updated_at": db_product.updated_at
-        }
-        
-        return ProductResponse(**response_data)
+        return await db.run_sync(_create_product, product)
     except Exception as e:
         raise HTTPException(status_code=400, detail=str(e))
 
+def _create_product(db: Session, product: ProductCreate):
+    db_product = crud_products.create_product(db, product)
+    categories = crud_products.get_categories_for_products(db, [db_product.id])[db_product.id]
+    return product_response(db_product, categories)
+
+@router.post("/bulk", response_model=ProductImportResult)
+async def bulk_create_products_endpoint(products: List[Any] = Body(...), db: AsyncSession = Depends(get_async_db)):
+    """
+    Create many products at once. Rows use the ProductImport format (as in
+    static_json/product.json); invalid rows are listed in `errors` and skipped.
+    """
+    return await db.run_sync(crud_products.import_products, products)
+
 @router.get("/", response_model=List[ProductResponse])
 async def read_products(
+    request: Request,
     skip: int = 0, 
     limit: int = 100, 
     category_id: Optional[int] = None,
     q: Optional[str] = None,
-    db: Session = Depends(get_db)
+    cursor: Optional[str] = None,
+    min_price: Optional[float] = None,
+    max_price: Optional[float] = None,
+    min_rating: Optional[float] = None,
+    sort: Optional[str] = Query(None, description="price | rating | sold_count | newest"),
+    db: AsyncSession = Depends(get_read_db)
 ):
-    """Get all active products, optionally filtered by category"""
-    products = crud_products.get_products(db, skip=skip, limit=limit, category_id=category_id, q = q)
-    
-    result = []
-    for product in products:
-        # Get categories for each product
-        categories_data = crud_products.get_product_categories(db, product.id)
-        categories = []
-        for cat_data in categories_data:
-            categories.append(CategoryResponse(
-                id=cat_data[0],
-                name=cat_data[1],
-                description=cat_data[2],
-                is_active=cat_data[3],
-                created_at=cat_data[4],
-                updated_at=cat_data[5]
-            ))
-        
-        # Convert string fields back to appropriate types
-        response_data = {
-            "id": product.id,
-            "name": product.name,
-            "description": product.description,
-            "image_url": product.image_url,
-            "price": float(product.price),
-            "sold_count": product.sold_count,
-            "rating": float(product.rating),
-            "review_count": product.review_count,
-            "delivery_info": product.delivery_info,
-            "seller_info": product.seller_info,
-            "stock_quantity": product.stock_quantity,
-            "is_active": product.is_active,
-            "categories": categories,
-            "created_at": product.created_at,
-            "updated_at": product.updated_at
-        }
-        
-        result.append(ProductResponse(**response_data))
-    
+    """
+    Get all active products, optionally filtered by category, price range and rating.
+    Pass the X-Next-Cursor header of a page as `cursor` to fetch the next one.
+    Answers 304 when If-None-Match / If-Modified-Since show the client is up to date.
+    """
+    return await db.run_sync(
+        _read_products, request, skip=skip, limit=limit, category_id=category_id, q=q, cursor=cursor,
+        min_price=min_price, max_price=max_price, min_rating=min_rating, sort=sort
+    )
 
-    return result
+def _read_products(
+    db: Session,
+    request: Request,
+    skip: int,
+    limit: int,
+    category_id: Optional[int],
+    q: Optional[str],
+    cursor: Optional[str],
+    min_price: Optional[float],
+    max_price: Optional[float],
+    min_rating: Optional[float],
+    sort: Optional[str],
+):
+    version = crud_products.get_catalog_version(db)
+    validator = Validator(request, *version, last_modified=_latest(version[1], version[3]))
+    if validator.matches(request):
+        return validator.not_modified()
+
+    if q:
+        # Search hits must come from the catalog the ETag describes
+        product_search.ensure_built(db, version)
+    try:
+        products, next_cursor = crud_products.get_products_page(
+            db, skip=skip, limit=limit, category_id=category_id, q = q, cursor=cursor,
+            min_price=min_price, max_price=max_price, min_rating=min_rating, sort=sort
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    # One query for the categories of the whole page instead of one per product
+    categories_by_product = crud_products.get_categories_for_products(db, [product.id for product in products])
+    headers = validator.headers()
+    if next_cursor:
+        headers[NEXT_CURSOR_HEADER] = next_cursor
+    return products_response(products, categories_by_product, headers=headers)
 
 @router.get("/{product_id}", response_model=ProductResponse)
-async def read_product(product_id: int, db: Session = Depends(get_db)):
-    """Get product by ID"""
-    product = crud_products.get_product_by_id(db, product_id)
+async def read_product(product_id: int, request: Request, db: AsyncSession = Depends(get_read_db)):
+    """Get product by ID (304 when the client's ETag / Last-Modified is current)"""
+    return await db.run_sync(_read_product, product_id, request)
+
+def _read_product(db: Session, product_id: int, request: Request):
+    version = crud_products.get_product_version(db, product_id)
+    if version is None:
+        raise HTTPException(status_code=404, detail="Product not found")
+    validator = Validator(request, *version, last_modified=_latest(version[0], version[2]))
+    if validator.matches(request):
+        return validator.not_modified()
+
+    product = crud_products.get_product_by_id(db, product_id, updated_at=version[0])
     if not product:
         raise HTTPException(status_code=404, detail="Product not found")
     
-    # Get categories
-    categories_data = crud_products.get_product_categories(db, product.id)
-    categories = []
-    for cat_data in categories_data:
-        categories.append(CategoryResponse(
-            id=cat_data[0],
-            name=cat_data[1],
-            description=cat_data[2],
-            is_active=cat_data[3],
-            created_at=cat_data[4],
-            updated_at=cat_data[5]
-        ))
-    
-    # Convert string fields back to appropriate types
-    response_data = {
-        "id": product.id,
-        "name": product.name,
-        "description": product.description,
-        "image_url": product.image_url,
-        "price": float(product.price),
-        "sold_count": product.sold_count,
-        "rating": float(product.rating),
-        "review_count": product.review_count,
-        "delivery_info": product.delivery_info,
-        "seller_info": product.seller_info,
-        "stock_quantity": product.stock_quantity,
-        "is_active": product.is_active,
-        "categories": categories,
-        "created_at": product.created_at,
-        "updated_at": product.updated_at
-    }
-    
-    return ProductResponse(**response_data)
+    categories = crud_products.get_categories_for_products(db, [product.id])[product.id]
+    return product_response(product, categories, headers=validator.headers())
 
 @router.put("/{product_id}", response_model=ProductResponse)
 async def update_product_endpoint(
     product_id: int, 
     product_update: ProductUpdate, 
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Update a product"""
     try:
-        db_product = crud_products.update_product(db, product_id, product_update)
-        if not db_product:
-            raise HTTPException(status_code=404, detail="Product not found")
-        
-        # Get categories for response
-        categories_data = crud_products.get_product_categories(db, db_product.id)
-        categories = []
-        for cat_data in categories_data:
-            categories.append(CategoryResponse(
-                id=cat_data[0],
-                name=cat_data[1],
-                description=cat_data[2],
-                is_active=cat_data[3],
-                created_at=cat_data[4],
-                updated_at=cat_data[5]
-            ))
-        
-        # Convert string fields back to appropriate types for response
-        response_data = {
-            "id": db_product.id,
-            "name": db_product.name,
-            "description": db_product.description,
-            "image_url": db_product.image_url,
-            "price": float(db_product.price),
-            "sold_count": db_product.sold_count,
-            "rating": float(db_product.rating),
-            "review_count": db_product.review_count,
-            "delivery_info": db_product.delivery_info,
-            "seller_info": db_product.seller_info,
-            "stock_quantity": db_product.stock_quantity,
-            "is_active": db_product.is_active,
-            "categories": categories,
-            "created_at": db_product.created_at,
-            "updated_at": db_product.updated_at
-        }
-        
-        return ProductResponse(**response_data)
+        return await db.run_sync(_update_product, product_id, product_update)
     except Exception as e:
         raise HTTPException(status_code=400, detail=str(e))
 
+def _update_product(db: Session, product_id: int, product_update: ProductUpdate):
+    db_product = crud_products.update_product(db, product_id, product_update)
+    if not db_product:
+        raise HTTPException(status_code=404, detail="Product not found")
+    
+    categories = crud_products.get_categories_for_products(db, [db_product.id])[db_product.id]
+    return product_response(db_product, categories)
+
 @router.delete("/{product_id}")
-async def delete_product(product_id: int, db: Session = Depends(get_db)):
+async def delete_product(product_id: int, db: AsyncSession = Depends(get_async_db)):
     """Soft delete a product (set is_active to False)"""
-    product = crud_products.get_product_by_id(db, product_id)
+    product = await db.run_sync(crud_products.deactivate_product, product_id)
     if not product:
         raise HTTPException(status_code=404, detail="Product not found")
     
-    product.is_active = False
-    product.updated_at = datetime.now()
-    db.commit()
-    
     return {"message": "Product deleted successfully"}
 
 @router.get("/category/{category_id}", response_model=List[ProductResponse])
 async def get_products_by_category(
     category_id: int, 
+    request: Request,
     skip: int = 0, 
     limit: int = 100,
-    db: Session = Depends(get_db)
+    cursor: Optional[str] = None,
+    db: AsyncSession = Depends(get_read_db)
 ):
     """Get all products in a specific category"""
-    return await read_products(skip=skip, limit=limit, category_id=category_id, db=db)
+    return await read_products(
+        request, skip=skip, limit=limit, category_id=category_id, cursor=cursor,
+        min_price=None, max_price=None, min_rating=None, sort=None, db=db
+    )
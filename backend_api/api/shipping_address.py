@@ -1,11 +1,12 @@
 # your_project/api/users.py
 from fastapi import APIRouter, Depends, HTTPException
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 from typing import List
 
 from ..schemas import ShippingAddressCreate, ShippingAddressResponse, ShippingAddressUpdate, UserCreate, UserResponse # Relative import
 from ..crud import shipping_address as crud_addresses # Import crud functions
-from ..database import get_db # Import DB dependency
+from ..database import get_async_db # Import DB dependency
 from ..utils.auth import hash_password # For password verification
 
 router = APIRouter(
@@ -13,13 +14,21 @@ router = APIRouter(
     tags=["Shipping Addresses"],
 )
 
+
+def _address_response(db_address):
+    # Built inside run_sync, while expired attributes can still be loaded
+    return ShippingAddressResponse.model_validate(db_address) if db_address is not None else None
+
+
 @router.post("/user/{user_uid}/addresses/", response_model=ShippingAddressResponse)
 async def create_address_for_user(
     user_uid: str,
     address: ShippingAddressCreate,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
     ):
-    db_address = crud_addresses.create_shipping_address(db, address, user_uid) # Use model_dump() for Pydantic V2
+    db_address = await db.run_sync(
+        lambda session: _address_response(crud_addresses.create_shipping_address(session, address, user_uid))
+    )
     if db_address is None:
         raise HTTPException(status_code=404, detail="Duplicate address")
     return db_address
@@ -27,34 +36,42 @@ async def create_address_for_user(
 @router.get("addresses/{address_id}", response_model=ShippingAddressResponse)
 async def get_user_address(
     address_id: int, 
-    db: Session = Depends(get_db)):
-    db_address = crud_addresses.get_addresses_by_id(db, address_id)
+    db: AsyncSession = Depends(get_async_db)):
+    db_address = await db.run_sync(
+        lambda session: _address_response(crud_addresses.get_addresses_by_id(session, address_id))
+    )
     return db_address
 
 @router.get("/user/{user_uid}/addresses/", response_model=List[ShippingAddressResponse])
 async def get_user_address(
     user_uid: str, 
-    db: Session = Depends(get_db)):
-    db_addresses = crud_addresses.get_addresses_by_user(db, user_uid)
+    db: AsyncSession = Depends(get_async_db)):
+    db_addresses = await db.run_sync(crud_addresses.get_addresses_by_user, user_uid)
     return db_addresses
 
 @router.put("/user/{user_uid}/addresses/{address_id}", response_model=ShippingAddressResponse)
 async def update_user_address(
+    user_uid: str,
     address_id: int,
     address_update: ShippingAddressUpdate,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
-    db_address = crud_addresses.update_shipping_address(db, address_id, address_update)
+    db_address = await db.run_sync(
+        lambda session: _address_response(crud_addresses.update_shipping_address(session, address_id, address_update, user_uid))
+    )
     if not db_address:
         raise HTTPException(status_code=404, detail="Address not found")
     return db_address
 
 @router.delete("/user/{user_uid}/addresses/{address_id}")
 async def delete_address(
+    user_uid: str,
     address_id: int, 
-    db: Session = Depends(get_db)):
+    db: AsyncSession = Depends(get_async_db)):
 
-    db_address = crud_addresses.delete_shipping_address(db, address_id)
+    db_address = await db.run_sync(
+        lambda session: _address_response(crud_addresses.delete_shipping_address(session, address_id, user_uid))
+    )
     if not db_address:
         raise HTTPException(status_code=404, detail="Address logic error")
-    return db_address
\ No newline at end of file
+    return db_address
@@ -1,12 +1,13 @@
 # your_project/api/users.py
 from fastapi import APIRouter, Depends, HTTPException
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 from typing import List
 
 from ..schemas import UserCreate, UserResponse # Relative import
 from ..crud import users as crud_users # Import crud functions
-from ..database import get_db # Import DB dependency
-from ..utils.auth import hash_password # For password verification
+from ..database import get_async_db # Import DB dependency
+from ..utils.auth import hash_password_async, verify_password_async # Hashing runs off the event loop
 
 router = APIRouter(
     prefix="/users",
@@ -14,38 +15,52 @@ router = APIRouter(
 )
 
 @router.post("/", response_model=UserResponse)
-async def create_user_endpoint(user: UserCreate, db: Session = Depends(get_db)):
+async def create_user_endpoint(user: UserCreate, db: AsyncSession = Depends(get_async_db)):
     """
     Create or update a user record from Firebase auth data.
     For email/password users, the password will be hashed.
     """
+    user_data = user.model_dump() # Use model_dump() for Pydantic V2
+    password = user_data.pop("password", None)
+    if password:
+        user_data["password_hash"] = await hash_password_async(password)
     try:
-        db_user = crud_users.create_or_update_user(db, user.model_dump()) # Use model_dump() for Pydantic V2
-        return db_user
+        return await db.run_sync(_create_user, user_data)
     except Exception as e:
         raise HTTPException(status_code=400, detail=str(e))
 
+def _create_user(db: Session, user_data: dict):
+    db_user = crud_users.create_or_update_user(db, user_data)
+    return UserResponse.model_validate(db_user, from_attributes=True)
+
 @router.get("/{uid}", response_model=UserResponse)
-async def read_user_endpoint(uid: str, db: Session = Depends(get_db)):
+async def read_user_endpoint(uid: str, db: AsyncSession = Depends(get_async_db)):
     """Get user by Firebase UID"""
+    return await db.run_sync(_read_user, uid)
+
+def _read_user(db: Session, uid: str):
     db_user = crud_users.get_user_by_uid(db, uid=uid)
     if db_user is None:
         raise HTTPException(status_code=404, detail="User not found")
-    return db_user
+    return UserResponse.model_validate(db_user, from_attributes=True)
 
 @router.post("/verify-password")
 async def verify_password_endpoint(
     uid: str, 
     password: str, 
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """
     Verify a password for email/password users.
     Returns boolean indicating if password is correct.
+    A legacy (SHA-256) or outdated hash is replaced after a successful check.
     """
-    user = crud_users.get_user_by_uid(db, uid)
-    if not user or not user.password_hash:
+    stored_hash = await db.run_sync(crud_users.get_password_hash, uid)
+    if not stored_hash:
         return {"valid": False}
-    
-    hashed_input = hash_password(password)
-    return {"valid": hashed_input == user.password_hash}
\ No newline at end of file
+
+    valid, needs_rehash = await verify_password_async(password, stored_hash)
+    if valid and needs_rehash:
+        new_hash = await hash_password_async(password)
+        await db.run_sync(crud_users.update_password_hash, uid, stored_hash, new_hash)
+    return {"valid": valid}
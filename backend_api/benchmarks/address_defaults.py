@@ -0,0 +1,180 @@
+# ----------------------------------------
+# Check: one default shipping address per user under concurrent writes
+# ----------------------------------------
+# --workers threads hammer the address book of --users users at the same
+# time: first addresses (each becomes the default when it is the user's
+# first), new default addresses and switching the default to an existing
+# address. Afterwards every user must have exactly one default address.
+# Runs twice: with the previous read-then-write functions on a table without
+# the unique default index, then with crud.shipping_address and the index.
+# Reports statements per mutation, errors and users breaking the rule; the
+# exit status is 1 if the current code breaks it. By default a temporary
+# SQLite file is used (DATABASE_URL to test another database).
+#
+#   python -m backend_api.benchmarks.address_defaults [--users 50] [--operations 4000] [--workers 16]
+import argparse
+import os
+import random
+import sys
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+os.environ.setdefault("DATABASE_URL", f"sqlite:///{os.path.join(tempfile.mkdtemp(), 'address_defaults.db')}")
+
+from sqlalchemy import delete, event, func, select
+
+from ..crud import shipping_address as crud_addresses
+from ..database import Base, SessionLocal, engine
+from ..models import ShippingAddress, User
+from ..schemas import ShippingAddressCreate, ShippingAddressUpdate
+
+
+def legacy_create(db, address: ShippingAddressCreate, user_uid: str):
+    """What create_shipping_address did before: duplicate check, count, clear, insert, refresh"""
+    exist = db.query(ShippingAddress).filter(
+        ShippingAddress.user_uid == user_uid, ShippingAddress.address == address.address).first()
+    if exist:
+        return None
+    should_be_default = address.is_default
+    if db.query(ShippingAddress).filter(ShippingAddress.user_uid == user_uid).count() == 0:
+        should_be_default = True
+    if should_be_default:
+        db.query(ShippingAddress).filter(
+            ShippingAddress.user_uid == user_uid, ShippingAddress.is_default == True
+        ).update({"is_default": False})
+    db_address = ShippingAddress(user_uid=user_uid, address=address.address, is_default=should_be_default)
+    db.add(db_address)
+    db.commit()
+    db.refresh(db_address)
+    return db_address
+
+
+def legacy_update(db, address_id: int, address_update: ShippingAddressUpdate, user_uid: str):
+    """What update_shipping_address did before: read, clear the other defaults, write, refresh"""
+    db_address = crud_addresses.get_address_by_id(db, address_id)
+    if not db_address:
+        return None
+    update_data = address_update.model_dump(exclude_unset=True)
+    if update_data.get("is_default") is True:
+        db.query(ShippingAddress).filter(
+            ShippingAddress.user_uid == db_address.user_uid,
+            ShippingAddress.is_default == True,
+            ShippingAddress.id != address_id,
+        ).update({"is_default": False})
+    for key, value in update_data.items():
+        setattr(db_address, key, value)
+    db.commit()
+    db.refresh(db_address)
+    return db_address
+
+
+_statements = threading.local()
+
+
+def _count(conn, cursor, statement, parameters, context, executemany):
+    _statements.count = getattr(_statements, "count", 0) + 1
+
+
+def mutate(create, update, operation):
+    kind, uid, value = operation
+    db = SessionLocal()
+    _statements.count = 0
+    try:
+        if kind == "update":
+            address_id = db.scalar(select(ShippingAddress.id).where(
+                ShippingAddress.user_uid == uid, ShippingAddress.address == value))
+            db.rollback()
+            if address_id is None:
+                return kind, 0, None
+            _statements.count = 0
+            update(db, address_id, ShippingAddressUpdate(is_default=True), uid)
+        else:
+            create(db, ShippingAddressCreate(address=value, is_default=kind == "create_default"), uid)
+        error = None
+    except Exception as e:  # unique violations, lock timeouts: counted, not hidden
+        db.rollback()
+        error = type(e).__name__
+    finally:
+        db.close()
+    return kind, _statements.count, error
+
+
+def check(uids):
+    """uid -> number of default addresses, for users with addresses"""
+    with SessionLocal() as db:
+        rows = db.execute(
+            select(ShippingAddress.user_uid, func.count().filter(ShippingAddress.is_default == True))
+            .where(ShippingAddress.user_uid.in_(uids))
+            .group_by(ShippingAddress.user_uid)
+        ).all()
+    return dict(rows)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Concurrent default-address writes: legacy vs set-based")
+    parser.add_argument("--users", type=int, default=50)
+    parser.add_argument("--operations", type=int, default=4000)
+    parser.add_argument("--workers", type=int, default=16)
+    args = parser.parse_args()
+
+    Base.metadata.create_all(bind=engine)
+    unique_default = next(index for index in ShippingAddress.__table__.indexes
+                          if index.name == "ux_shipping_address_default_user_uid")
+    event.listen(engine, "before_cursor_execute", _count)
+    uids = [f"address-bench-{i}" for i in range(args.users)]
+    with engine.begin() as connection:
+        connection.execute(delete(ShippingAddress).where(ShippingAddress.user_uid.in_(uids)))
+        connection.execute(delete(User).where(User.uid.in_(uids)))
+        connection.execute(User.__table__.insert(), [
+            {"uid": uid, "provider": "email", "identifier": f"{uid}@example.com"} for uid in uids
+        ])
+
+    rng = random.Random(42)
+    # Every user's first addresses arrive at once, then a mix of the three writes
+    operations = [("create", uid, f"street {n}") for uid in uids for n in range(4)]
+    while len(operations) < args.operations:
+        uid = rng.choice(uids)
+        kind = rng.choice(("create_default", "update", "update"))
+        operations.append((kind, uid, f"street {rng.randrange(4 if kind == 'update' else 40)}"))
+
+    print(f"{engine.dialect.name}: {args.users} users, {len(operations)} address writes, {args.workers} workers")
+    failed = False
+    for name, create, update, indexed in (
+        ("legacy", legacy_create, legacy_update, False),
+        ("current", crud_addresses.create_shipping_address, crud_addresses.update_shipping_address, True),
+    ):
+        with engine.begin() as connection:
+            connection.execute(delete(ShippingAddress).where(ShippingAddress.user_uid.in_(uids)))
+        if indexed:
+            unique_default.create(bind=engine, checkfirst=True)
+        else:
+            unique_default.drop(bind=engine, checkfirst=True)
+
+        start = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=args.workers) as pool:
+            results = list(pool.map(lambda operation: mutate(create, update, operation), operations))
+        elapsed = time.perf_counter() - start
+
+        per_kind = {}
+        errors = {}
+        for kind, count, error in results:
+            if error:
+                errors[error] = errors.get(error, 0) + 1
+            elif count:
+                total, n = per_kind.get(kind, (0, 0))
+                per_kind[kind] = (total + count, n + 1)
+        defaults = check(uids)
+        broken = {uid: n for uid, n in defaults.items() if n != 1}
+        statements = "  ".join(f"{kind} {total / n:.2f}" for kind, (total, n) in sorted(per_kind.items()))
+        print(f"  {name:<8} {len(results) / elapsed:7.0f} writes/s  statements per write: {statements}")
+        print(f"  {'':<8} errors {errors or 0}  users without exactly one default: {len(broken)}"
+              + (f" (e.g. {sorted(broken.values())[-1]} defaults)" if broken else ""))
+        if indexed and broken:
+            failed = True
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,127 @@
+# ----------------------------------------
+# Benchmark: concurrent checkouts of one hot product
+# ----------------------------------------
+# Seeds one product with --stock units and --carts carts that each hold
+# --quantity of it, then checks all carts out from --workers threads at once.
+# Reports throughput and latency and verifies that stock never went
+# negative, that exactly the available stock was sold and that sold_count
+# matches. Run it against a scratch database (DATABASE_URL); by default a
+# temporary SQLite file is used.
+#
+#   python -m backend_api.benchmarks.checkout [--carts 500] [--stock 200] [--workers 32]
+import argparse
+import os
+import tempfile
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from decimal import Decimal
+
+os.environ.setdefault("DATABASE_URL", f"sqlite:///{os.path.join(tempfile.mkdtemp(), 'checkout_bench.db')}")
+
+from sqlalchemy import insert
+
+from ..crud.orders import checkout_order
+from ..database import Base, SessionLocal, engine
+from ..models import Order, OrderItem, Product, ShippingAddress, User
+
+
+def seed(carts: int, stock: int, quantity: int):
+    run = uuid.uuid4().hex[:8]
+    db = SessionLocal()
+    try:
+        product = Product(name=f"Hot product {run}", price=Decimal("9.99"), stock_quantity=stock, sold_count=0)
+        db.add(product)
+        db.flush()
+        uids = [f"bench-{run}-{i}" for i in range(carts)]
+        db.execute(insert(User), [{"uid": uid, "provider": "email", "identifier": f"{uid}@example.com"} for uid in uids])
+        address_ids = db.execute(
+            insert(ShippingAddress).returning(ShippingAddress.id, sort_by_parameter_order=True),
+            [{"user_uid": uid, "address": "1 Benchmark Street"} for uid in uids],
+        ).scalars().all()
+        order_ids = db.execute(
+            insert(Order).returning(Order.id, sort_by_parameter_order=True),
+            [{"user_uid": uid, "status": 1, "shipping_address_id": address_id, "total_amount": 0}
+             for uid, address_id in zip(uids, address_ids)],
+        ).scalars().all()
+        db.execute(insert(OrderItem), [
+            {"order_id": order_id, "product_id": product.id, "quantity": quantity, "price_per_unit": product.price}
+            for order_id in order_ids
+        ])
+        db.commit()
+        return product.id, order_ids
+    finally:
+        db.close()
+
+
+def checkout(order_id: int):
+    db = SessionLocal()
+    start = time.perf_counter()
+    try:
+        checkout_order(db, order_id)
+        outcome = "ok"
+    except ValueError as e:
+        outcome = "out of stock" if "Insufficient stock" in str(e) else f"rejected: {e}"
+    except Exception as e:  # e.g. lock timeouts, reported rather than hidden
+        db.rollback()
+        outcome = f"error: {type(e).__name__}"
+    finally:
+        db.close()
+    return outcome, time.perf_counter() - start
+
+
+def percentile(values, fraction: float) -> float:
+    return values[min(len(values) - 1, int(len(values) * fraction))]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Concurrent checkouts of one hot product")
+    parser.add_argument("--carts", type=int, default=500)
+    parser.add_argument("--stock", type=int, default=200)
+    parser.add_argument("--quantity", type=int, default=1, help="units of the product in each cart")
+    parser.add_argument("--workers", type=int, default=32)
+    args = parser.parse_args()
+
+    Base.metadata.create_all(bind=engine)
+    product_id, order_ids = seed(args.carts, args.stock, args.quantity)
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=args.workers) as pool:
+        results = list(pool.map(checkout, order_ids))
+    elapsed = time.perf_counter() - start
+
+    outcomes = {}
+    for outcome, _ in results:
+        outcomes[outcome] = outcomes.get(outcome, 0) + 1
+    latencies = sorted(latency for _, latency in results)
+
+    db = SessionLocal()
+    try:
+        product = db.get(Product, product_id)
+        processing = db.query(Order).filter(Order.id.in_(order_ids), Order.status == 2).count()
+    finally:
+        db.close()
+
+    sold = outcomes.get("ok", 0)
+    print(f"{engine.dialect.name}: {args.carts} checkouts, {args.workers} workers, stock {args.stock}")
+    print(f"  {elapsed:.2f}s, {len(results) / elapsed:.0f} checkouts/s")
+    print(f"  latency p50 {percentile(latencies, 0.5) * 1000:.1f} ms  p95 {percentile(latencies, 0.95) * 1000:.1f} ms  "
+          f"p99 {percentile(latencies, 0.99) * 1000:.1f} ms")
+    print(f"  outcomes: {outcomes}")
+    print(f"  stock left {product.stock_quantity}, sold_count {product.sold_count}, orders in processing {processing}")
+
+    expected_sold = min(args.carts, args.stock // args.quantity)
+    checks = {
+        "stock never negative": product.stock_quantity >= 0,
+        "stock + sold units == initial stock": product.stock_quantity + sold * args.quantity == args.stock,
+        "sold_count matches": product.sold_count == sold * args.quantity,
+        "processing orders match successful checkouts": processing == sold,
+        "all available stock sold": sold == expected_sold or any(o.startswith("error") for o in outcomes),
+    }
+    for name, passed in checks.items():
+        print(f"  [{'ok' if passed else 'FAIL'}] {name}")
+    return 0 if all(checks.values()) else 1
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,224 @@
+# ----------------------------------------
+# Benchmark dataset extrapolated from static_json/
+# ----------------------------------------
+# Seeds categories (static_json/category.json as is) and any number of
+# products, users (with a shipping address), orders and order items. The
+# rows are variations of the static products and users, so names,
+# descriptions and prices look like the real catalog. Rows go in with
+# chunked executemany inserts, so millions of rows are practical. The same
+# --seed gives the same data. Seeding first removes the rows of an earlier
+# seed() (benchmark users, their orders and addresses, benchmark products),
+# so it can run again on the same database.
+import json
+import os
+import random
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta
+from decimal import Decimal
+from typing import Dict, List
+
+from sqlalchemy import delete, insert, select
+from sqlalchemy.orm import Session
+
+from ..models import Category, Order, OrderItem, Product, ProductCategory, ShippingAddress, User
+
+STATIC_JSON = os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))), "static_json")
+CHUNK_SIZE = 5000
+
+_VARIANTS = ["Classic", "Deluxe", "Compact", "Pro", "Lite", "Eco", "Premium", "Travel", "Mini", "Max"]
+_COLORS = ["Black", "White", "Red", "Blue", "Green", "Grey", "Beige", "Navy", "Pink", "Olive"]
+# Order history mix: mostly completed, some processing, a few deactivated
+_ORDER_STATUSES = [3] * 6 + [2] * 3 + [0]
+# Stock large enough that add-to-cart / checkout runs never sell out
+_STOCK = 10_000_000
+# Benchmark users and products are recognised by these, so clear() can find them
+USER_PREFIX = "bench-user-"
+SELLER_INFO = "umeT benchmark seller"
+
+
+@dataclass
+class Dataset:
+    category_ids: List[int] = field(default_factory=list)
+    product_ids: List[int] = field(default_factory=list)
+    user_uids: List[str] = field(default_factory=list)
+    search_terms: List[str] = field(default_factory=list)
+
+
+def _load(name: str):
+    with open(os.path.join(STATIC_JSON, name), encoding="utf-8") as f:
+        return json.load(f)
+
+
+def _chunks(rows_iter, size: int = CHUNK_SIZE):
+    chunk = []
+    for row in rows_iter:
+        chunk.append(row)
+        if len(chunk) == size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+def _search_terms(templates) -> List[str]:
+    words = {word.strip(",.").lower() for template in templates for word in template["name"].split()}
+    return sorted(word for word in words if len(word) > 3) + [variant.lower() for variant in _VARIANTS[:3]]
+
+
+def _seed_categories(db: Session) -> Dict[str, int]:
+    existing = dict(db.execute(select(Category.name, Category.id)).all())
+    missing = [row for row in _load("category.json") if row["name"] not in existing]
+    if missing:
+        db.execute(insert(Category), [
+            {"name": row["name"], "description": row["description"], "is_active": bool(row["is_active"])}
+            for row in missing
+        ])
+        existing = dict(db.execute(select(Category.name, Category.id)).all())
+    return existing
+
+
+def clear(db: Session):
+    """Delete the rows of an earlier seed(): benchmark users with their orders and addresses, benchmark products"""
+    bench_users = select(User.uid).where(User.uid.like(f"{USER_PREFIX}%"))
+    bench_orders = select(Order.id).where(Order.user_uid.in_(bench_users))
+    bench_products = select(Product.id).where(Product.seller_info == SELLER_INFO)
+    for stmt in (
+        delete(OrderItem).where(OrderItem.order_id.in_(bench_orders)),
+        delete(Order).where(Order.id.in_(bench_orders)),
+        delete(ShippingAddress).where(ShippingAddress.user_uid.in_(bench_users)),
+        delete(User).where(User.uid.in_(bench_users)),
+        delete(ProductCategory).where(ProductCategory.product_id.in_(bench_products)),
+        delete(Product).where(Product.id.in_(bench_products)),
+    ):
+        db.execute(stmt, execution_options={"synchronize_session": False})
+    db.commit()
+
+
+def seed(db: Session, products: int, users: int, orders: int, max_items: int = 5, seed: int = 42) -> Dataset:
+    """Replace the rows of an earlier seed with the given number of rows and return the ids the benchmarks draw from"""
+    clear(db)
+    rng = random.Random(seed)
+    templates = _load("product.json")
+    user_templates = _load("users.json")
+    category_ids_by_name = _seed_categories(db)
+    dataset = Dataset(category_ids=sorted(category_ids_by_name.values()), search_terms=_search_terms(templates))
+    now = datetime.now()
+
+    def product_rows():
+        for i in range(products):
+            template = templates[i % len(templates)]
+            price = Decimal(str(template["price"])) * Decimal(rng.uniform(0.7, 1.3))
+            yield {
+                "name": f"{template['name']} {_VARIANTS[i // len(templates) % len(_VARIANTS)]} "
+                        f"{_COLORS[i // (len(templates) * len(_VARIANTS)) % len(_COLORS)]} {i}",
+                "description": template["description"],
+                "image_url": template["image_url"],
+                "price": price.quantize(Decimal("0.01")),
+                "sold_count": rng.randint(0, 5000),
+                "rating": Decimal(str(round(rng.uniform(3.0, 5.0), 2))),
+                "review_count": rng.randint(0, 800),
+                "delivery_info": template["delivery_info"],
+                "seller_info": SELLER_INFO,
+                "stock_quantity": _STOCK,
+                "is_active": True,
+                "created_at": now - timedelta(minutes=rng.randint(0, 525600)),
+                "_categories": [category["name"] for category in template.get("categories") or []],
+            }
+
+    prices: Dict[int, Decimal] = {}
+    for chunk in _chunks(product_rows()):
+        category_names = [row.pop("_categories") for row in chunk]
+        ids = db.execute(insert(Product).returning(Product.id, sort_by_parameter_order=True), chunk).scalars().all()
+        links = [
+            {"product_id": product_id, "category_id": category_ids_by_name[name]}
+            for product_id, names in zip(ids, category_names)
+            for name in names
+            if name in category_ids_by_name
+        ]
+        if links:
+            db.execute(insert(ProductCategory), links)
+        prices.update((product_id, row["price"]) for product_id, row in zip(ids, chunk))
+        dataset.product_ids.extend(ids)
+
+    for chunk in _chunks(range(users)):
+        user_rows = []
+        for i in chunk:
+            template = user_templates[i % len(user_templates)]
+            uid = f"{USER_PREFIX}{i}"
+            user_rows.append({
+                "uid": uid, "provider": template["provider"], "identifier": f"{uid}@example.com",
+                "display_name": template.get("display_name"),
+            })
+        db.execute(insert(User), user_rows)
+        db.execute(insert(ShippingAddress), [
+            {"user_uid": row["uid"], "address": f"{rng.randint(1, 999)} Benchmark Street", "is_default": True}
+            for row in user_rows
+        ])
+        dataset.user_uids.extend(row["uid"] for row in user_rows)
+
+    if orders and users:
+        address_ids = dict(db.execute(
+            select(ShippingAddress.user_uid, ShippingAddress.id).where(ShippingAddress.user_uid.like(f"{USER_PREFIX}%"))
+        ).all())
+        for chunk in _chunks(range(orders)):
+            order_rows, item_rows = [], []
+            for _ in chunk:
+                uid = dataset.user_uids[rng.randrange(len(dataset.user_uids))]
+                items = [
+                    (product_id, rng.randint(1, 3))
+                    for product_id in rng.sample(dataset.product_ids, min(len(dataset.product_ids), rng.randint(1, max_items)))
+                ]
+                created_at = now - timedelta(minutes=rng.randint(0, 525600))
+                order_rows.append({
+                    "user_uid": uid, "status": rng.choice(_ORDER_STATUSES), "shipping_address_id": address_ids[uid],
+                    "total_amount": sum(prices[product_id] * quantity for product_id, quantity in items),
+                    "created_at": created_at, "updated_at": created_at,
+                })
+                item_rows.append(items)
+            order_ids = db.execute(insert(Order).returning(Order.id, sort_by_parameter_order=True), order_rows).scalars().all()
+            db.execute(insert(OrderItem), [
+                {"order_id": order_id, "product_id": product_id, "quantity": quantity, "price_per_unit": prices[product_id]}
+                for order_id, items in zip(order_ids, item_rows)
+                for product_id, quantity in items
+            ])
+    db.commit()
+    return dataset
+
+
+def load(db: Session) -> Dataset:
+    """Ids of a database seeded earlier (seed() with the same or another scale)"""
+    templates = _load("product.json")
+    return Dataset(
+        category_ids=db.execute(select(Category.id).where(Category.is_active == True).order_by(Category.id)).scalars().all(),
+        product_ids=db.execute(
+            select(Product.id).where(Product.seller_info == SELLER_INFO, Product.is_active == True).order_by(Product.id)
+        ).scalars().all(),
+        user_uids=db.execute(select(User.uid).where(User.uid.like(f"{USER_PREFIX}%")).order_by(User.id)).scalars().all(),
+        search_terms=_search_terms(templates),
+    )
+
+
+def create_carts(db: Session, uids: List[str], product_ids: List[int], seed: int = 42) -> List[int]:
+    """One ready-to-check-out cart (status 1, shipping address set) per uid; returns the order ids"""
+    rng = random.Random(seed)
+    carts = [rng.sample(product_ids, min(3, len(product_ids))) for _ in uids]
+    wanted = sorted({product_id for cart in carts for product_id in cart})
+    prices = {}
+    for start in range(0, len(wanted), CHUNK_SIZE):
+        prices.update(db.execute(
+            select(Product.id, Product.price).where(Product.id.in_(wanted[start:start + CHUNK_SIZE]))
+        ).all())
+    address_ids = dict(db.execute(
+        select(ShippingAddress.user_uid, ShippingAddress.id).where(ShippingAddress.user_uid.in_(set(uids)))
+    ).all())
+    order_ids = db.execute(
+        insert(Order).returning(Order.id, sort_by_parameter_order=True),
+        [{"user_uid": uid, "status": 1, "shipping_address_id": address_ids[uid], "total_amount": 0} for uid in uids],
+    ).scalars().all()
+    db.execute(insert(OrderItem), [
+        {"order_id": order_id, "product_id": product_id, "quantity": 1, "price_per_unit": prices[product_id]}
+        for order_id, cart in zip(order_ids, carts)
+        for product_id in cart
+    ])
+    db.commit()
+    return order_ids
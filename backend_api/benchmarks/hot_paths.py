@@ -0,0 +1,239 @@
+# ----------------------------------------
+# Benchmark suite: API hot paths
+# ----------------------------------------
+# Seeds a database (benchmarks/dataset.py) and drives the real FastAPI app
+# in-process through httpx's ASGI transport. Scenarios:
+#
+#   list          GET  /products/?limit=20 at random offsets and sorts
+#   search        GET  /products/?q=...&limit=20
+#   detail        GET  /products/{id}
+#   add_to_cart   POST /users/{uid}/cart/items/?product_id=...
+#   order_history GET  /users/{uid}/orders/?limit=20
+#   checkout      POST /orders/{id}/checkout on carts created before the timing starts
+#
+# For every scenario it reports throughput and p50/p95/p99 latency. Results
+# are written as JSON together with the commit, dialect and scale, so two
+# runs can be compared with --baseline.
+#
+#   python -m backend_api.benchmarks.hot_paths --products 100000 --users 10000 --orders 200000 \
+#       --output results.json [--baseline previous.json]
+#   python -m backend_api.benchmarks.hot_paths --database-url postgresql://... --reuse
+#
+# Without --database-url a fresh temporary SQLite file is used (DATABASE_URL
+# from the environment is ignored). Seeding replaces the benchmark rows of an
+# earlier run; --reuse benchmarks them instead of seeding again.
+import argparse
+import asyncio
+import json
+import os
+import platform
+import random
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime
+from typing import Callable, Dict, List, Tuple
+
+SCENARIOS = ("list", "search", "detail", "add_to_cart", "order_history", "checkout")
+_SORTS = (None, "price", "rating", "sold_count", "newest")
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Latency and throughput of the API hot paths")
+    parser.add_argument("--database-url", help="default: a fresh temporary SQLite file")
+    parser.add_argument("--reuse", action="store_true", help="use the rows of an earlier run instead of seeding")
+    parser.add_argument("--products", type=int, default=10000)
+    parser.add_argument("--users", type=int, default=2000)
+    parser.add_argument("--orders", type=int, default=20000)
+    parser.add_argument("--max-items", type=int, default=5, help="items per seeded order (1..n)")
+    parser.add_argument("--requests", type=int, default=500, help="timed requests per scenario")
+    parser.add_argument("--warmup", type=int, default=50, help="untimed requests per scenario")
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--scenarios", default=",".join(SCENARIOS))
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--output", help="write the results as JSON to this file")
+    parser.add_argument("--baseline", help="JSON results of an earlier run to compare with")
+    return parser.parse_args()
+
+
+def percentile(values: List[float], fraction: float) -> float:
+    return values[min(len(values) - 1, int(len(values) * fraction))]
+
+
+def git_commit() -> str:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True,
+            cwd=os.path.dirname(os.path.abspath(__file__)),
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+
+def scenario_requests(name: str, dataset, rng: random.Random, cart_ids: List[int]) -> Callable[[], Tuple[str, str]]:
+    """Returns a function producing the next (method, url) of the scenario"""
+    products, uids = dataset.product_ids, dataset.user_uids
+
+    def list_page():
+        sort = rng.choice(_SORTS)
+        url = f"/products/?limit=20&skip={rng.randrange(0, max(1, min(len(products) - 20, 2000)))}"
+        return "GET", url + (f"&sort={sort}" if sort else "")
+
+    factories = {
+        "list": list_page,
+        "search": lambda: ("GET", f"/products/?q={rng.choice(dataset.search_terms)}&limit=20"),
+        "detail": lambda: ("GET", f"/products/{rng.choice(products)}"),
+        "add_to_cart": lambda: (
+            "POST", f"/users/{rng.choice(uids)}/cart/items/?product_id={rng.choice(products)}&quantity=1"
+        ),
+        "order_history": lambda: ("GET", f"/users/{rng.choice(uids)}/orders/?limit=20"),
+        "checkout": lambda: ("POST", f"/orders/{cart_ids.pop()}/checkout"),
+    }
+    return factories[name]
+
+
+async def run_scenario(client, next_request, count: int, concurrency: int):
+    requests = [next_request() for _ in range(count)]
+    latencies: List[float] = []
+    errors = 0
+
+    async def worker():
+        nonlocal errors
+        while requests:
+            method, url = requests.pop()
+            start = time.perf_counter()
+            response = await client.request(method, url)
+            latencies.append(time.perf_counter() - start)
+            if response.status_code >= 400:
+                errors += 1
+
+    start = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    return sorted(latencies), errors, time.perf_counter() - start
+
+
+def summarize(latencies: List[float], errors: int, elapsed: float) -> Dict[str, float]:
+    return {
+        "requests": len(latencies),
+        "errors": errors,
+        "throughput_rps": round(len(latencies) / elapsed, 1),
+        "mean_ms": round(sum(latencies) / len(latencies) * 1000, 3),
+        "p50_ms": round(percentile(latencies, 0.50) * 1000, 3),
+        "p95_ms": round(percentile(latencies, 0.95) * 1000, 3),
+        "p99_ms": round(percentile(latencies, 0.99) * 1000, 3),
+        "max_ms": round(latencies[-1] * 1000, 3),
+    }
+
+
+def compare(results: Dict, baseline_path: str):
+    with open(baseline_path, encoding="utf-8") as f:
+        baseline = json.load(f)
+    print(f"compared with {baseline_path} (commit {baseline['meta'].get('commit')}):")
+    for key in ("dialect", "scale", "concurrency"):
+        if baseline["meta"].get(key) != results["meta"][key]:
+            print(f"  note: {key} differs ({baseline['meta'].get(key)} -> {results['meta'][key]})")
+    for name, current in results["scenarios"].items():
+        previous = baseline["scenarios"].get(name)
+        if previous is None:
+            continue
+        changes = []
+        for metric in ("throughput_rps", "p50_ms", "p95_ms", "p99_ms"):
+            if previous[metric]:
+                changes.append(f"{metric} {(current[metric] - previous[metric]) / previous[metric] * 100:+.1f}%")
+        print(f"  {name:<14} " + "  ".join(changes))
+
+
+async def run(args, dataset, cart_ids: List[int], scenarios: List[str]) -> Dict[str, Dict[str, float]]:
+    import httpx
+
+    from ..main import app
+
+    rng = random.Random(args.seed)
+    results = {}
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        for name in scenarios:
+            next_request = scenario_requests(name, dataset, rng, cart_ids)
+            if args.warmup:
+                await run_scenario(client, next_request, args.warmup, args.concurrency)
+            latencies, errors, elapsed = await run_scenario(client, next_request, args.requests, args.concurrency)
+            results[name] = summarize(latencies, errors, elapsed)
+            r = results[name]
+            print(f"  {name:<14} {r['throughput_rps']:8.1f} req/s  p50 {r['p50_ms']:8.2f} ms  "
+                  f"p95 {r['p95_ms']:8.2f} ms  p99 {r['p99_ms']:8.2f} ms  errors {errors}")
+    return results
+
+
+def main():
+    args = parse_args()
+    scenarios = [name.strip() for name in args.scenarios.split(",") if name.strip()]
+    unknown = set(scenarios) - set(SCENARIOS)
+    if unknown:
+        raise SystemExit(f"unknown scenarios: {', '.join(sorted(unknown))}")
+
+    # The database modules read DATABASE_URL at import time; never fall back
+    # to the developer's configured database
+    os.environ["DATABASE_URL"] = args.database_url or (
+        f"sqlite:///{os.path.join(tempfile.mkdtemp(), 'hot_paths.db')}"
+    )
+    os.environ.pop("DATABASE_REPLICA_URLS", None)
+    os.environ.setdefault("CATALOG_SNAPSHOT_DIR", tempfile.mkdtemp())
+
+    from . import dataset as bench_dataset
+    from ..database import Base, SessionLocal, engine
+
+    Base.metadata.create_all(bind=engine)
+    db = SessionLocal()
+    try:
+        start = time.perf_counter()
+        if args.reuse:
+            dataset = bench_dataset.load(db)
+        else:
+            dataset = bench_dataset.seed(db, args.products, args.users, args.orders, args.max_items, args.seed)
+        seeded_in = time.perf_counter() - start
+        if not dataset.product_ids or not dataset.user_uids:
+            raise SystemExit("the database has no benchmark products / users; run without --reuse first")
+        cart_ids = []
+        if "checkout" in scenarios:
+            rng = random.Random(args.seed)
+            uids = [rng.choice(dataset.user_uids) for _ in range(args.requests + args.warmup)]
+            cart_ids = bench_dataset.create_carts(db, uids, dataset.product_ids, args.seed)
+    finally:
+        db.close()
+
+    print(f"{engine.dialect.name}: {len(dataset.product_ids)} products, {len(dataset.user_uids)} users "
+          f"({'reused' if args.reuse else f'seeded in {seeded_in:.1f}s'}), "
+          f"{args.requests} requests per scenario, concurrency {args.concurrency}")
+    scenario_results = asyncio.run(run(args, dataset, cart_ids, scenarios))
+
+    results = {
+        "meta": {
+            "commit": git_commit(),
+            "timestamp": datetime.now().isoformat(timespec="seconds"),
+            "dialect": engine.dialect.name,
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "scale": {
+                "products": len(dataset.product_ids),
+                "users": len(dataset.user_uids),
+                "orders": None if args.reuse else args.orders,
+            },
+            "requests": args.requests,
+            "warmup": args.warmup,
+            "concurrency": args.concurrency,
+            "seed": args.seed,
+        },
+        "scenarios": scenario_results,
+    }
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2)
+        print(f"results written to {args.output}")
+    if args.baseline:
+        compare(results, args.baseline)
+    return 0 if all(r["errors"] == 0 for r in scenario_results.values()) else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,149 @@
+# ----------------------------------------
+# Benchmark: HTTP throughput under concurrent clients
+# ----------------------------------------
+# Seeds --products products in a few categories and --users users with a
+# cart, serves the app with uvicorn in this process and drives it over real
+# sockets with 50 / 100 / 200 concurrent keep-alive clients. Each client
+# loops over a read-heavy mix (product list, product detail, products by
+# category, categories, cart) for --duration seconds. Reports requests/s and
+# p50/p95/p99 latency per concurrency level. By default a temporary SQLite
+# file is used; point DATABASE_URL (and ASYNC_DATABASE_URL if the async
+# driver can't be derived) at a scratch database to measure a real one.
+#
+#   python -m backend_api.benchmarks.load [--clients 50,100,200] [--duration 10]
+import argparse
+import asyncio
+import os
+import random
+import socket
+import tempfile
+import threading
+import time
+from decimal import Decimal
+
+os.environ.setdefault("DATABASE_URL", f"sqlite:///{os.path.join(tempfile.mkdtemp(), 'load_bench.db')}")
+os.environ.setdefault("CATALOG_SNAPSHOT_DIR", tempfile.mkdtemp())
+
+import httpx
+import uvicorn
+from sqlalchemy import insert
+
+from ..database import Base, SessionLocal, engine
+from ..main import app
+from ..models import Category, Order, OrderItem, Product, ProductCategory, User
+
+
+def seed(products: int, users: int):
+    db = SessionLocal()
+    try:
+        category_ids = db.execute(
+            insert(Category).returning(Category.id, sort_by_parameter_order=True),
+            [{"name": f"Load category {i}", "description": "Benchmark category"} for i in range(5)],
+        ).scalars().all()
+        product_ids = db.execute(
+            insert(Product).returning(Product.id, sort_by_parameter_order=True),
+            [{"name": f"Load product {i}", "description": "A reasonably long product description " * 4,
+              "price": Decimal("19.99"), "stock_quantity": 1000} for i in range(products)],
+        ).scalars().all()
+        db.execute(insert(ProductCategory), [
+            {"product_id": product_id, "category_id": category_ids[i % len(category_ids)]}
+            for i, product_id in enumerate(product_ids)
+        ])
+        uids = [f"load-{i}" for i in range(users)]
+        db.execute(insert(User), [{"uid": uid, "provider": "email", "identifier": f"{uid}@example.com"} for uid in uids])
+        order_ids = db.execute(
+            insert(Order).returning(Order.id, sort_by_parameter_order=True),
+            [{"user_uid": uid, "status": 1, "total_amount": Decimal("39.98")} for uid in uids],
+        ).scalars().all()
+        db.execute(insert(OrderItem), [
+            {"order_id": order_id, "product_id": product_ids[i % len(product_ids)], "quantity": 2,
+             "price_per_unit": Decimal("19.99")}
+            for i, order_id in enumerate(order_ids)
+        ])
+        db.commit()
+        return category_ids, product_ids, uids
+    finally:
+        db.close()
+
+
+def request_mix(category_ids, product_ids, uids):
+    """Paths in the rough proportion a browsing client requests them"""
+    return [
+        lambda: f"/products/?limit=20&skip={random.randrange(0, max(1, len(product_ids) - 20))}",
+        lambda: f"/products/{random.choice(product_ids)}",
+        lambda: f"/products/{random.choice(product_ids)}",
+        lambda: f"/products/category/{random.choice(category_ids)}?limit=20",
+        lambda: "/categories/",
+        lambda: f"/users/{random.choice(uids)}/cart/",
+    ]
+
+
+def start_server(port: int) -> uvicorn.Server:
+    server = uvicorn.Server(uvicorn.Config(app, host="127.0.0.1", port=port, log_level="warning", access_log=False))
+    threading.Thread(target=server.run, daemon=True).start()
+    while not server.started:
+        time.sleep(0.05)
+    return server
+
+
+async def run_level(base_url: str, clients: int, duration: float, mix):
+    latencies, errors = [], 0
+    deadline = time.perf_counter() + duration
+    limits = httpx.Limits(max_connections=clients, max_keepalive_connections=clients)
+
+    async with httpx.AsyncClient(base_url=base_url, limits=limits, timeout=30) as client:
+        async def worker():
+            nonlocal errors
+            while time.perf_counter() < deadline:
+                path = random.choice(mix)()
+                start = time.perf_counter()
+                try:
+                    response = await client.get(path)
+                    if response.status_code >= 400:
+                        errors += 1
+                except httpx.HTTPError:
+                    errors += 1
+                latencies.append(time.perf_counter() - start)
+
+        start = time.perf_counter()
+        await asyncio.gather(*(worker() for _ in range(clients)))
+        elapsed = time.perf_counter() - start
+    return sorted(latencies), errors, elapsed
+
+
+def percentile(values, fraction: float) -> float:
+    return values[min(len(values) - 1, int(len(values) * fraction))]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="HTTP throughput under concurrent clients")
+    parser.add_argument("--clients", default="50,100,200", help="comma separated concurrency levels")
+    parser.add_argument("--duration", type=float, default=10, help="seconds per concurrency level")
+    parser.add_argument("--products", type=int, default=2000)
+    parser.add_argument("--users", type=int, default=500)
+    parser.add_argument("--port", type=int, default=0, help="0 picks a free port")
+    args = parser.parse_args()
+
+    Base.metadata.create_all(bind=engine)
+    mix = request_mix(*seed(args.products, args.users))
+
+    port = args.port
+    if not port:
+        with socket.socket() as s:
+            s.bind(("127.0.0.1", 0))
+            port = s.getsockname()[1]
+    server = start_server(port)
+
+    print(f"{engine.dialect.name}: {args.products} products, {args.users} carts, {args.duration:.0f}s per level")
+    try:
+        for clients in (int(value) for value in args.clients.split(",")):
+            latencies, errors, elapsed = asyncio.run(run_level(f"http://127.0.0.1:{port}", clients, args.duration, mix))
+            print(f"  {clients:>4} clients  {len(latencies) / elapsed:7.0f} req/s  "
+                  f"p50 {percentile(latencies, 0.5) * 1000:7.1f} ms  p95 {percentile(latencies, 0.95) * 1000:7.1f} ms  "
+                  f"p99 {percentile(latencies, 0.99) * 1000:7.1f} ms  errors {errors}")
+    finally:
+        server.should_exit = True
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,123 @@
+# ----------------------------------------
+# Benchmark: login storm on POST /users/ (create_or_update_user)
+# ----------------------------------------
+# Replays --logins logins spread over --users uids from --workers threads,
+# first with the previous select / mutate / commit / refresh implementation,
+# then with the single-statement upsert. Every uid is logged in by several
+# threads at once on its first round, which is where the old code raced into
+# unique-violation errors. Reports logins/s, latency percentiles, SQL
+# statements per login and errors. Run it against a scratch database
+# (DATABASE_URL); by default a temporary SQLite file is used.
+#
+#   python -m backend_api.benchmarks.login [--users 2000] [--logins 20000] [--workers 16]
+import argparse
+import os
+import random
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+
+os.environ.setdefault("DATABASE_URL", f"sqlite:///{os.path.join(tempfile.mkdtemp(), 'login_bench.db')}")
+
+from sqlalchemy import delete, event
+
+from ..crud.users import _get_user_row, create_or_update_user
+from ..database import Base, SessionLocal, engine
+from ..models import User
+
+
+def legacy_create_or_update_user(db, user_data: dict):
+    """What create_or_update_user did before the upsert (without the password hashing)"""
+    user = _get_user_row(db, user_data["uid"])
+    if user:
+        for key, value in user_data.items():
+            if value is not None and hasattr(user, key):
+                setattr(user, key, value)
+        user.updated_at = datetime.now()
+    else:
+        user = User(**user_data)
+        db.add(user)
+    user.last_login = datetime.now()
+    db.commit()
+    db.refresh(user)
+    return user
+
+
+_statements = threading.local()
+
+
+def _count(conn, cursor, statement, parameters, context, executemany):
+    _statements.count = getattr(_statements, "count", 0) + 1
+
+
+def login(fn, payload: dict):
+    db = SessionLocal()
+    _statements.count = 0
+    start = time.perf_counter()
+    try:
+        fn(db, dict(payload))
+        error = None
+    except Exception as e:  # unique violations, lock timeouts: counted, not hidden
+        db.rollback()
+        error = type(e).__name__
+    finally:
+        db.close()
+    return time.perf_counter() - start, _statements.count, error
+
+
+def percentile(values, fraction: float) -> float:
+    return values[min(len(values) - 1, int(len(values) * fraction))]
+
+
+def storm(fn, payloads, workers: int):
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        results = list(pool.map(lambda payload: login(fn, payload), payloads))
+    return results, time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Login storm: legacy select-then-write vs upsert")
+    parser.add_argument("--users", type=int, default=2000)
+    parser.add_argument("--logins", type=int, default=20000)
+    parser.add_argument("--workers", type=int, default=16)
+    parser.add_argument("--first-login-threads", type=int, default=4, help="simultaneous first logins per uid")
+    args = parser.parse_args()
+
+    Base.metadata.create_all(bind=engine)
+    event.listen(engine, "before_cursor_execute", _count)
+    rng = random.Random(42)
+
+    def payload(i: int) -> dict:
+        uid = f"login-bench-{i}"
+        return {
+            "uid": uid, "provider": "email", "identifier": f"{uid}@example.com", "is_active": True,
+            "display_name": rng.choice([None, f"User {i}"]), "photo_url": None,
+        }
+
+    # First round: every uid several times at once; then random repeat logins
+    first = [payload(i) for i in range(args.users) for _ in range(args.first_login_threads)]
+    repeat = [payload(rng.randrange(args.users)) for _ in range(max(0, args.logins - len(first)))]
+
+    print(f"{engine.dialect.name}: {args.users} users, {len(first) + len(repeat)} logins, {args.workers} workers")
+    for name, fn in (("legacy", legacy_create_or_update_user), ("upsert", create_or_update_user)):
+        with engine.begin() as connection:
+            connection.execute(delete(User).where(User.uid.like("login-bench-%")))
+        results, elapsed = storm(fn, first + repeat, args.workers)
+        latencies = sorted(latency for latency, _, _ in results)
+        statements = sum(count for _, count, _ in results)
+        errors = {}
+        for _, _, error in results:
+            if error:
+                errors[error] = errors.get(error, 0) + 1
+        with SessionLocal() as db:
+            rows = db.query(User).filter(User.uid.like("login-bench-%")).count()
+        print(f"  {name:<7} {len(results) / elapsed:8.0f} logins/s  p50 {percentile(latencies, 0.5) * 1000:6.2f} ms  "
+              f"p95 {percentile(latencies, 0.95) * 1000:6.2f} ms  p99 {percentile(latencies, 0.99) * 1000:6.2f} ms  "
+              f"{statements / len(results):.2f} statements/login  users {rows}  errors {errors or 0}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,144 @@
+# ----------------------------------------
+# Benchmark: other routes' latency during a burst of logins
+# ----------------------------------------
+# Drives the FastAPI app in-process (httpx ASGI transport) and measures
+# GET /products/{id} latency three times:
+#
+#   idle      no logins running
+#   pool      --logins concurrent POST /users/verify-password loops, hashing
+#             in the bounded pool of utils/auth (what the app does)
+#   inline    the same burst with the hashing run on the event loop, i.e.
+#             what calling scrypt directly from the async endpoints would do
+#
+# The users start with legacy SHA-256 hashes, so the first pool round also
+# exercises the rehash on login; the number of rows converted to scrypt is
+# reported. Cost parameters come from PASSWORD_SCRYPT_* as in the app.
+#
+#   python -m backend_api.benchmarks.password_burst [--users 50] [--logins 8] [--probes 100]
+import argparse
+import asyncio
+import os
+import random
+import sys
+import tempfile
+import time
+from typing import List
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Product route latency during a burst of password checks")
+    parser.add_argument("--database-url", help="default: a fresh temporary SQLite file")
+    parser.add_argument("--products", type=int, default=1000)
+    parser.add_argument("--users", type=int, default=50)
+    parser.add_argument("--logins", type=int, default=8, help="concurrent login loops during the burst")
+    parser.add_argument("--probes", type=int, default=100, help="timed product requests per phase")
+    return parser.parse_args()
+
+
+def percentile(values: List[float], fraction: float) -> float:
+    return values[min(len(values) - 1, int(len(values) * fraction))]
+
+
+async def probe(client, product_ids: List[int], count: int, rng: random.Random) -> List[float]:
+    latencies = []
+    for _ in range(count):
+        start = time.perf_counter()
+        response = await client.get(f"/products/{rng.choice(product_ids)}")
+        latencies.append(time.perf_counter() - start)
+        response.raise_for_status()
+    return sorted(latencies)
+
+
+async def phase(client, product_ids, uids, args, logins: int, rng: random.Random):
+    done = asyncio.Event()
+    checks = failures = 0
+
+    async def login_loop():
+        nonlocal checks, failures
+        while not done.is_set():
+            uid = rng.choice(uids)
+            response = await client.post("/users/verify-password", params={"uid": uid, "password": f"pw-{uid}"})
+            checks += 1
+            if not response.json().get("valid"):
+                failures += 1
+
+    loops = [asyncio.create_task(login_loop()) for _ in range(logins)]
+    start = time.perf_counter()
+    latencies = await probe(client, product_ids, args.probes, rng)
+    elapsed = time.perf_counter() - start
+    done.set()
+    await asyncio.gather(*loops)
+    return latencies, checks / elapsed, failures
+
+
+async def run(args, product_ids: List[int], uids: List[str]):
+    import httpx
+
+    from ..main import app
+    from ..utils import auth
+
+    async def inline(fn, *a):
+        return fn(*a)
+
+    rng = random.Random(42)
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        await probe(client, product_ids, 50, rng)  # warm up caches and connections
+        pooled = auth._run
+        for name, logins, runner in (("idle", 0, pooled), ("pool", args.logins, pooled),
+                                     ("inline", args.logins, inline)):
+            auth._run = runner
+            try:
+                latencies, rate, failures = await phase(client, product_ids, uids, args, logins, rng)
+            finally:
+                auth._run = pooled
+            print(f"  {name:<7} p50 {percentile(latencies, 0.5) * 1000:8.2f} ms  "
+                  f"p95 {percentile(latencies, 0.95) * 1000:8.2f} ms  p99 {percentile(latencies, 0.99) * 1000:8.2f} ms  "
+                  f"max {latencies[-1] * 1000:8.2f} ms  logins {rate:6.1f}/s  failed {failures}")
+
+
+def main():
+    args = parse_args()
+    # Never fall back to the developer's configured database
+    os.environ["DATABASE_URL"] = args.database_url or (
+        f"sqlite:///{os.path.join(tempfile.mkdtemp(), 'password_burst.db')}"
+    )
+    os.environ.pop("DATABASE_REPLICA_URLS", None)
+    os.environ.setdefault("CATALOG_SNAPSHOT_DIR", tempfile.mkdtemp())
+
+    from sqlalchemy import delete, func, insert, select
+
+    from . import dataset as bench_dataset
+    from ..database import Base, SessionLocal, engine
+    from ..models import User
+    from ..utils import auth
+
+    Base.metadata.create_all(bind=engine)
+    db = SessionLocal()
+    try:
+        dataset = bench_dataset.seed(db, args.products, 0, 0)
+        uids = [f"password-bench-{i}" for i in range(args.users)]
+        db.execute(delete(User).where(User.uid.like("password-bench-%")))
+        db.execute(insert(User), [
+            {"uid": uid, "provider": "email", "identifier": f"{uid}@example.com",
+             "password_hash": auth._legacy_hash(f"pw-{uid}")}
+            for uid in uids
+        ])
+        db.commit()
+    finally:
+        db.close()
+
+    print(f"{engine.dialect.name}: scrypt n={auth.PASSWORD_SCRYPT_N} r={auth.PASSWORD_SCRYPT_R} "
+          f"p={auth.PASSWORD_SCRYPT_P}, {auth.PASSWORD_HASH_WORKERS} hash workers, {args.logins} login loops, "
+          f"{args.probes} product requests per phase")
+    asyncio.run(run(args, dataset.product_ids, uids))
+
+    with SessionLocal() as db:
+        upgraded = db.scalar(select(func.count()).select_from(User).where(
+            User.uid.in_(uids), User.password_hash.like("scrypt$%")))
+    print(f"  legacy hashes rehashed to scrypt: {upgraded}/{len(uids)}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,240 @@
+# ----------------------------------------
+# Check: query plans of the hot paths, without and with the indexes
+# ----------------------------------------
+# Seeds a database (benchmarks/dataset.py), captures the SQL that the crud
+# functions behind the hot endpoints actually emit and EXPLAINs every
+# statement twice: with only the primary keys and unique constraints (the
+# schema before migration 0003), then with the full index set of the models
+# (what alembic upgrade head creates). Each table access is classified as
+#
+#   search   index lookup
+#   index    scan of an index (in index order or covering)
+#   SCAN     full table scan
+#
+# and the exit status is 1 if a path that should be indexed still scans a
+# table. SQLite, PostgreSQL and MySQL plans are understood. A temporary
+# SQLite file is used unless --database-url is given; DATABASE_URL from the
+# environment is ignored. The tables are dropped and rebuilt, so a
+# --database-url also needs --yes-drop.
+#
+#   python -m backend_api.benchmarks.query_plans [--database-url ... --yes-drop] [--products 20000] [--verbose]
+import argparse
+import os
+import re
+import sys
+import tempfile
+from typing import Callable, Dict, List, Tuple
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Query plans of the hot paths without and with indexes")
+    parser.add_argument("--database-url", help="default: a temporary SQLite file (the tables are dropped and rebuilt)")
+    parser.add_argument("--yes-drop", action="store_true",
+                        help="allow dropping and rebuilding every table of --database-url")
+    parser.add_argument("--products", type=int, default=20000)
+    parser.add_argument("--users", type=int, default=2000)
+    parser.add_argument("--orders", type=int, default=20000)
+    parser.add_argument("--verbose", action="store_true", help="print the full plans")
+    return parser.parse_args()
+
+
+def hot_paths(dataset) -> List[Tuple[str, bool, Callable]]:
+    """(name, must avoid table scans, function(db) running the path's queries)"""
+    from ..crud import categories as crud_categories
+    from ..crud import orders as crud_orders
+    from ..crud import products as crud_products
+    from sqlalchemy import exists, select
+
+    from ..crud import shipping_address as crud_addresses
+    from ..models import ShippingAddress
+    from ..utils.address import address_hash
+
+    product_id = dataset.product_ids[len(dataset.product_ids) // 2]
+    category_id = dataset.category_ids[0]
+    uid = dataset.user_uids[len(dataset.user_uids) // 2]
+    page_ids = dataset.product_ids[:20]
+    return [
+        ("product list page", True, lambda db: crud_products.get_products_page(db, limit=20)),
+        ("product list by price", True, lambda db: crud_products.get_products_page(db, limit=20, sort="price")),
+        ("products of a category", True,
+         lambda db: crud_products.get_products_page(db, limit=20, category_id=category_id)),
+        ("category list page", True, lambda db: crud_categories.get_categories_page(db, limit=20)),
+        ("categories of a page", True, lambda db: crud_products.get_categories_for_products(db, page_ids)),
+        ("product detail validator", True, lambda db: crud_products.get_product_version(db, product_id)),
+        ("catalog validator", False, crud_products.get_catalog_version),
+        ("user cart", True, lambda db: crud_orders.get_user_cart(db, uid)),
+        ("user cart validator", True, lambda db: crud_orders.get_user_cart_version(db, uid)),
+        ("order history", True, lambda db: crud_orders.get_orders_by_user_page(db, uid, limit=20)),
+        ("order history by status", True,
+         lambda db: crud_orders.get_orders_by_user_page(db, uid, limit=20, status=3)),
+        ("admin orders by status", True, lambda db: crud_orders.get_orders_page(db, status=2, limit=20)),
+        ("addresses of a user", True, lambda db: crud_addresses.get_addresses_by_user(db, uid)),
+        # the NOT EXISTS probe of create_shipping_address
+        ("address duplicate check", True, lambda db: db.scalar(select(exists().where(
+            ShippingAddress.user_uid == uid, ShippingAddress.address_hash == address_hash("1 Benchmark Street"))))),
+    ]
+
+
+def explain(connection, statement: str, parameters) -> List[str]:
+    dialect = connection.dialect.name
+    prefix = {"sqlite": "EXPLAIN QUERY PLAN ", "mysql": "EXPLAIN ", "mariadb": "EXPLAIN "}.get(dialect, "EXPLAIN ")
+    cursor = connection.connection.cursor()
+    try:
+        cursor.execute(prefix + statement, parameters)
+        rows = cursor.fetchall()
+        columns = [column[0] for column in cursor.description]
+    finally:
+        cursor.close()
+    if dialect == "sqlite":
+        return [row[-1] for row in rows]
+    if dialect in ("mysql", "mariadb"):
+        return [" ".join(f"{name}={value}" for name, value in zip(columns, row) if value is not None) for row in rows]
+    return [row[0] for row in rows]
+
+
+_SQLITE_SCAN = re.compile(r"^SCAN (\w+)(?: AS \w+)?$")
+_RANK = {"search": 0, "index": 1, "SCAN": 2}
+
+
+def _note(accesses: Dict[str, str], table: str, access: str):
+    """Keep the worst access of each table"""
+    if _RANK[access] > _RANK.get(accesses.get(table), -1):
+        accesses[table] = access
+
+
+def classify(dialect: str, plan: List[str]) -> Dict[str, str]:
+    """table -> search / index / SCAN (the worst access of the table in the plan)"""
+    accesses: Dict[str, str] = {}
+    for line in plan:
+        line = line.strip()
+        if dialect == "sqlite":
+            words = line.split()
+            if line.startswith("SEARCH "):
+                _note(accesses, words[1], "search")
+            elif line.startswith("SCAN ") and not line.startswith("SCAN CONSTANT"):
+                _note(accesses, words[1], "SCAN" if _SQLITE_SCAN.match(line) else "index")
+        elif dialect in ("mysql", "mariadb"):
+            fields = dict(part.split("=", 1) for part in line.split() if "=" in part)
+            table = fields.get("table")
+            if table:
+                access = fields.get("type", "")
+                _note(accesses, table, "SCAN" if access == "ALL" else "index" if access == "index" else "search")
+        else:
+            match = re.search(r"(Seq Scan|Index Only Scan|Index Scan|Bitmap Heap Scan) on (\w+)", line)
+            if match:
+                kind, table = match.groups()
+                _note(accesses, table, "SCAN" if kind == "Seq Scan" else "search")
+    return accesses
+
+
+def capture(engine, db, fn) -> List[Tuple[str, object]]:
+    from sqlalchemy import event
+
+    statements = []
+
+    def before(conn, cursor, statement, parameters, context, executemany):
+        statements.append((statement, parameters))
+
+    event.listen(engine, "before_cursor_execute", before)
+    try:
+        fn(db)
+    finally:
+        event.remove(engine, "before_cursor_execute", before)
+        db.rollback()
+    return statements
+
+
+def run_paths(engine, SessionLocal, paths, verbose: bool) -> Dict[str, Dict[str, str]]:
+    results = {}
+    db = SessionLocal()
+    try:
+        for name, _, fn in paths:
+            accesses: Dict[str, str] = {}
+            for statement, parameters in capture(engine, db, fn):
+                with engine.connect() as connection:
+                    plan = explain(connection, statement, parameters)
+                if verbose:
+                    print(f"    [{name}] {' '.join(statement.split())[:160]}")
+                    for line in plan:
+                        print(f"        {line}")
+                for table, access in classify(engine.dialect.name, plan).items():
+                    _note(accesses, table, access)
+            results[name] = accesses
+    finally:
+        db.close()
+    return results
+
+
+def set_indexes(engine, Base, present: bool):
+    """Drop (present=False) or create every non-unique index of the models, then refresh statistics"""
+    from sqlalchemy import text
+
+    for table in Base.metadata.sorted_tables:
+        for index in table.indexes:
+            if index.unique:
+                continue
+            if present:
+                index.create(bind=engine, checkfirst=True)
+            else:
+                index.drop(bind=engine, checkfirst=True)
+    with engine.begin() as connection:
+        if engine.dialect.name in ("sqlite", "postgresql"):
+            connection.execute(text("ANALYZE"))
+        elif engine.dialect.name in ("mysql", "mariadb"):
+            for table in Base.metadata.sorted_tables:
+                connection.execute(text(f"ANALYZE TABLE {table.name}"))
+
+
+def summary(accesses: Dict[str, str]) -> str:
+    return ", ".join(f"{table} {access}" for table, access in sorted(accesses.items())) or "-"
+
+
+def main():
+    args = parse_args()
+    if args.database_url and not args.yes_drop:
+        print(f"refusing to drop every table of {args.database_url}; add --yes-drop if that's a scratch database",
+              file=sys.stderr)
+        return 2
+    # The database modules read DATABASE_URL at import time; never fall back
+    # to the developer's configured database
+    os.environ["DATABASE_URL"] = args.database_url or (
+        f"sqlite:///{os.path.join(tempfile.mkdtemp(), 'query_plans.db')}"
+    )
+    os.environ.pop("DATABASE_REPLICA_URLS", None)
+    os.environ.setdefault("CATALOG_SNAPSHOT_DIR", tempfile.mkdtemp())
+    os.environ["PRODUCT_CACHE_ENABLED"] = "false"  # every lookup must reach the database
+
+    from . import dataset as bench_dataset
+    from ..database import Base, SessionLocal, engine
+
+    Base.metadata.drop_all(bind=engine)
+    Base.metadata.create_all(bind=engine)
+    db = SessionLocal()
+    try:
+        dataset = bench_dataset.seed(db, args.products, args.users, args.orders)
+        # a few carts, so the cart paths have rows to find
+        bench_dataset.create_carts(db, dataset.user_uids[::10], dataset.product_ids)
+    finally:
+        db.close()
+
+    paths = hot_paths(dataset)
+    print(f"{engine.dialect.name}: {args.products} products, {args.users} users, {args.orders} orders")
+    print("  without indexes (primary keys and unique constraints only)")
+    set_indexes(engine, Base, present=False)
+    before = run_paths(engine, SessionLocal, paths, args.verbose)
+    print("  with the model / migration indexes")
+    set_indexes(engine, Base, present=True)
+    after = run_paths(engine, SessionLocal, paths, args.verbose)
+
+    failures = []
+    for name, must_use_index, _ in paths:
+        scans = [table for table, access in after[name].items() if access == "SCAN"]
+        status = "ok" if not scans else ("FAIL" if must_use_index else "note")
+        if scans and must_use_index:
+            failures.append(name)
+        print(f"  [{status:>4}] {name:<26} {summary(before[name])}  ->  {summary(after[name])}")
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,115 @@
+# ----------------------------------------
+# Benchmark: CPU time to serialize a 100-product page
+# ----------------------------------------
+# Compares the previous response path (hand-built dict -> CategoryResponse /
+# ProductResponse -> response_model re-validation -> jsonable dump -> json.dumps)
+# with utils.serialization (row -> dict -> orjson). No database is needed;
+# the rows are transient ORM objects.
+#
+#   python -m backend_api.benchmarks.serialization [--products 100] [--repeat 500]
+import argparse
+import json
+import os
+import time
+from datetime import datetime
+from decimal import Decimal
+from typing import List
+
+os.environ.setdefault("DATABASE_URL", "sqlite://")
+
+from pydantic import TypeAdapter
+
+from ..models import Category, Product
+from ..schemas import CategoryResponse, ProductResponse
+from ..utils import serialization
+
+
+def build_page(count: int):
+    now = datetime(2025, 1, 1, 12, 0, 0)
+    categories = [
+        Category(id=i, name=f"Category {i}", description="Benchmark category", is_active=True,
+                 created_at=now, updated_at=now)
+        for i in range(1, 4)
+    ]
+    products = [
+        Product(
+            id=i, name=f"Product {i}", description="A reasonably long product description " * 4,
+            image_url=f"https://example.com/img/{i}.jpg", price=Decimal("19.99"), sold_count=i * 7,
+            rating=Decimal("4.50"), review_count=i, delivery_info="Free delivery", seller_info="Seller",
+            stock_quantity=100, is_active=True, created_at=now, updated_at=now,
+        )
+        for i in range(1, count + 1)
+    ]
+    categories_by_product = {product.id: categories[: 1 + product.id % 3] for product in products}
+    return products, categories_by_product
+
+
+_product_list = TypeAdapter(List[ProductResponse])
+
+
+def legacy_response(products, categories_by_product) -> bytes:
+    """What GET /products/ used to do for one page"""
+    result = []
+    for product in products:
+        categories = [
+            CategoryResponse(
+                id=c.id, name=c.name, description=c.description, is_active=c.is_active,
+                created_at=c.created_at, updated_at=c.updated_at,
+            )
+            for c in categories_by_product[product.id]
+        ]
+        result.append(ProductResponse(
+            id=product.id, name=product.name, description=product.description,
+            image_url=product.image_url, price=product.price, sold_count=product.sold_count,
+            rating=product.rating, review_count=product.review_count,
+            delivery_info=product.delivery_info, seller_info=product.seller_info,
+            stock_quantity=product.stock_quantity, is_active=product.is_active,
+            categories=categories, created_at=product.created_at, updated_at=product.updated_at,
+        ))
+    # FastAPI: dump the returned models, validate against response_model, then encode
+    content = [item.model_dump() for item in result]
+    validated = _product_list.validate_python(content)
+    return json.dumps(
+        _product_list.dump_python(validated, mode="json"),
+        ensure_ascii=False, allow_nan=False, indent=None, separators=(",", ":"),
+    ).encode("utf-8")
+
+
+def fast_response(products, categories_by_product) -> bytes:
+    return serialization.products_response(products, categories_by_product).body
+
+
+def measure(fn, products, categories_by_product, repeat: int) -> List[float]:
+    fn(products, categories_by_product)  # warm up
+    timings = []
+    for _ in range(repeat):
+        start = time.process_time()
+        fn(products, categories_by_product)
+        timings.append(time.process_time() - start)
+    return timings
+
+
+def main():
+    parser = argparse.ArgumentParser(description="CPU time to serialize a product page")
+    parser.add_argument("--products", type=int, default=100)
+    parser.add_argument("--repeat", type=int, default=500)
+    args = parser.parse_args()
+
+    products, categories_by_product = build_page(args.products)
+    if json.loads(legacy_response(products, categories_by_product)) != json.loads(fast_response(products, categories_by_product)):
+        raise SystemExit("legacy and fast responses differ")
+
+    encoder = "orjson" if serialization.orjson is not None else "json"
+    results = {}
+    for name, fn in (("legacy", legacy_response), (f"fast ({encoder})", fast_response)):
+        timings = sorted(measure(fn, products, categories_by_product, args.repeat))
+        results[name] = sum(timings) / len(timings)
+        print(f"{name:<14} mean {results[name] * 1000:7.3f} ms  "
+              f"p50 {timings[len(timings) // 2] * 1000:7.3f} ms  "
+              f"p95 {timings[int(len(timings) * 0.95)] * 1000:7.3f} ms  CPU per {args.products}-product page")
+    legacy, fast = results.values()
+    print(f"speed-up: {legacy / fast:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
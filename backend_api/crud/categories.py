@@ -1,8 +1,12 @@
 #CRUD for categories
+from typing import List, Optional, Tuple
+from sqlalchemy import func
 from sqlalchemy.orm import Session
 
 from ..models import Category 
 from ..schemas import CategoryCreate 
+from ..utils.pagination import paginate
+from ..utils.snapshot import catalog_snapshot
 
 
 def get_category_by_id(db: Session, category_id: int):
@@ -10,11 +14,23 @@ def get_category_by_id(db: Session, category_id: int):
 
 #might change
 def get_categories(db: Session, skip: int = 0, limit: int = 100):
-    return db.query(Category).filter(Category.is_active == True).offset(skip).limit(limit).all()
+    categories, _ = get_categories_page(db, skip=skip, limit=limit)
+    return categories
+
+def get_categories_page(
+        db: Session, skip: int = 0, limit: int = 100, cursor: Optional[str] = None
+    ) -> Tuple[List[Category], Optional[str]]:
+    query = db.query(Category).filter(Category.is_active == True)
+    return paginate(query, [Category.id], skip=skip, limit=limit, cursor=cursor)
+
+def get_categories_version(db: Session) -> Tuple:
+    """(count, max(updated_at)) of the categories table, the validator of category lists"""
+    return tuple(db.query(func.count(Category.id), func.max(Category.updated_at)).one())
 
 def create_category(db: Session, category: CategoryCreate):
     db_category = Category(**category.model_dump())
     db.add(db_category)
     db.commit()
     db.refresh(db_category)
+    catalog_snapshot.mark_categories()
     return db_category
\ No newline at end of file
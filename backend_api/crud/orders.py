@@ -1,52 +1,158 @@
 # CRUD for orders
 from datetime import datetime, timezone
-from sqlalchemy.orm import Session
-
-from ..schemas import OrderCreate, OrderUpdate
-from ..crud.products import get_product_by_id
-from ..models import Order, OrderItem, ShippingAddress  # Import ShippingAddress
+from decimal import Decimal
+from typing import Dict, List, Optional, Tuple
+from sqlalchemy import and_, case, delete, func, insert, select, update
+from sqlalchemy.orm import Session, selectinload
+
+from ..schemas import CartItemOperation, OrderCreate, OrderUpdate
+from ..crud.products import get_product_by_id, invalidate_products
+from ..models import Order, OrderItem, Product, ShippingAddress  # Import ShippingAddress
 from .shipping_address import get_address_by_id  # Import get_address_by_id
+from ..utils.pagination import paginate
 
 
 def get_order_by_id(db: Session, order_id: int):
     return db.query(Order).filter(Order.id == order_id).first()
 
 
-def get_orders_by_user(db: Session, user_uid: str, skip: int = 0, limit: int = 100):
-    return db.query(Order).filter(Order.user_uid == user_uid).offset(skip).limit(limit)
+def _with_order_graph(query):
+    """Load items and shipping addresses of every order in a page with one query each"""
+    return query.options(selectinload(Order.items), selectinload(Order.shipping_address_obj))
+
+
+def get_orders_by_user(
+    db: Session, user_uid: str, skip: int = 0, limit: int = 100, status: Optional[int] = None
+) -> List[Order]:
+    orders, _ = get_orders_by_user_page(db, user_uid, skip=skip, limit=limit, status=status)
+    return orders
+
+
+def get_orders_by_user_page(
+    db: Session,
+    user_uid: str,
+    skip: int = 0,
+    limit: int = 100,
+    cursor: Optional[str] = None,
+    status: Optional[int] = None,
+) -> Tuple[List[Order], Optional[str]]:
+    """A user's orders (optionally by status), newest first, keyed on (created_at, id) for cursor paging"""
+    query = db.query(Order).filter(Order.user_uid == user_uid)
+    if status is not None:
+        query = query.filter(Order.status == status)
+    return paginate(
+        _with_order_graph(query), [Order.created_at, Order.id],
+        skip=skip, limit=limit, cursor=cursor, descending=True
+    )
+
+
+def get_orders_page(
+    db: Session, status: Optional[int] = None, skip: int = 0, limit: int = 100, cursor: Optional[str] = None
+) -> Tuple[List[Order], Optional[str]]:
+    """All orders (optionally by status), newest first, keyed on (created_at, id)"""
+    query = db.query(Order)
+    if status is not None:
+        query = query.filter(Order.status == status)
+    return paginate(
+        _with_order_graph(query), [Order.created_at, Order.id],
+        skip=skip, limit=limit, cursor=cursor, descending=True
+    )
 
 
 def get_user_cart(db: Session, uid: str):
     return db.query(Order).filter(Order.user_uid == uid, Order.status == 1).first()
 
 
+def get_user_cart_version(db: Session, uid: str) -> Optional[Tuple]:
+    """
+    (id, updated_at, total, item count, total quantity, max item id, address
+    updated_at) of the user's cart in one query, or None if there is no cart
+    """
+    def items(column):
+        return select(column).where(OrderItem.order_id == Order.id).correlate(Order).scalar_subquery()
+
+    address_updated = (
+        select(ShippingAddress.updated_at)
+        .where(ShippingAddress.id == Order.shipping_address_id)
+        .correlate(Order)
+        .scalar_subquery()
+    )
+    row = (
+        db.query(
+            Order.id,
+            Order.updated_at,
+            Order.total_amount,
+            items(func.count(OrderItem.id)),
+            items(func.coalesce(func.sum(OrderItem.quantity), 0)),
+            items(func.max(OrderItem.id)),
+            address_updated,
+        )
+        .filter(Order.user_uid == uid, Order.status == 1)
+        .first()
+    )
+    return tuple(row) if row is not None else None
+
+
 # may need OrderItem.order_id to be unique
-def calculate_order_total(db: Session, order_id: int):
-    items = db.query(OrderItem).filter(OrderItem.order_id == order_id)
-    total = sum(float(item.price_per_unit) * item.quantity for item in items)
-    return total
+def calculate_order_total(db: Session, order_id: int) -> Decimal:
+    total = (
+        db.query(func.coalesce(func.sum(OrderItem.quantity * OrderItem.price_per_unit), 0))
+        .filter(OrderItem.order_id == order_id)
+        .scalar()
+    )
+    return Decimal(str(total)).quantize(Decimal("0.01"))
 
 
-def _process_order_items(db: Session, order_id: int, items_data: list) -> float:
+def _process_order_items(db: Session, order_id: int, items_data: list, existing_items: Optional[List[OrderItem]] = None) -> Decimal:
     """
-    Helper function to add/update order items and calculate total amount.
-    Assumes existing items for the order_id have been cleared if this is an update.
+    Make the items of order_id match items_data and return the order total.
+    All products are checked with one query. existing_items (the order's current
+    rows, None to load them) are diffed against items_data: unchanged rows are
+    left alone, changed ones updated, and only the rest inserted or deleted in bulk.
     """
-    total_amount = 0.0
-    for item_data in items_data:
-        product = get_product_by_id(db, item_data['product_id'])
-        if not product:
-            raise ValueError(f"Product with ID {item_data['product_id']} not found")
-
-        price_per_unit = str(item_data['price_per_unit'])
-        db_item = OrderItem(
-            order_id=order_id,
-            product_id=item_data['product_id'],
-            quantity=item_data['quantity'],
-            price_per_unit=price_per_unit,
+    product_ids = {item_data['product_id'] for item_data in items_data}
+    found = {
+        product_id for (product_id,) in db.query(Product.id).filter(Product.id.in_(product_ids))
+    } if product_ids else set()
+    missing = sorted(product_ids - found)
+    if missing:
+        raise ValueError(f"Products not found: {missing}")
+
+    if existing_items is None:
+        existing_items = (
+            db.query(OrderItem).filter(OrderItem.order_id == order_id).order_by(OrderItem.id).all()
         )
-        db.add(db_item)
-        total_amount += float(price_per_unit) * item_data['quantity']
+    unmatched: Dict[int, List[OrderItem]] = {}
+    for item in existing_items:
+        unmatched.setdefault(item.product_id, []).append(item)
+
+    total_amount = Decimal("0")
+    new_rows = []
+    for item_data in items_data:
+        price_per_unit = Decimal(str(item_data['price_per_unit']))
+        quantity = item_data['quantity']
+        total_amount += price_per_unit * quantity
+
+        same_product = unmatched.get(item_data['product_id'])
+        if same_product:
+            item = same_product.pop(0)
+            if item.quantity != quantity:
+                item.quantity = quantity
+            if item.price_per_unit != price_per_unit:
+                item.price_per_unit = price_per_unit
+        else:
+            new_rows.append({
+                'order_id': order_id,
+                'product_id': item_data['product_id'],
+                'quantity': quantity,
+                'price_per_unit': price_per_unit,
+            })
+
+    removed_ids = [item.id for items in unmatched.values() for item in items]
+    if removed_ids:
+        db.query(OrderItem).filter(OrderItem.id.in_(removed_ids)).delete(synchronize_session=False)
+    if new_rows:
+        db.execute(insert(OrderItem), new_rows)
     return total_amount
 
 
@@ -55,6 +161,9 @@ def update_order(db: Session, order_id: int, order_update: OrderUpdate):
     if not db_order:
         return None
 
+    if db_order.status == 1 and order_update.status in (2, 3):
+        # Leaving the cart takes stock and re-prices the lines
+        raise ValueError("A cart can only become an order through checkout (POST /orders/{id}/checkout)")
     
 
     # Validate shipping_address_id if provided
@@ -84,12 +193,10 @@ def update_order(db: Session, order_id: int, order_update: OrderUpdate):
     for field, value in update_data.items():
         setattr(db_order, field, value)
 
-    # Update items if provided
+    # Update items if provided, writing only the rows that changed
     if items_data is not None:
-        # Remove existing items before adding new ones
-        db.query(OrderItem).filter(OrderItem.order_id == order_id).delete()
         total_amount = _process_order_items(db, order_id, items_data)
-        db_order.total_amount = str(total_amount)
+        db_order.total_amount = total_amount
 
     db_order.updated_at = datetime.now()
     db.commit()
@@ -100,6 +207,10 @@ def update_order(db: Session, order_id: int, order_update: OrderUpdate):
 def create_order(db: Session, order: OrderCreate):
     user_uid = order.user_uid
     requested_status = order.status
+    if requested_status != 1:
+        # Only carts are created here; processing orders come from checkout,
+        # which checks the stock and uses the current prices
+        raise ValueError("Orders can only be created as carts (status 1); check out the cart to place it")
 
     # Validate shipping_address_id if provided
     if order.shipping_address_id is not None:
@@ -141,8 +252,8 @@ def create_order(db: Session, order: OrderCreate):
         db.refresh(db_order)
 
     try:
-        total_amount = _process_order_items(db, db_order.id, items_data)
-        db_order.total_amount = str(total_amount)
+        total_amount = _process_order_items(db, db_order.id, items_data, existing_items=[])
+        db_order.total_amount = total_amount
         db.commit()
         db.refresh(db_order)
     except ValueError as e:
@@ -152,43 +263,251 @@ def create_order(db: Session, order: OrderCreate):
     return db_order
 
 
-def add_item_to_cart(db: Session, user_uid: str, product_id: int, quantity: int):
-    # Get or create cart for user
-    cart = get_user_cart(db, user_uid)
-    if not cart:
-        cart = Order(user_uid=user_uid, status=1)
-        db.add(cart)
-        db.commit()
-        db.refresh(cart)
+def _items_total():
+    """Sum of the lines of the order being updated, as a scalar subquery"""
+    return (
+        select(func.coalesce(func.sum(OrderItem.quantity * OrderItem.price_per_unit), 0))
+        .where(OrderItem.order_id == Order.id)
+        .scalar_subquery()
+    )
 
-    # Check product exist
+
+def add_item_to_cart(db: Session, user_uid: str, product_id: int, quantity: int):
+    """
+    Add quantity (negative to decrease) of a product to the user's cart as one
+    transaction. An existing line moves by an SQL increment, so concurrent adds
+    are not lost; it is deleted when it reaches 0 or less and the total is
+    recomputed in SQL. A new line needs a quantity of at least 1.
+    """
+    if quantity == 0:
+        raise ValueError("Quantity must not be 0")
     product = get_product_by_id(db, product_id)
     if not product:
         raise ValueError(f"Product with ID {product_id} not found")
 
-    # Check if item already exists in cart
-    existing_item = (
-        db.query(OrderItem)
-        .filter(OrderItem.order_id == cart.id, OrderItem.product_id == product_id)
+    # Cart and its line for this product in one query
+    cart, existing_item = (
+        db.query(Order, OrderItem)
+        .outerjoin(OrderItem, and_(OrderItem.order_id == Order.id, OrderItem.product_id == product_id))
+        .filter(Order.user_uid == user_uid, Order.status == 1)
         .first()
-    )
+    ) or (None, None)
 
     if existing_item:
-        existing_item.quantity += quantity
-    else:
-        new_item = OrderItem(
-            order_id=cart.id,
-            product_id=product_id,
-            quantity=quantity,
-            price_per_unit=product.price,
+        db.execute(
+            update(OrderItem).where(OrderItem.id == existing_item.id).values(quantity=OrderItem.quantity + quantity),
+            execution_options={"synchronize_session": False},
         )
-        db.add(new_item)
+        if quantity < 0:
+            db.execute(
+                delete(OrderItem).where(OrderItem.id == existing_item.id, OrderItem.quantity <= 0),
+                execution_options={"synchronize_session": False},
+            )
+        db.execute(
+            update(Order).where(Order.id == cart.id).values(total_amount=_items_total(), updated_at=datetime.now()),
+            execution_options={"synchronize_session": False},
+        )
+        db.commit()
+        return cart
+
+    if quantity < 1:
+        raise ValueError(f"Product with ID {product_id} is not in the cart, quantity must be at least 1")
+    delta = product.price * quantity
+    if cart:
+        cart.total_amount = Order.total_amount + delta
+        cart.updated_at = datetime.now()
+    else:
+        cart = Order(user_uid=user_uid, status=1, total_amount=delta)
+        db.add(cart)
 
+    # order=cart lets the flush insert a new cart and its first line together
+    db.add(OrderItem(
+        order=cart,
+        product_id=product_id,
+        quantity=quantity,
+        price_per_unit=product.price,
+    ))
     db.commit()
-    total_amount = calculate_order_total(db, cart.id)
-    cart.total_amount = str(total_amount)
-    cart.updated = datetime.now()
+    return cart
+
+
+def apply_cart_operations(db: Session, user_uid: str, operations: List[CartItemOperation]) -> Optional[Order]:
+    """
+    Apply a list of add/set/remove operations to the user's cart in one
+    transaction: one query validates every product, one UPDATE writes the
+    changed lines and the total is recomputed in SQL. "add" is an SQL
+    increment, so concurrent add_item_to_cart calls are not lost, and the
+    cart row is locked (FOR UPDATE) so two batches don't interleave.
+    Returns None, creating nothing, if the user has no cart and the batch
+    adds no lines.
+    """
+    product_ids = {operation.product_id for operation in operations if operation.op != "remove"}
+    prices = dict(
+        db.query(Product.id, Product.price)
+        .filter(Product.id.in_(product_ids), Product.is_active == True)
+        .all()
+    ) if product_ids else {}
+    missing = sorted(product_ids - prices.keys())
+    if missing:
+        raise ValueError(f"Products not found: {missing}")
+
+    # Per product: the quantity it is set to (None: keep the current one) and what is added on top
+    changes: Dict[int, List] = {}
+    for operation in operations:
+        change = changes.setdefault(operation.product_id, [None, 0])
+        if operation.op == "add":
+            change[1] += operation.quantity
+        else:
+            change[0] = operation.quantity if operation.op == "set" else 0
+            change[1] = 0
+
+    cart = (
+        db.query(Order)
+        .filter(Order.user_uid == user_uid, Order.status == 1)
+        .with_for_update()
+        .first()
+    )
+    lines = db.query(OrderItem.id, OrderItem.product_id, OrderItem.quantity).filter(
+        OrderItem.order_id == cart.id).order_by(OrderItem.id).all() if cart else []
+
+    line_ids: Dict[int, int] = {}  # product_id -> id of its line
+    set_to: Dict[int, int] = {}    # line id -> new quantity
+    added: Dict[int, int] = {}     # line id -> increment
+    merged: List[int] = []
+    for line_id, product_id, quantity in lines:
+        if product_id in line_ids:
+            # Merge duplicate lines of one product into the first one
+            added[line_ids[product_id]] = added.get(line_ids[product_id], 0) + quantity
+            merged.append(line_id)
+        else:
+            line_ids[product_id] = line_id
+    new_lines = []
+    for product_id, (quantity, increment) in changes.items():
+        line_id = line_ids.get(product_id)
+        if line_id is None:
+            if (quantity or 0) + increment > 0:
+                new_lines.append({
+                    'product_id': product_id,
+                    'quantity': (quantity or 0) + increment,
+                    'price_per_unit': prices[product_id],
+                })
+            continue
+        if quantity is not None:
+            set_to[line_id] = quantity
+            added.pop(line_id, None)  # a set replaces the merged duplicates too
+        if increment:
+            added[line_id] = added.get(line_id, 0) + increment
+
+    if cart is None:
+        if not new_lines:
+            db.rollback()
+            return None
+        cart = Order(user_uid=user_uid, status=1, total_amount=0)
+        db.add(cart)
+        db.flush()  # assigns the id of the new cart
+
+    if merged:
+        db.execute(delete(OrderItem).where(OrderItem.id.in_(merged)), execution_options={"synchronize_session": False})
+    if set_to or added:
+        quantity = case(set_to, value=OrderItem.id, else_=OrderItem.quantity) if set_to else OrderItem.quantity
+        if added:
+            quantity = quantity + case(added, value=OrderItem.id, else_=0)
+        db.execute(
+            update(OrderItem).where(OrderItem.id.in_(set_to.keys() | added.keys())).values(quantity=quantity),
+            execution_options={"synchronize_session": False},
+        )
+        db.execute(
+            delete(OrderItem).where(OrderItem.order_id == cart.id, OrderItem.quantity <= 0),
+            execution_options={"synchronize_session": False},
+        )
+    if new_lines:
+        db.execute(insert(OrderItem), [dict(line, order_id=cart.id) for line in new_lines])
+
+    db.execute(
+        update(Order).where(Order.id == cart.id).values(total_amount=_items_total(), updated_at=datetime.now()),
+        execution_options={"synchronize_session": False},
+    )
     db.commit()
-    db.refresh(cart)
+    return cart
 
-    return cart
\ No newline at end of file
+
+def checkout_order(db: Session, order_id: int) -> Order:
+    """
+    Move a cart (status 1) to processing (status 2) in one short transaction:
+    claim the order, re-price its lines from the current product prices,
+    recompute the total and take the stock. Stock is taken with one
+    conditional UPDATE (stock_quantity >= quantity) over all products of the
+    order, so no rows are locked before that last statement and concurrent
+    checkouts cannot oversell. Raises ValueError and changes nothing if the
+    order is not a cart, has no shipping address or items, has a line of
+    quantity 0 or less, or stock is short.
+    """
+    now = datetime.now()
+    claimed = db.execute(
+        update(Order)
+        .where(Order.id == order_id, Order.status == 1, Order.shipping_address_id.is_not(None))
+        .values(status=2, updated_at=now)
+    ).rowcount
+    if not claimed:
+        db.rollback()
+        order = get_order_by_id(db, order_id)
+        if not order:
+            raise ValueError(f"Order with ID {order_id} not found")
+        if order.status != 1:
+            raise ValueError(f"Order with ID {order_id} is not a cart (status {order.status})")
+        raise ValueError("Shipping address is required before checkout")
+
+    lines = (
+        db.query(OrderItem.product_id, func.sum(OrderItem.quantity), func.min(OrderItem.quantity))
+        .filter(OrderItem.order_id == order_id)
+        .group_by(OrderItem.product_id)
+        .all()
+    )
+    if not lines:
+        db.rollback()
+        raise ValueError("Cannot check out an empty cart")
+    invalid = sorted(product_id for product_id, total, smallest in lines if total <= 0 or smallest <= 0)
+    if invalid:
+        db.rollback()
+        raise ValueError(f"Invalid quantities for products: {invalid}")
+    quantities = {product_id: total for product_id, total, _ in lines}
+
+    current_price = (
+        select(Product.price).where(Product.id == OrderItem.product_id).scalar_subquery()
+    )
+    db.execute(
+        update(OrderItem).where(OrderItem.order_id == order_id).values(price_per_unit=current_price),
+        execution_options={"synchronize_session": False},
+    )
+    db.execute(
+        update(Order).where(Order.id == order_id).values(total_amount=_items_total()),
+        execution_options={"synchronize_session": False},
+    )
+
+    wanted = case(quantities, value=Product.id)
+    taken = db.execute(
+        update(Product)
+        .where(Product.id.in_(quantities), Product.is_active == True, wanted > 0,
+               Product.stock_quantity >= wanted)
+        .values(
+            stock_quantity=Product.stock_quantity - wanted,
+            sold_count=Product.sold_count + wanted,
+            updated_at=now,
+        ),
+        execution_options={"synchronize_session": False},
+    ).rowcount
+    if taken != len(quantities):
+        db.rollback()
+        available = dict(
+            db.query(Product.id, Product.stock_quantity)
+            .filter(Product.id.in_(quantities), Product.is_active == True)
+        )
+        short = sorted(
+            product_id for product_id, quantity in quantities.items()
+            if (available.get(product_id) or 0) < quantity
+        ) or sorted(quantities)
+        raise ValueError(f"Insufficient stock for products: {short}")
+
+    db.commit()
+    invalidate_products(list(quantities))
+    return get_order_by_id(db, order_id)
@@ -1,18 +1,85 @@
 #CRUD for products
 from datetime import datetime, timezone
-from typing import Optional
-from sqlalchemy import or_, text
+from decimal import Decimal
+from typing import Any, Dict, List, Optional, Tuple
+from pydantic import ValidationError
+from sqlalchemy import func, insert, select, text
 from sqlalchemy.orm import Session
 
-from ..models import Product, ProductCategory 
-from ..schemas import ProductCreate, ProductUpdate 
+from ..models import Category, Product, ProductCategory 
+from ..schemas import ProductCreate, ProductImport, ProductUpdate 
+from ..utils.cache import MISSING, make_cache
+from ..utils.pagination import decode_cursor, encode_cursor, paginate
+from ..utils.search import product_search
+from ..utils.snapshot import catalog_snapshot
 
 
+class CachedProduct:
+    """Read-only copy of a products row, kept in product_cache instead of the ORM object"""
+    __slots__ = tuple(Product.__table__.columns.keys())
 
+    def __init__(self, product: Product):
+        for name in self.__slots__:
+            setattr(self, name, getattr(product, name))
 
-def get_product_by_id(db: Session, product_id: int):
+
+# Read-through cache for get_product_by_id.
+# Configured with PRODUCT_CACHE_ENABLED / PRODUCT_CACHE_MAXSIZE / PRODUCT_CACHE_TTL.
+product_cache = make_cache("PRODUCT_CACHE", maxsize=10000, ttl=60)
+
+
+def _get_product_row(db: Session, product_id: int):
     return db.query(Product).filter(Product.id == product_id).first()
 
+def _product_changed(db_product: Product, category_ids: Optional[List[int]] = None):
+    """Keep the in-process product cache, search index and catalog snapshot in step with a committed write"""
+    product_cache.invalidate(db_product.id)
+    catalog_snapshot.mark_product(db_product.id)
+    product_search.index_product(
+        db_product.id, db_product.name, db_product.description, category_ids, db_product.is_active
+    )
+
+def invalidate_products(product_ids: List[int]):
+    """For set-based writes that bypass the ORM (e.g. checkout stock updates); the search index is not affected"""
+    for product_id in product_ids:
+        product_cache.invalidate(product_id)
+        catalog_snapshot.mark_product(product_id)
+
+def get_product_by_id(db: Session, product_id: int, updated_at: Optional[datetime] = None):
+    """
+    Read a product through product_cache. The result is a read-only CachedProduct
+    when the cache is on; use the ORM row (_get_product_row) to modify a product.
+    updated_at, when the caller already read it from the database (a validator),
+    drops a cached copy that does not match, e.g. after a write through another
+    worker, so the body agrees with the ETag.
+    """
+    cached = product_cache.get(product_id)
+    if cached is not MISSING:
+        if updated_at is None or cached is None or cached.updated_at == updated_at:
+            return cached
+        product_cache.invalidate(product_id)
+
+    generation = product_cache.generation()
+    db_product = _get_product_row(db, product_id)
+    # A lagging replica could put back a row that a write just invalidated
+    if db_product is None or not product_cache.enabled or db.info.get("replica"):
+        return db_product
+    cached = CachedProduct(db_product)
+    product_cache.set(product_id, cached, generation=generation)
+    return cached
+
+# sort parameter of GET /products/ -> (keyset columns, descending)
+PRODUCT_SORTS = {
+    "price": ([Product.price, Product.id], False),
+    "rating": ([Product.rating, Product.id], True),
+    "sold_count": ([Product.sold_count, Product.id], True),
+    "newest": ([Product.created_at, Product.id], True),
+}
+
+# Upper bound on search hits handed to the database for price/rating filtering or sorting
+SEARCH_FILTER_CANDIDATES = 1000
+
+
 def get_products(
         db: Session, 
         skip: int = 0, 
@@ -20,6 +87,25 @@ def get_products(
         category_id: Optional[int] = None, 
         q: Optional[str] = None
     ):
+    products, _ = get_products_page(db, skip=skip, limit=limit, category_id=category_id, q=q)
+    return products
+
+def get_products_page(
+        db: Session, 
+        skip: int = 0, 
+        limit: int = 100, 
+        category_id: Optional[int] = None, 
+        q: Optional[str] = None,
+        cursor: Optional[str] = None,
+        min_price: Optional[float] = None,
+        max_price: Optional[float] = None,
+        min_rating: Optional[float] = None,
+        sort: Optional[str] = None
+    ) -> Tuple[List[Product], Optional[str]]:
+    """Return a page of active products and the cursor of the next page (None on the last page)"""
+    if sort is not None and sort not in PRODUCT_SORTS:
+        raise ValueError(f"Invalid sort. Must be one of: {', '.join(PRODUCT_SORTS)}")
+
     query = db.query(Product).filter(Product.is_active == True)
     
     if category_id:
@@ -28,37 +114,120 @@ def get_products(
             .join(ProductCategory, Product.id == ProductCategory.product_id)
             .filter(ProductCategory.category_id == category_id)
         )
+    has_filters = min_price is not None or max_price is not None or min_rating is not None
+    if min_price is not None:
+        query = query.filter(Product.price >= _to_decimal(min_price))
+    if max_price is not None:
+        query = query.filter(Product.price <= _to_decimal(max_price))
+    if min_rating is not None:
+        query = query.filter(Product.rating >= _to_decimal(min_rating))
+
     if q and q.strip():
-        search_term = f"%{q.strip()}%"
-        query = query.filter(
-            or_(
-                Product.name.ilike(search_term),
-                Product.description.ilike(search_term)
-            )
-        )
+        # Ranked lookup in the in-process inverted index instead of a
+        # leading-wildcard ILIKE scan over the whole table
+        product_search.ensure_built(db)
+        ranked_ids = product_search.search(q, category_id=category_id)
+        if not ranked_ids:
+            return [], None
+        if sort is None:
+            return _ranked_page(query, ranked_ids, skip, limit, cursor, has_filters)
+        # An explicit sort replaces relevance order; the database sorts the hits
+        query = query.filter(Product.id.in_(ranked_ids[:SEARCH_FILTER_CANDIDATES]))
+
+    columns, descending = PRODUCT_SORTS.get(sort, ([Product.id], False))
     #print(str(query.statement.compile(compile_kwargs={"literal_binds": True})))
-    return query.offset(skip).limit(limit).all()
-
-def get_product_categories(db: Session, product_id: int):
-    result = db.execute(
-        text("""
-        SELECT c.* FROM categories c
-        JOIN product_categories pc ON c.id = pc.category_id
-        WHERE pc.product_id = :product_id AND c.is_active = TRUE
-        """),
-        {"product_id": product_id}
+    return paginate(query, columns, skip=skip, limit=limit, cursor=cursor, descending=descending)
+
+def _ranked_page(query, ranked_ids: List[int], skip: int, limit: int, cursor: Optional[str], has_filters: bool):
+    """Page through search hits in relevance order; the cursor is a rank position"""
+    if cursor:
+        skip = decode_cursor(cursor, 1)[0]
+        if not isinstance(skip, int) or skip < 0:
+            raise ValueError("Invalid cursor")
+    if has_filters:
+        candidates = ranked_ids[:SEARCH_FILTER_CANDIDATES]
+        matching = {
+            product_id
+            for (product_id,) in query.with_entities(Product.id).filter(Product.id.in_(candidates))
+        }
+        ranked_ids = [product_id for product_id in candidates if product_id in matching]
+
+    page_ids = ranked_ids[skip:skip + limit]
+    next_cursor = encode_cursor(skip + limit) if len(ranked_ids) > skip + limit else None
+    if not page_ids:
+        return [], None
+    products = query.filter(Product.id.in_(page_ids)).all()
+    products_by_id = {product.id: product for product in products}
+    return [products_by_id[product_id] for product_id in page_ids if product_id in products_by_id], next_cursor
+
+def get_categories_for_products(db: Session, product_ids: List[int]) -> Dict[int, List[Category]]:
+    """Load the active categories of a whole page of products in one query."""
+    categories_by_product: Dict[int, List[Category]] = {product_id: [] for product_id in product_ids}
+    if not product_ids:
+        return categories_by_product
+
+    rows = (
+        db.query(ProductCategory.product_id, Category)
+        .join(Category, Category.id == ProductCategory.category_id)
+        .filter(ProductCategory.product_id.in_(product_ids), Category.is_active == True)
+        .order_by(ProductCategory.product_id, ProductCategory.id)
+        .all()
     )
-    return result.fetchall()
+    for product_id, category in rows:
+        categories_by_product[product_id].append(category)
+    return categories_by_product
+
+def get_catalog_version(db: Session) -> Tuple:
+    """
+    (products count, products max(updated_at), categories max(id), categories
+    max(updated_at)), the validator of product list responses. Products and
+    categories are never hard-deleted and every update sets updated_at
+    (changing a product's categories included). New products are caught by
+    the count, since an import may give them ids below max(id) and an old
+    updated_at; categories get the current time, so max(id) is enough there.
+    """
+    return tuple(db.query(
+        select(func.count(Product.id)).scalar_subquery(),
+        select(func.max(Product.updated_at)).scalar_subquery(),
+        select(func.max(Category.id)).scalar_subquery(),
+        select(func.max(Category.updated_at)).scalar_subquery(),
+    ).one())
+
+def get_product_version(db: Session, product_id: int) -> Optional[Tuple]:
+    """
+    (updated_at, links count, max(updated_at) of its categories) of one
+    product, or None if it does not exist
+    """
+    links = select(func.count(ProductCategory.id)).where(ProductCategory.product_id == product_id)
+    categories_updated = (
+        select(func.max(Category.updated_at))
+        .join(ProductCategory, ProductCategory.category_id == Category.id)
+        .where(ProductCategory.product_id == product_id)
+    )
+    row = (
+        db.query(Product.updated_at, links.scalar_subquery(), categories_updated.scalar_subquery())
+        .filter(Product.id == product_id)
+        .first()
+    )
+    return tuple(row) if row is not None else None
+
+def _to_decimal(value: float) -> Decimal:
+    # Go through str so 17.25 is stored as 17.25, not 17.2499999...
+    return Decimal(str(value))
+
+def _prepare_numeric_fields(product_data: dict):
+    """Convert float input to Decimal and drop explicit nulls of NOT NULL columns"""
+    for field in ('price', 'rating'):
+        if product_data.get(field) is not None:
+            product_data[field] = _to_decimal(product_data[field])
+    for field in ('rating', 'sold_count'):
+        if field in product_data and product_data[field] is None:
+            del product_data[field]
 
 def create_product(db: Session, product: ProductCreate):
-    # Convert float values to strings for database storage
-    product_data = product.dict()
+    product_data = product.model_dump()
     category_ids = product_data.pop('category_ids', [])
-    
-    # Convert numeric fields to strings
-    product_data['price'] = str(product_data['price'])
-    if product_data.get('rating'):
-        product_data['rating'] = str(product_data['rating'])
+    _prepare_numeric_fields(product_data)
     
     db_product = Product(**product_data)
     db.add(db_product)
@@ -71,21 +240,20 @@ def create_product(db: Session, product: ProductCreate):
         db.add(db_product_category)
     
     db.commit()
+    _product_changed(db_product, category_ids)
     return db_product
 
 def update_product(db: Session, product_id: int, product_update: ProductUpdate):
-    db_product = get_product_by_id(db, product_id)
+    db_product = _get_product_row(db, product_id)
     if not db_product:
         return None
     
     update_data = product_update.model_dump(exclude_unset=True)
     category_ids = update_data.pop('category_ids', None)
     
-    # Convert numeric fields to strings
-    if 'price' in update_data:
-        update_data['price'] = str(update_data['price'])
-    if 'rating' in update_data and update_data['rating']:
-        update_data['rating'] = str(update_data['rating'])
+    _prepare_numeric_fields(update_data)
+    if update_data.get('price', 0) is None:
+        raise ValueError("price cannot be null")
     
     # Update product fields
     for field, value in update_data.items():
@@ -104,4 +272,188 @@ def update_product(db: Session, product_id: int, product_update: ProductUpdate):
     db_product.updated_at = datetime.now()
     db.commit()
     db.refresh(db_product)
-    return db_product
\ No newline at end of file
+    _product_changed(db_product, category_ids)
+    return db_product
+
+def deactivate_product(db: Session, product_id: int):
+    """Soft delete a product (set is_active to False)"""
+    db_product = _get_product_row(db, product_id)
+    if not db_product:
+        return None
+    
+    db_product.is_active = False
+    db_product.updated_at = datetime.now()
+    db.commit()
+    _product_changed(db_product)
+    return db_product
+# ----------------------------------------
+# Bulk import (POST /products/bulk and backend_api.seed)
+# ----------------------------------------
+
+# Rows per transaction
+IMPORT_CHUNK_SIZE = 1000
+
+_IMPORT_COLUMNS = (
+    'name', 'description', 'image_url', 'price', 'sold_count', 'rating', 'review_count',
+    'delivery_info', 'seller_info', 'stock_quantity', 'is_active',
+)
+
+def _naive_local(value: Optional[datetime]) -> Optional[datetime]:
+    # The models store naive local time (datetime.now())
+    if value is None or value.tzinfo is None:
+        return value
+    return value.astimezone().replace(tzinfo=None)
+
+def _import_row(item: ProductImport, now: datetime) -> dict:
+    """Column values of one products row; every row has the same keys so chunks go out as executemany"""
+    row = item.model_dump(include=set(_IMPORT_COLUMNS))
+    for name in _IMPORT_COLUMNS:
+        default = Product.__table__.c[name].default
+        if row[name] is None and default is not None and default.is_scalar:
+            row[name] = default.arg
+    row['price'] = _to_decimal(row['price'])
+    row['rating'] = _to_decimal(row['rating'])
+    row['created_at'] = _naive_local(item.created_at) or now
+    row['updated_at'] = _naive_local(item.updated_at) or now
+    if item.id is not None:
+        row['id'] = item.id
+    return row
+
+def _import_category_ids(item: ProductImport) -> List[int]:
+    ids = item.category_ids or [category.id for category in item.categories]
+    return list(dict.fromkeys(ids))
+
+def _insert_generated(db: Session, rows: List[dict]) -> List[int]:
+    """Insert products rows without an id in one or two statements, returning their new ids in order"""
+    dialect = db.get_bind().dialect
+    if dialect.name == 'sqlite':
+        # SQLite has no sentinel to return ids in parameter order, so
+        # SQLAlchemy would send one INSERT per row. The first row takes the
+        # write lock (held until commit) and max(id) + 1, so the ids after it
+        # are free and the other rows get them explicitly.
+        first = db.connection().execute(insert(Product), rows[0]).inserted_primary_key[0]
+        new_ids = list(range(first, first + len(rows)))
+        if len(rows) > 1:
+            db.execute(insert(Product), [dict(row, id=new_id) for row, new_id in zip(rows[1:], new_ids[1:])])
+        return new_ids
+    if dialect.insert_executemany_returning_sort_by_parameter_order:
+        # One multi-row INSERT ... RETURNING (PostgreSQL, MariaDB)
+        return db.execute(
+            insert(Product).returning(Product.id, sort_by_parameter_order=True), rows
+        ).scalars().all()
+    # MySQL: one multi-row INSERT. InnoDB gives the rows of one such statement
+    # consecutive ids (auto_increment_increment apart), the first in lastrowid.
+    step = db.scalar(text("SELECT @@auto_increment_increment"))
+    first = db.connection().execute(insert(Product).values(rows)).lastrowid
+    return [first + step * offset for offset in range(len(rows))]
+
+def _insert_products(db: Session, items: List[ProductImport], now: datetime) -> List[int]:
+    """Insert products and their category links, returning the product ids in order"""
+    rows = [_import_row(item, now) for item in items]
+    ids: List[Optional[int]] = [row.get('id') for row in rows]
+
+    with_id = [row for row in rows if 'id' in row]
+    if with_id:
+        db.execute(insert(Product), with_id)
+
+    generated = [position for position, row in enumerate(rows) if 'id' not in row]
+    if generated:
+        new_ids = _insert_generated(db, [rows[position] for position in generated])
+        for position, new_id in zip(generated, new_ids):
+            ids[position] = new_id
+
+    links = [
+        {'product_id': product_id, 'category_id': category_id}
+        for product_id, item in zip(ids, items)
+        for category_id in _import_category_ids(item)
+    ]
+    if links:
+        db.execute(insert(ProductCategory), links)
+    return ids
+
+def _validation_message(error: ValidationError) -> str:
+    return "; ".join(
+        f"{'.'.join(str(part) for part in detail['loc']) or 'row'}: {detail['msg']}" for detail in error.errors()
+    )
+
+def import_products(db: Session, rows: List[Any], chunk_size: int = IMPORT_CHUNK_SIZE) -> dict:
+    """
+    Insert many products with multi-row inserts, committing every chunk_size rows.
+    Invalid rows are reported in 'errors' (with their index in rows) and skipped;
+    they never abort the rest of the import.
+    """
+    errors: List[dict] = []
+    created: List[Tuple[int, int]] = []
+
+    def fail(index: int, row_id: Optional[int], message: str):
+        errors.append({'index': index, 'id': row_id, 'error': message})
+
+    valid: List[Tuple[int, ProductImport]] = []
+    for index, raw in enumerate(rows):
+        try:
+            valid.append((index, ProductImport.model_validate(raw)))
+        except ValidationError as e:
+            fail(index, raw.get('id') if isinstance(raw, dict) else None, _validation_message(e))
+
+    known_categories = {category_id for (category_id,) in db.query(Category.id)}
+    seen_ids = set()
+    now = datetime.now()
+
+    for start in range(0, len(valid), chunk_size):
+        chunk = valid[start:start + chunk_size]
+        explicit_ids = [item.id for _, item in chunk if item.id is not None]
+        existing_ids = (
+            {product_id for (product_id,) in db.query(Product.id).filter(Product.id.in_(explicit_ids))}
+            if explicit_ids else set()
+        )
+
+        accepted: List[Tuple[int, ProductImport]] = []
+        for index, item in chunk:
+            unknown = [category_id for category_id in _import_category_ids(item) if category_id not in known_categories]
+            if item.id is not None and (item.id in existing_ids or item.id in seen_ids):
+                fail(index, item.id, f"Product with ID {item.id} already exists")
+            elif unknown:
+                fail(index, item.id, f"Unknown category IDs: {unknown}")
+            else:
+                if item.id is not None:
+                    seen_ids.add(item.id)
+                accepted.append((index, item))
+        if not accepted:
+            continue
+
+        try:
+            with db.begin_nested():
+                ids = _insert_products(db, [item for _, item in accepted], now)
+            created.extend(zip((index for index, _ in accepted), ids))
+        except Exception:
+            # Something the checks above did not catch: retry the chunk row
+            # by row so only the offending rows are dropped
+            for index, item in accepted:
+                try:
+                    with db.begin_nested():
+                        ids = _insert_products(db, [item], now)
+                    created.append((index, ids[0]))
+                except Exception as e:  # database or driver error for this row only
+                    fail(index, item.id, str(getattr(e, 'orig', e)))
+        db.commit()
+
+    if seen_ids and db.get_bind().dialect.name == 'postgresql':
+        # Explicit ids do not advance the serial sequence
+        db.execute(text(
+            "SELECT setval(pg_get_serial_sequence('products', 'id'), (SELECT MAX(id) FROM products))"
+        ))
+        db.commit()
+
+    if created:
+        product_cache.clear()
+        product_search.invalidate()
+        catalog_snapshot.invalidate()
+
+    created.sort()
+    errors.sort(key=lambda error: error['index'])
+    return {
+        'created': len(created),
+        'failed': len(errors),
+        'ids': [product_id for _, product_id in created],
+        'errors': errors,
+    }
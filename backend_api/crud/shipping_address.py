@@ -1,10 +1,59 @@
 #CRUD for orders
 from datetime import datetime, timezone
-from sqlalchemy import null
-from sqlalchemy.orm import Session
+from sqlalchemy import delete, exists, insert, literal, select, true, update
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session, aliased
 
 from ..schemas import ShippingAddressCreate, ShippingAddressUpdate
-from ..models import ShippingAddress 
+from ..models import ShippingAddress
+from ..utils.address import address_hash
+
+# A user has at most one default address (unique index
+# ux_shipping_address_default_user_uid). Making an address the default clears
+# the old one first and sets the new one second, in the same transaction: a
+# single UPDATE flipping both rows can fail the index on PostgreSQL and MySQL,
+# which check it row by row. Two requests doing this at once for the same user
+# collide on the index; the loser rolls back and retries.
+# Writes take one statement, or two when they move the default. MySQL has no
+# RETURNING, so there the written row is read back with one more.
+# No UPDATE / DELETE here has a subquery on shipping_address itself, which
+# MySQL rejects (error 1093).
+_DEFAULT_RETRIES = 3
+
+def _with_default_retries(db: Session, fn, *args):
+    for attempt in range(_DEFAULT_RETRIES):
+        try:
+            return fn(db, *args)
+        except IntegrityError:
+            db.rollback()
+            if attempt == _DEFAULT_RETRIES - 1:
+                raise
+
+def _clear_default(db: Session, user_uid: str, *where, now: datetime):
+    db.execute(
+        update(ShippingAddress)
+        .where(ShippingAddress.user_uid == user_uid, ShippingAddress.is_default == True, *where)
+        .values(is_default=False, updated_at=now)
+    )
+
+def _written(db: Session, stmt, returning: bool, address_id=None):
+    """Run an INSERT / UPDATE, returning the row (with RETURNING if the dialect has it) or None"""
+    if returning:
+        return db.scalars(stmt.returning(ShippingAddress), execution_options={"synchronize_session": False}).first()
+    result = db.execute(stmt, execution_options={"synchronize_session": False})
+    if result.rowcount == 0:
+        return None
+    return get_address_by_id(db, address_id if address_id is not None else result.lastrowid)
+
+def _finish(db: Session, db_address):
+    """Commit the write (or roll it back if it matched nothing) and hand out the detached row"""
+    if db_address is None:
+        db.rollback()
+        return None
+    # Detach with the loaded state, so the response needs no refresh
+    db.expunge(db_address)
+    db.commit()
+    return db_address
 
 #check existence ?
 def get_address_by_id(db: Session, address_id: int):
@@ -14,87 +63,79 @@ def get_addresses_by_user(db: Session, user_uid: str):
     return db.query(ShippingAddress).filter(ShippingAddress.user_uid == user_uid).all()
 
 def create_shipping_address(db: Session, address: ShippingAddressCreate, user_uid: str):
-    exist = db.query(ShippingAddress).filter(
-        ShippingAddress.user_uid == user_uid,
-        ShippingAddress.address == address.address).first()
-    
-    if exist:
-        return None 
-    should_be_default = address.is_default
-    # Check if this is the very first address for this user
-    total_addresses_for_user = db.query(ShippingAddress).filter(
-        ShippingAddress.user_uid == user_uid
-    ).count() 
-
-    if total_addresses_for_user == 0:
-        should_be_default = True
-
-    if should_be_default:
-        db.query(ShippingAddress).filter(
-            ShippingAddress.user_uid == user_uid,
-            ShippingAddress.is_default == True
-        ).update({"is_default": False})
-
-    db_address = ShippingAddress(
-        user_uid=user_uid,
-        address=address.address,
-        is_default=should_be_default  
+    """
+    Conditional insert: returns None, writing nothing, if the user already has
+    this address (compared normalized, through the address_hash index).
+    The user's first address becomes the default.
+    """
+    return _with_default_retries(db, _create_shipping_address, address, user_uid)
+
+def _create_shipping_address(db: Session, address: ShippingAddressCreate, user_uid: str):
+    now = datetime.now()
+    digest = address_hash(address.address)
+    other = aliased(ShippingAddress)
+    duplicate = exists().where(other.user_uid == user_uid, other.address_hash == digest)
+
+    if address.is_default:
+        # If the address turns out to be a duplicate the insert writes
+        # nothing and _finish rolls this back
+        _clear_default(db, user_uid, now=now)
+        is_default = true()
+    else:
+        is_default = ~exists().where(other.user_uid == user_uid)
+
+    stmt = insert(ShippingAddress).from_select(
+        ["user_uid", "address", "address_hash", "is_default", "created_at", "updated_at"],
+        select(
+            literal(user_uid), literal(address.address), literal(digest), is_default, literal(now), literal(now)
+        ).where(~duplicate),
     )
-    db.add(db_address)
-    db.commit()
-    db.refresh(db_address)
-    return db_address
+    return _finish(db, _written(db, stmt, db.get_bind().dialect.insert_returning))
 
-def update_shipping_address(db: Session, address_id: int, address_update: ShippingAddressUpdate):
-    db_address = get_address_by_id(db, address_id)
-    if not db_address:
-        return None
+def update_shipping_address(db: Session, address_id: int, address_update: ShippingAddressUpdate, user_uid: str):
+    """
+    Update an address of user_uid. is_default=True makes it the default; the
+    default can't be unset, only replaced, so is_default=False is ignored.
+    """
+    return _with_default_retries(db, _update_shipping_address, address_id, address_update, user_uid)
+
+def _update_shipping_address(db: Session, address_id: int, address_update: ShippingAddressUpdate, user_uid: str):
     update_data = address_update.model_dump(exclude_unset=True)
-    if update_data.get("is_default") is False and db_address.is_default is True:
+    make_default = update_data.pop("is_default", None) is True
+    if not update_data and not make_default:
+        return db.query(ShippingAddress).filter(
+            ShippingAddress.id == address_id, ShippingAddress.user_uid == user_uid).first()
+
+    if "address" in update_data:
+        update_data["address_hash"] = address_hash(update_data["address"])
+    now = datetime.now()
+    if make_default:
+        _clear_default(db, user_uid, ShippingAddress.id != address_id, now=now)
         update_data["is_default"] = True
-    
-
-    if update_data.get("is_default") is True:
-        db.query(ShippingAddress).filter( #Update the rest is_default to False
-            ShippingAddress.user_uid == db_address.user_uid,
-            ShippingAddress.is_default == True,
-            ShippingAddress.id != address_id
-        ).update({"is_default": False})
-
-    for key, value in update_data.items():
-        setattr(db_address, key, value)
-    
-    db.commit()
-    db.refresh(db_address)
-    return db_address
-
-def delete_shipping_address(db: Session, address_id: int):
-    db_address = db.query(ShippingAddress).filter(ShippingAddress.id == address_id).first()
-    
-    if not db_address:
-        return None 
-    user_uid = db_address.user_uid
-    existing = db.query(ShippingAddress).filter(
+    stmt = (
+        update(ShippingAddress)
+        .where(ShippingAddress.id == address_id, ShippingAddress.user_uid == user_uid)
+        .values(**update_data, updated_at=now)
+    )
+    return _finish(db, _written(db, stmt, db.get_bind().dialect.update_returning, address_id))
+
+def delete_shipping_address(db: Session, address_id: int, user_uid: str):
+    """
+    Delete an address of user_uid in one statement. The default address is
+    not deleted (None is returned): make another address the default first.
+    """
+    where = (
+        ShippingAddress.id == address_id,
         ShippingAddress.user_uid == user_uid,
-        ShippingAddress.is_default == True).count()
-
-    if db_address.is_default:
-        if existing == 1:
-            return None
-        #if exist another shippingAddress, promote it to default, else not delete anymore
-        other_address_to_promote = db.query(ShippingAddress).filter( 
-            ShippingAddress.user_uid == db_address.user_uid,
-            ShippingAddress.id != address_id
-        ).order_by(ShippingAddress.created_at).first()
-        
-        if not other_address_to_promote:
-            return None
-        else:
-            other_address_to_promote.is_default = True
-
-    db.delete(db_address)
-    db.commit()
-
-    return db_address # Return the object that was just deleted
-
-
+        ShippingAddress.is_default.is_not(True),
+    )
+    stmt = delete(ShippingAddress).where(*where)
+    if db.get_bind().dialect.delete_returning:
+        db_address = db.scalars(
+            stmt.returning(ShippingAddress), execution_options={"synchronize_session": False}).first()
+    else:
+        # Read the row first, so it can still be returned
+        db_address = db.query(ShippingAddress).filter(*where).first()
+        if db_address is not None:
+            db.execute(stmt, execution_options={"synchronize_session": False})
+    return _finish(db, db_address)
@@ -1,39 +1,160 @@
 #CRUD for user
+from sqlalchemy import func, select, update
+from sqlalchemy.dialects.mysql import insert as mysql_insert
+from sqlalchemy.dialects.postgresql import insert as postgresql_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
 from sqlalchemy.orm import Session
 from datetime import datetime, timezone
 from typing import Optional
+import os
 
 from ..models import User 
-from ..schemas import UserCreate 
+from ..schemas import UserCreate, UserResponse 
 from ..utils.auth import hash_password 
+from ..utils.cache import MISSING, make_cache
 
 
-def get_user_by_uid(db: Session, uid: str):
+class CachedUser:
+    """Read-only copy of the UserResponse fields of a users row (no password hash), kept in user_cache"""
+    __slots__ = tuple(UserResponse.model_fields)
+
+    def __init__(self, user: User):
+        for name in self.__slots__:
+            setattr(self, name, getattr(user, name))
+
+
+# Read-through / write-through cache for get_user_by_uid, by uid.
+# Configured with USER_CACHE_ENABLED / USER_CACHE_MAXSIZE / USER_CACHE_TTL.
+# Unknown uids are cached as None for USER_CACHE_NEGATIVE_TTL seconds only:
+# a user created through another worker is invisible here for that long.
+user_cache = make_cache("USER_CACHE", maxsize=10000, ttl=60)
+USER_CACHE_NEGATIVE_TTL = float(os.getenv("USER_CACHE_NEGATIVE_TTL", "5"))
+
+
+def _get_user_row(db: Session, uid: str):
     return db.query(User).filter(User.uid == uid).first()
 
+def _user_changed(user: User):
+    """Write a committed users row through to user_cache"""
+    if user_cache.enabled:
+        user_cache.set(user.uid, CachedUser(user))
+
+def get_user_by_uid(db: Session, uid: str):
+    """
+    Read a user through user_cache: a read-only CachedUser (or None) when the
+    cache is on. The password hash is not part of it, see get_password_hash.
+    """
+    cached = user_cache.get(uid)
+    if cached is not MISSING:
+        return cached
+
+    generation = user_cache.generation()
+    db_user = _get_user_row(db, uid)
+    if not user_cache.enabled:
+        return db_user
+    if db_user is None:
+        user_cache.set(uid, None, generation=generation, ttl=USER_CACHE_NEGATIVE_TTL)
+        return None
+    cached = CachedUser(db_user)
+    user_cache.set(uid, cached, generation=generation)
+    return cached
+
+def get_password_hash(db: Session, uid: str) -> Optional[str]:
+    """Always read from the database: a password changed through another worker must apply at once"""
+    return db.scalar(select(User.password_hash).where(User.uid == uid))
+
+# Profile columns a login may change; a null in the request keeps the stored value
+_PROFILE_FIELDS = ("provider", "identifier", "photo_url", "display_name", "is_active", "password_hash")
+
+
+def _upsert_statement(dialect_name: str, values: dict):
+    """INSERT ... ON CONFLICT (uid) DO UPDATE / ON DUPLICATE KEY UPDATE for the dialect"""
+    now = values["last_login"]
+    if dialect_name in ("postgresql", "sqlite"):
+        insert = postgresql_insert if dialect_name == "postgresql" else sqlite_insert
+        stmt = insert(User).values(**values)
+        incoming = stmt.excluded
+        return stmt.on_conflict_do_update(
+            index_elements=[User.uid],
+            set_={
+                **{name: func.coalesce(incoming[name], User.__table__.c[name]) for name in _PROFILE_FIELDS},
+                "last_login": now,
+                "updated_at": now,
+            },
+        )
+    if dialect_name in ("mysql", "mariadb"):
+        stmt = mysql_insert(User).values(**values)
+        incoming = stmt.inserted
+        return stmt.on_duplicate_key_update(
+            **{name: func.coalesce(incoming[name], User.__table__.c[name]) for name in _PROFILE_FIELDS},
+            last_login=now,
+            updated_at=now,
+        )
+    return None
+
+
 def create_or_update_user(db: Session, user_data: dict):
+    """
+    Login upsert: one INSERT ... ON CONFLICT statement (RETURNING the row
+    where supported), so concurrent first logins of a uid can't collide.
+    Sets last_login and only the non-null profile fields.
+    """
     # Extract password first if it exists
     password = user_data.pop('password', None)
-    
-    user = get_user_by_uid(db, user_data["uid"])
-    
-    # Hash password if provided and store in password_hash
+
+    # Hash password if provided and store in password_hash. The API hashes
+    # off the event loop and passes password_hash instead
     if password:
         user_data["password_hash"] = hash_password(password)
-    
+
+    now = datetime.now()
+    values = {key: value for key, value in user_data.items() if key in User.__table__.c}
+    values.update(last_login=now, created_at=now, updated_at=now)
+
+    dialect = db.get_bind().dialect
+    stmt = _upsert_statement(dialect.name, values)
+    if stmt is None:
+        return _create_or_update_user_orm(db, values)
+
+    if dialect.insert_returning:
+        user = db.scalars(stmt.returning(User), execution_options={"populate_existing": True}).one()
+    else:
+        db.execute(stmt)
+        user = _get_user_row(db, values["uid"])
+    # Detach with the loaded state, so the commit doesn't expire it and
+    # reading it afterwards costs no refresh
+    db.expunge(user)
+    db.commit()
+    _user_changed(user)
+    return user
+
+
+def _create_or_update_user_orm(db: Session, values: dict):
+    """Select-then-write fallback for dialects without an upsert"""
+    user = _get_user_row(db, values["uid"])
     if user:
-        # Update existing user
-        for key, value in user_data.items():
-            if value is not None and hasattr(user, key):
+        for key, value in values.items():
+            if value is not None and key != "created_at":
                 setattr(user, key, value)
-        user.updated_at = datetime.now()
     else:
-        # Create new user - now user_data doesn't contain 'password'
-        user = User(**user_data)
+        user = User(**values)
         db.add(user)
-    
-    user.last_login = datetime.now()
     db.commit()
     db.refresh(user)
+    _user_changed(user)
     return user
-    #MAY WORK IN CASE NO PASSWORD LIKE CURRENT
+
+
+def update_password_hash(db: Session, uid: str, old_hash: str, new_hash: str) -> bool:
+    """
+    Replace a verified hash (rehash on login). Only updates the row if it
+    still holds old_hash, so a password change made meanwhile isn't undone.
+    """
+    result = db.execute(
+        update(User)
+        .where(User.uid == uid, User.password_hash == old_hash)
+        .values(password_hash=new_hash, updated_at=datetime.now())
+    )
+    db.commit()
+    user_cache.invalidate(uid)  # updated_at changed
+    return result.rowcount == 1
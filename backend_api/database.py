@@ -4,21 +4,76 @@
 # Load environment variables
 import os
 from dotenv import load_dotenv
+from fastapi import Request
 from sqlalchemy import create_engine
+from sqlalchemy.exc import DBAPIError
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
 from sqlalchemy.orm import declarative_base, sessionmaker
 
+from .utils.pool import PoolMetrics, pool_options
+from .utils.profiling import profile_engine
+from .utils.replicas import DATABASE_REPLICA_URLS, Replica, ReplicaSet
+
 
 load_dotenv()
 
 # Database configuration
 DATABASE_URL = os.getenv("DATABASE_URL")
 
-# Database setup
-engine = create_engine(DATABASE_URL)
+# Database setup (pool sizing from DB_POOL_* / DB_MAX_OVERFLOW, see utils/pool.py)
+pool_metrics = PoolMetrics("sync")
+engine = create_engine(DATABASE_URL, **pool_options(make_url(DATABASE_URL), pool_metrics))
+pool_metrics.attach(engine)
+profile_engine(engine)
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 Base = declarative_base()
 
 
+# Async drivers used for the same database by the API
+_ASYNC_DRIVERS = {
+    "sqlite": "sqlite+aiosqlite",
+    "postgresql": "postgresql+asyncpg",
+    "mysql": "mysql+aiomysql",
+    "mariadb": "mariadb+aiomysql",
+}
+
+def _async_url(url: str):
+    url = make_url(url)
+    if url.get_dialect().is_async:
+        return url
+    return url.set(drivername=_ASYNC_DRIVERS[url.get_backend_name()])
+
+# ASYNC_DATABASE_URL overrides the async driver URL derived from DATABASE_URL
+ASYNC_DATABASE_URL = os.getenv("ASYNC_DATABASE_URL") or _async_url(DATABASE_URL)
+async_pool_metrics = PoolMetrics("async")
+async_engine = create_async_engine(
+    ASYNC_DATABASE_URL, **pool_options(make_url(ASYNC_DATABASE_URL), async_pool_metrics, is_async=True)
+)
+async_pool_metrics.attach(async_engine.sync_engine)
+profile_engine(async_engine.sync_engine)
+AsyncSessionLocal = async_sessionmaker(async_engine, class_=AsyncSession, autoflush=False)
+
+
+# Optional read replicas (DATABASE_REPLICA_URLS, see utils/replicas.py).
+# Replica sessions carry info["replica"], so read-through caches can tell
+# that the rows may lag behind the primary.
+replica_pool_metrics = []
+_replicas = []
+for _index, _url in enumerate(DATABASE_REPLICA_URLS, start=1):
+    _metrics = PoolMetrics(f"replica-{_index}")
+    _url = _async_url(_url)
+    _engine = create_async_engine(_url, **pool_options(make_url(_url), _metrics, is_async=True))
+    _metrics.attach(_engine.sync_engine)
+    profile_engine(_engine.sync_engine)
+    replica_pool_metrics.append(_metrics)
+    _replicas.append(Replica(
+        _metrics.name,
+        async_sessionmaker(_engine, class_=AsyncSession, autoflush=False, info={"replica": True}),
+    ))
+read_replicas = ReplicaSet(_replicas)
+
+
 # Dependency to get a DB session
 def get_db():
     db = SessionLocal()
@@ -27,6 +82,47 @@ def get_db():
     finally:
         db.close()
 
+# Dependency used by the routers. The crud functions are synchronous and run
+# on the async connection through AsyncSession.run_sync, so database I/O
+# awaits instead of blocking the event loop.
+async def get_async_db():
+    async with AsyncSessionLocal() as db:
+        yield db
+
+# Dependency for read-only endpoints: a session on the next healthy replica,
+# or on the primary when there are no replicas, the client wrote within the
+# sticky window, or no replica can be reached. Never commit with it.
+async def get_read_db(request: Request):
+    if not read_replicas:
+        async with AsyncSessionLocal() as db:
+            yield db
+        return
+    if read_replicas.pinned(request):
+        read_replicas.pinned_reads += 1
+        async with AsyncSessionLocal() as db:
+            yield db
+        return
+
+    for replica in read_replicas.candidates():
+        db = replica.sessionmaker()
+        try:
+            # Connect up front so an unreachable replica falls through to the next one
+            await db.connection()
+        except (DBAPIError, OSError):
+            await db.close()
+            read_replicas.mark_down(replica)
+            continue
+        replica.sessions += 1
+        try:
+            yield db
+        finally:
+            await db.close()
+        return
+
+    read_replicas.primary_fallbacks += 1
+    async with AsyncSessionLocal() as db:
+        yield db
+
 # You can keep Base.metadata.create_all here or move it to a script
 # that's run once for database initialization. For development, keeping it
 # here is common, but in production, you'd use Alembic migrations.
@@ -1,12 +1,15 @@
 # your_project/main.py
 from contextlib import asynccontextmanager
-from fastapi import FastAPI
+from fastapi import FastAPI, Response
 from fastapi.middleware.cors import CORSMiddleware
 
 # Import your database base for metadata.create_all
-from .database import Base, engine 
+from .database import Base, engine, read_replicas
+from .utils.pagination import NEXT_CURSOR_HEADER
+from .utils.profiling import profile_requests, request_metrics
+from .utils.replicas import PIN_HEADER, pin_primary_after_writes
 # Import your API routers
-from .api import users, categories, products, orders, shipping_address # Assuming you'll create these`
+from .api import users, categories, products, orders, shipping_address, catalog, internal # Assuming you'll create these`
 
 # Optional: Create database tables on startup (good for development, use migrations in production)
 @asynccontextmanager
@@ -31,14 +34,29 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=[NEXT_CURSOR_HEADER, "ETag", "Last-Modified", "Server-Timing", PIN_HEADER],
 )
 
+# Statement count / DB time per request (Server-Timing when DEBUG) and route latency for /metrics
+app.middleware("http")(profile_requests)
+
+# Reads stay on the primary for a few seconds after a client's own write
+if read_replicas:
+    app.middleware("http")(pin_primary_after_writes)
+
 # Include API routers
 app.include_router(users.router)
 app.include_router(categories.router)
 app.include_router(products.router)
 app.include_router(orders.router)
 app.include_router(shipping_address.router)
+app.include_router(catalog.router)
+app.include_router(internal.router)
+
+# Prometheus scrape endpoint (per worker process)
+@app.get("/metrics", include_in_schema=False)
+def metrics():
+    return Response(request_metrics.render(), media_type="text/plain; version=0.0.4; charset=utf-8")
 
 # Health Check
 @app.get("/")
@@ -0,0 +1,124 @@
+"""Baseline schema, as created by Base.metadata.create_all before migrations existed
+
+Revision ID: 0001_baseline
+Revises: 
+Create Date: 2026-10-18 00:00:00
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0001_baseline'
+down_revision: Union[str, Sequence[str], None] = None
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table(
+        'user_info',
+        sa.Column('id', sa.Integer(), primary_key=True),
+        sa.Column('uid', sa.String(100)),
+        sa.Column('provider', sa.String(50)),
+        sa.Column('identifier', sa.String(100)),
+        sa.Column('photo_url', sa.String(500), nullable=True),
+        sa.Column('display_name', sa.String(100), nullable=True),
+        sa.Column('password_hash', sa.String(255), nullable=True),
+        sa.Column('is_active', sa.Boolean()),
+        sa.Column('last_login', sa.DateTime(), nullable=True),
+        sa.Column('created_at', sa.DateTime()),
+        sa.Column('updated_at', sa.DateTime()),
+    )
+    op.create_index('ix_user_info_id', 'user_info', ['id'])
+    op.create_index('ix_user_info_uid', 'user_info', ['uid'], unique=True)
+
+    op.create_table(
+        'shipping_address',
+        sa.Column('id', sa.Integer(), primary_key=True),
+        sa.Column('user_uid', sa.String(), sa.ForeignKey('user_info.uid'), nullable=False),
+        sa.Column('address', sa.String(), nullable=False),
+        sa.Column('is_default', sa.Boolean()),
+        sa.Column('created_at', sa.DateTime()),
+        sa.Column('updated_at', sa.DateTime()),
+    )
+    op.create_index('ix_shipping_address_id', 'shipping_address', ['id'])
+
+    op.create_table(
+        'categories',
+        sa.Column('id', sa.Integer(), primary_key=True),
+        sa.Column('name', sa.String(100), nullable=False, unique=True),
+        sa.Column('description', sa.String(500), nullable=True),
+        sa.Column('is_active', sa.Boolean()),
+        sa.Column('created_at', sa.DateTime()),
+        sa.Column('updated_at', sa.DateTime()),
+    )
+    op.create_index('ix_categories_id', 'categories', ['id'])
+
+    op.create_table(
+        'products',
+        sa.Column('id', sa.Integer(), primary_key=True),
+        sa.Column('name', sa.String(255), nullable=False),
+        sa.Column('description', sa.String(1000), nullable=True),
+        sa.Column('image_url', sa.String(500), nullable=True),
+        sa.Column('price', sa.String(10), nullable=False),
+        sa.Column('sold_count', sa.Integer()),
+        sa.Column('rating', sa.String(4)),
+        sa.Column('review_count', sa.Integer()),
+        sa.Column('delivery_info', sa.String(255), nullable=True),
+        sa.Column('seller_info', sa.String(255), nullable=True),
+        sa.Column('stock_quantity', sa.Integer()),
+        sa.Column('is_active', sa.Boolean()),
+        sa.Column('created_at', sa.DateTime()),
+        sa.Column('updated_at', sa.DateTime()),
+    )
+    op.create_index('ix_products_id', 'products', ['id'])
+
+    op.create_table(
+        'product_categories',
+        sa.Column('id', sa.Integer(), primary_key=True),
+        sa.Column('product_id', sa.Integer(), sa.ForeignKey('products.id'), nullable=False),
+        sa.Column('category_id', sa.Integer(), sa.ForeignKey('categories.id'), nullable=False),
+        sa.Column('created_at', sa.DateTime()),
+    )
+    op.create_index('ix_product_categories_id', 'product_categories', ['id'])
+
+    op.create_table(
+        'orders',
+        sa.Column('id', sa.Integer(), primary_key=True),
+        sa.Column('user_uid', sa.Text(), sa.ForeignKey('user_info.uid'), nullable=False),
+        sa.Column('status', sa.Integer()),
+        sa.Column('total_amount', sa.String(10)),
+        sa.Column('shipping_address_id', sa.Integer(), sa.ForeignKey('shipping_address.id')),
+        sa.Column('billing_method', sa.String(20)),
+        sa.Column('contact_phone', sa.String(20), nullable=True),
+        sa.Column('created_at', sa.DateTime()),
+        sa.Column('updated_at', sa.DateTime()),
+    )
+    op.create_index('ix_orders_id', 'orders', ['id'])
+
+    op.create_table(
+        'order_items',
+        sa.Column('id', sa.Integer(), primary_key=True),
+        sa.Column('order_id', sa.Integer(), sa.ForeignKey('orders.id'), nullable=False),
+        sa.Column('product_id', sa.Integer(), sa.ForeignKey('products.id'), nullable=False),
+        sa.Column('quantity', sa.Integer(), nullable=False),
+        sa.Column('price_per_unit', sa.String(10), nullable=False),
+        sa.Column('created_at', sa.DateTime()),
+    )
+    op.create_index('ix_order_items_id', 'order_items', ['id'])
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table('order_items')
+    op.drop_table('orders')
+    op.drop_table('product_categories')
+    op.drop_table('products')
+    op.drop_table('categories')
+    op.drop_table('shipping_address')
+    op.drop_table('user_info')
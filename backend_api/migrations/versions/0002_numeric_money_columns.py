@@ -0,0 +1,88 @@
+"""Store price, rating and order totals as NUMERIC and index the product sort keys
+
+Revision ID: 0002_numeric_money_columns
+Revises: 0001_baseline
+Create Date: 2026-10-18 00:00:00
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0002_numeric_money_columns'
+down_revision: Union[str, Sequence[str], None] = '0001_baseline'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+# table -> [(column, old type, new type, nullable after upgrade)]
+NUMERIC_COLUMNS = {
+    'products': [
+        ('price', sa.String(10), sa.Numeric(10, 2), False),
+        ('rating', sa.String(4), sa.Numeric(3, 2), False),
+    ],
+    'orders': [
+        ('total_amount', sa.String(10), sa.Numeric(12, 2), False),
+    ],
+    'order_items': [
+        ('price_per_unit', sa.String(10), sa.Numeric(10, 2), False),
+    ],
+}
+
+SORT_INDEXES = [
+    ('ix_products_is_active_price', ['is_active', 'price', 'id']),
+    ('ix_products_is_active_rating', ['is_active', 'rating', 'id']),
+    ('ix_products_is_active_sold_count', ['is_active', 'sold_count', 'id']),
+    ('ix_products_is_active_created_at', ['is_active', 'created_at', 'id']),
+]
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Data migration: the old string columns may hold NULL, '' or padded values,
+    # none of which cast to a number. Normalise them before changing the type.
+    for table, columns in NUMERIC_COLUMNS.items():
+        for column, _, _, _ in columns:
+            op.execute(
+                f"UPDATE {table} SET {column} = '0' "
+                f"WHERE {column} IS NULL OR TRIM({column}) = ''"
+            )
+            op.execute(f"UPDATE {table} SET {column} = TRIM({column})")
+    op.execute("UPDATE products SET sold_count = 0 WHERE sold_count IS NULL")
+
+    for table, columns in NUMERIC_COLUMNS.items():
+        with op.batch_alter_table(table) as batch_op:
+            for column, old_type, new_type, nullable in columns:
+                batch_op.alter_column(
+                    column,
+                    existing_type=old_type,
+                    type_=new_type,
+                    nullable=nullable,
+                    postgresql_using=f'{column}::numeric({new_type.precision},{new_type.scale})',
+                )
+            if table == 'products':
+                batch_op.alter_column('sold_count', existing_type=sa.Integer(), nullable=False)
+
+    for name, columns in SORT_INDEXES:
+        op.create_index(name, 'products', columns)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    for name, _ in SORT_INDEXES:
+        op.drop_index(name, table_name='products')
+
+    for table, columns in NUMERIC_COLUMNS.items():
+        with op.batch_alter_table(table) as batch_op:
+            for column, old_type, new_type, _ in columns:
+                batch_op.alter_column(
+                    column,
+                    existing_type=new_type,
+                    type_=old_type,
+                    nullable=column in ('rating', 'total_amount'),
+                )
+            if table == 'products':
+                batch_op.alter_column('sold_count', existing_type=sa.Integer(), nullable=True)
@@ -0,0 +1,64 @@
+"""Index the hot query paths (order history, carts, order lines, category links, addresses)
+
+Revision ID: 0003_hot_path_indexes
+Revises: 0002_numeric_money_columns
+Create Date: 2026-10-18 00:00:00
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0003_hot_path_indexes'
+down_revision: Union[str, Sequence[str], None] = '0002_numeric_money_columns'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+# (name, table, columns, extra create_index arguments)
+INDEXES = [
+    # Declared on the models for keyset paging but never migrated; databases
+    # built by create_all already have them, hence if_not_exists below
+    ('ix_products_is_active_id', 'products', ['is_active', 'id'], {}),
+    ('ix_categories_is_active_id', 'categories', ['is_active', 'id'], {}),
+    ('ix_orders_user_uid_created_at_id', 'orders', ['user_uid', 'created_at', 'id'],
+     {'mysql_length': {'user_uid': 100}}),
+    ('ix_orders_created_at_id', 'orders', ['created_at', 'id'], {}),
+
+    ('ix_orders_user_uid_status_created_at_id', 'orders', ['user_uid', 'status', 'created_at', 'id'],
+     {'mysql_length': {'user_uid': 100}}),
+    ('ix_orders_status_created_at_id', 'orders', ['status', 'created_at', 'id'], {}),
+    ('ix_order_items_order_id_product_id', 'order_items', ['order_id', 'product_id'], {}),
+    ('ix_product_categories_category_id_product_id', 'product_categories', ['category_id', 'product_id'], {}),
+    ('ix_product_categories_product_id_category_id', 'product_categories', ['product_id', 'category_id'], {}),
+    ('ix_shipping_address_user_uid_is_default', 'shipping_address', ['user_uid', 'is_default'],
+     {'mysql_length': {'user_uid': 100}}),
+    ('ix_products_updated_at', 'products', ['updated_at'], {}),
+]
+
+# Partial index on the cart rows only (status 1) where the dialect supports it;
+# other dialects get a plain index on user_uid
+CART_INDEX = ('ix_orders_cart_user_uid', 'orders', ['user_uid'])
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    for name, table, columns, kwargs in INDEXES:
+        op.create_index(name, table, columns, if_not_exists=True, **kwargs)
+
+    name, table, columns = CART_INDEX
+    if op.get_bind().dialect.name in ('postgresql', 'sqlite'):
+        where = sa.text('status = 1')
+        op.create_index(name, table, columns, if_not_exists=True, postgresql_where=where, sqlite_where=where)
+    else:
+        op.create_index(name, table, columns, if_not_exists=True, mysql_length={'user_uid': 100})
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index(CART_INDEX[0], table_name=CART_INDEX[1], if_exists=True)
+    for name, table, _, _ in reversed(INDEXES):
+        op.drop_index(name, table_name=table, if_exists=True)
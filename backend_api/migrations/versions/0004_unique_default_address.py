@@ -0,0 +1,56 @@
+"""At most one default shipping address per user (partial unique index)
+
+Revision ID: 0004_unique_default_address
+Revises: 0003_hot_path_indexes
+Create Date: 2026-10-18 00:00:00
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0004_unique_default_address'
+down_revision: Union[str, Sequence[str], None] = '0003_hot_path_indexes'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+INDEX = 'ux_shipping_address_user_uid_default'
+# MySQL has no partial indexes; the index is only created where it can be
+DIALECTS = ('postgresql', 'sqlite')
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    if op.get_bind().dialect.name not in DIALECTS:
+        return
+
+    # Users left with several defaults by the old read-then-write code keep
+    # only their newest one, otherwise the index can't be built
+    addresses = sa.table('shipping_address', sa.column('id', sa.Integer), sa.column('user_uid', sa.String),
+                         sa.column('is_default', sa.Boolean))
+    newer = addresses.alias('newer')
+    op.execute(
+        addresses.update()
+        .where(
+            addresses.c.is_default == sa.true(),
+            sa.exists().where(
+                newer.c.user_uid == addresses.c.user_uid,
+                newer.c.is_default == sa.true(),
+                newer.c.id > addresses.c.id,
+            ),
+        )
+        .values(is_default=False)
+    )
+    where = sa.text('is_default')
+    op.create_index(INDEX, 'shipping_address', ['user_uid'], unique=True,
+                    postgresql_where=where, sqlite_where=where)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    if op.get_bind().dialect.name in DIALECTS:
+        op.drop_index(INDEX, table_name='shipping_address')
@@ -0,0 +1,63 @@
+"""Hash of the normalized shipping address, indexed with user_uid for duplicate checks
+
+Revision ID: 0005_address_hash
+Revises: 0004_unique_default_address
+Create Date: 2026-10-18 00:00:00
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+from backend_api.utils.address import address_hash
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0005_address_hash'
+down_revision: Union[str, Sequence[str], None] = '0004_unique_default_address'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+INDEX = 'ix_shipping_address_user_uid_address_hash'
+BATCH_SIZE = 1000
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('shipping_address', sa.Column('address_hash', sa.String(64), nullable=True))
+
+    # Backfill in batches by id, hashing in Python with the same
+    # normalization the application uses
+    bind = op.get_bind()
+    addresses = sa.table('shipping_address', sa.column('id', sa.Integer), sa.column('address', sa.String),
+                         sa.column('address_hash', sa.String))
+    set_hash = (
+        addresses.update()
+        .where(addresses.c.id == sa.bindparam('row_id'))
+        .values(address_hash=sa.bindparam('digest'))
+    )
+    last_id = 0
+    while True:
+        rows = bind.execute(
+            sa.select(addresses.c.id, addresses.c.address)
+            .where(addresses.c.id > last_id)
+            .order_by(addresses.c.id)
+            .limit(BATCH_SIZE)
+        ).all()
+        if not rows:
+            break
+        bind.execute(set_hash, [{'row_id': row_id, 'digest': address_hash(address)} for row_id, address in rows])
+        last_id = rows[-1][0]
+
+    with op.batch_alter_table('shipping_address') as batch_op:
+        batch_op.alter_column('address_hash', existing_type=sa.String(64), nullable=False)
+    op.create_index(INDEX, 'shipping_address', ['user_uid', 'address_hash'], mysql_length={'user_uid': 100})
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index(INDEX, table_name='shipping_address')
+    with op.batch_alter_table('shipping_address') as batch_op:
+        batch_op.drop_column('address_hash')
@@ -0,0 +1,70 @@
+"""At most one default shipping address per user on every dialect (generated column)
+
+Revision ID: 0006_default_address_column
+Revises: 0005_address_hash
+Create Date: 2026-10-18 00:00:00
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0006_default_address_column'
+down_revision: Union[str, Sequence[str], None] = '0005_address_hash'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+INDEX = 'ux_shipping_address_default_user_uid'
+# The partial index of 0004, which MySQL did not get
+PARTIAL_INDEX = 'ux_shipping_address_user_uid_default'
+PARTIAL_DIALECTS = ('postgresql', 'sqlite')
+COLUMN = sa.Column('default_user_uid', sa.String(100),
+                   sa.Computed('CASE WHEN is_default THEN user_uid END', persisted=True))
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    bind = op.get_bind()
+
+    # Users left with several defaults (MySQL skipped 0004) keep only their
+    # newest one. The ids are read first: MySQL can't update a table it
+    # selects from in the same statement.
+    addresses = sa.table('shipping_address', sa.column('id', sa.Integer), sa.column('user_uid', sa.String),
+                         sa.column('is_default', sa.Boolean))
+    newer = addresses.alias('newer')
+    stale = bind.execute(
+        sa.select(addresses.c.id).where(
+            addresses.c.is_default == sa.true(),
+            sa.exists().where(
+                newer.c.user_uid == addresses.c.user_uid,
+                newer.c.is_default == sa.true(),
+                newer.c.id > addresses.c.id,
+            ),
+        )
+    ).scalars().all()
+    if stale:
+        op.execute(addresses.update().where(addresses.c.id.in_(stale)).values(is_default=False))
+
+    # SQLite can only add a stored generated column by rebuilding the table
+    with op.batch_alter_table('shipping_address',
+                              recreate='always' if bind.dialect.name == 'sqlite' else 'auto') as batch_op:
+        batch_op.add_column(COLUMN.copy())
+    op.create_index(INDEX, 'shipping_address', ['default_user_uid'], unique=True)
+    if bind.dialect.name in PARTIAL_DIALECTS:
+        op.drop_index(PARTIAL_INDEX, table_name='shipping_address')
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    bind = op.get_bind()
+    if bind.dialect.name in PARTIAL_DIALECTS:
+        where = sa.text('is_default')
+        op.create_index(PARTIAL_INDEX, 'shipping_address', ['user_uid'], unique=True,
+                        postgresql_where=where, sqlite_where=where)
+    op.drop_index(INDEX, table_name='shipping_address')
+    with op.batch_alter_table('shipping_address') as batch_op:
+        batch_op.drop_column('default_user_uid')
@@ -0,0 +1,54 @@
+"""Partial indexes over the active rows for the product and category listings
+
+Revision ID: 0007_active_partial_indexes
+Revises: 0006_default_address_column
+Create Date: 2026-10-18 00:00:00
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0007_active_partial_indexes'
+down_revision: Union[str, Sequence[str], None] = '0006_default_address_column'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+# (name, table, columns) of the listing indexes from 0003
+INDEXES = [
+    ('ix_products_is_active_id', 'products', ['is_active', 'id']),
+    ('ix_products_is_active_price', 'products', ['is_active', 'price', 'id']),
+    ('ix_products_is_active_rating', 'products', ['is_active', 'rating', 'id']),
+    ('ix_products_is_active_sold_count', 'products', ['is_active', 'sold_count', 'id']),
+    ('ix_products_is_active_created_at', 'products', ['is_active', 'created_at', 'id']),
+    ('ix_categories_is_active_id', 'categories', ['is_active', 'id']),
+]
+# MySQL has no partial indexes and keeps the full ones. The predicates are
+# written the way each planner matches the "is_active = true" of the queries.
+WHERE = {
+    'postgresql': {'postgresql_where': sa.text('is_active')},
+    'sqlite': {'sqlite_where': sa.text('is_active = 1')},
+}
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    where = WHERE.get(op.get_bind().dialect.name)
+    if where is None:
+        return
+    for name, table, columns in INDEXES:
+        op.drop_index(name, table_name=table, if_exists=True)
+        op.create_index(name, table, columns, **where)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    if op.get_bind().dialect.name not in WHERE:
+        return
+    for name, table, columns in INDEXES:
+        op.drop_index(name, table_name=table)
+        op.create_index(name, table, columns)
@@ -2,10 +2,17 @@
 # SQLAlchemy Models
 # ----------------------------------------
 import enum
-from sqlalchemy import ForeignKey, Text, Column, Integer, String, Boolean, DateTime
+from sqlalchemy import Computed, ForeignKey, Index, Numeric, Text, Column, Integer, String, Boolean, DateTime, text
 from sqlalchemy.orm import relationship
 from datetime import datetime, timezone
 from .database import Base
+from .utils.address import address_hash
+
+
+# Listing indexes cover the active rows only (partial index) where the dialect
+# supports it, written the way each planner matches "is_active = true"; MySQL
+# builds the plain index, hence is_active stays the leading column
+ACTIVE_ROWS = {"postgresql_where": text("is_active"), "sqlite_where": text("is_active = 1")}
 
 
 class User(Base):
@@ -32,13 +39,28 @@ class ShippingAddress(Base):
     id = Column(Integer, primary_key=True, index=True)
     user_uid = Column(String, ForeignKey("user_info.uid"), nullable=False)
     address = Column(String, nullable = False)
+    # utils.address.address_hash(address): duplicate detection by index probe
+    address_hash = Column(String(64), nullable=False,
+                          default=lambda context: address_hash(context.get_current_parameters()["address"]))
     is_default = Column(Boolean, default = True)
+    # user_uid on the default address, NULL on the others: unique-indexed, so
+    # a user has at most one default address (MySQL has no partial indexes)
+    default_user_uid = Column(String(100), Computed("CASE WHEN is_default THEN user_uid END", persisted=True))
     created_at = Column(DateTime, default=lambda: datetime.now())
     updated_at = Column(DateTime, default=lambda: datetime.now(), onupdate=lambda: datetime.now())
 
     user = relationship("User", back_populates="shipping_addresses")
     orders = relationship("Order", back_populates="shipping_address_obj")
 
+    __table_args__ = (
+        # address book and default-address lookups of a user
+        Index("ix_shipping_address_user_uid_is_default", "user_uid", "is_default", mysql_length={"user_uid": 100}),
+        # duplicate check of create_shipping_address
+        Index("ix_shipping_address_user_uid_address_hash", "user_uid", "address_hash", mysql_length={"user_uid": 100}),
+        # at most one default address per user
+        Index("ux_shipping_address_default_user_uid", "default_user_uid", unique=True),
+    )
+
 
 
 class Category(Base):
@@ -53,6 +75,10 @@ class Category(Base):
 
     category_products = relationship("ProductCategory", back_populates="category")
 
+    __table_args__ = (
+        Index("ix_categories_is_active_id", "is_active", "id", **ACTIVE_ROWS),  # keyset paging of active categories
+    )
+
 
 class Product(Base):
     __tablename__ = "products"
@@ -61,9 +87,9 @@ class Product(Base):
     name = Column(String(255), nullable=False)
     description = Column(String(1000), nullable=True)
     image_url = Column(String(500), nullable=True)
-    price = Column(String(10), nullable=False)  # Using String to handle decimal precision
-    sold_count = Column(Integer, default=0)
-    rating = Column(String(4), default="0.0")  # Using String for decimal precision
+    price = Column(Numeric(10, 2), nullable=False)
+    sold_count = Column(Integer, default=0, nullable=False)
+    rating = Column(Numeric(3, 2), default=0, nullable=False)
     review_count = Column(Integer, default=0)
     delivery_info = Column(String(255), nullable=True)
     seller_info = Column(String(255), nullable=True)
@@ -75,6 +101,16 @@ class Product(Base):
 
     product_categories = relationship("ProductCategory", back_populates="product")
 
+    __table_args__ = (
+        Index("ix_products_is_active_id", "is_active", "id", **ACTIVE_ROWS),  # keyset paging of active products
+        # sort=price|rating|sold_count|newest on GET /products/
+        Index("ix_products_is_active_price", "is_active", "price", "id", **ACTIVE_ROWS),
+        Index("ix_products_is_active_rating", "is_active", "rating", "id", **ACTIVE_ROWS),
+        Index("ix_products_is_active_sold_count", "is_active", "sold_count", "id", **ACTIVE_ROWS),
+        Index("ix_products_is_active_created_at", "is_active", "created_at", "id", **ACTIVE_ROWS),
+        Index("ix_products_updated_at", "updated_at"),  # max(updated_at) of the catalog validator
+    )
+
 
 class ProductCategory(Base):
     __tablename__ = "product_categories"
@@ -87,6 +123,11 @@ class ProductCategory(Base):
     product = relationship("Product", back_populates="product_categories")
     category = relationship("Category", back_populates="category_products")
 
+    __table_args__ = (
+        Index("ix_product_categories_category_id_product_id", "category_id", "product_id"),  # products of a category
+        Index("ix_product_categories_product_id_category_id", "product_id", "category_id"),  # categories of products
+    )
+
 
 # ... (your existing OrderStatus enum)
 class OrderStatus(enum.Enum):
@@ -103,7 +144,7 @@ class Order(Base):
     id = Column(Integer, primary_key=True, index=True)
     user_uid = Column(Text, ForeignKey("user_info.uid"), nullable = False)
     status = Column(Integer, default = 1) #0: deactivated, 1: cart, 2: processing, 3: completed
-    total_amount = Column(String(10), default = 0.0)
+    total_amount = Column(Numeric(12, 2), default = 0, nullable = False)
     shipping_address_id = Column(Integer, ForeignKey("shipping_address.id"))
     billing_method = Column(String(20), default = "Cash")
     contact_phone = Column(String(20), nullable = True)
@@ -115,6 +156,19 @@ class Order(Base):
     items = relationship("OrderItem", back_populates= "order")
     shipping_address_obj = relationship("ShippingAddress", back_populates="orders")
 
+    # keyset paging of order history / admin listing on (created_at, id)
+    __table_args__ = (
+        Index("ix_orders_user_uid_created_at_id", "user_uid", "created_at", "id", mysql_length={"user_uid": 100}),
+        Index("ix_orders_created_at_id", "created_at", "id"),
+        # order history filtered by status, admin listing by status
+        Index("ix_orders_user_uid_status_created_at_id", "user_uid", "status", "created_at", "id",
+              mysql_length={"user_uid": 100}),
+        Index("ix_orders_status_created_at_id", "status", "created_at", "id"),
+        # the user's cart; partial (only status 1 rows) where the dialect supports it
+        Index("ix_orders_cart_user_uid", "user_uid", mysql_length={"user_uid": 100},
+              postgresql_where=text("status = 1"), sqlite_where=text("status = 1")),
+    )
+
 class OrderItem(Base):
     __tablename__ = "order_items"
 
@@ -122,8 +176,12 @@ class OrderItem(Base):
     order_id = Column(Integer, ForeignKey("orders.id"), nullable = False)
     product_id = Column(Integer, ForeignKey("products.id"), nullable = False)
     quantity = Column(Integer, nullable = False)
-    price_per_unit = Column(String(10), nullable = False)
+    price_per_unit = Column(Numeric(10, 2), nullable = False)
     created_at = Column(DateTime, default=lambda: datetime.now())
 
     order = relationship("Order", back_populates= "items")
-    product = relationship("Product")
\ No newline at end of file
+    product = relationship("Product")
+
+    __table_args__ = (
+        Index("ix_order_items_order_id_product_id", "order_id", "product_id"),  # lines of an order
+    )
\ No newline at end of file
@@ -6,7 +6,7 @@
 # ----------------------------------------
 
 from datetime import datetime
-from typing import List, Optional
+from typing import List, Literal, Optional
 from pydantic import BaseModel, ValidationInfo, field_validator
 
 
@@ -110,6 +110,27 @@ class ProductResponse(ProductBase):
     created_at: Optional[datetime] = None
     updated_at: Optional[datetime] = None
 
+class ProductImportCategory(BaseModel):
+    id: int
+
+class ProductImport(ProductCreate):
+    """One row of POST /products/bulk, in the static_json/product.json format"""
+    id: Optional[int] = None
+    categories: List[ProductImportCategory] = []  # used when category_ids is empty
+    created_at: Optional[datetime] = None
+    updated_at: Optional[datetime] = None
+
+class ProductImportError(BaseModel):
+    index: int  # position of the row in the request
+    id: Optional[int] = None
+    error: str
+
+class ProductImportResult(BaseModel):
+    created: int
+    failed: int
+    ids: List[int] = []  # ids of the created rows, in request order
+    errors: List[ProductImportError] = []
+
 
 
 class OrderItemBase(BaseModel):
@@ -163,6 +184,12 @@ class OrderUpdate(BaseModel):
             raise ValueError('Shipping address ID is required when updating to processing or completed status')
         return v
 
+class CartItemOperation(BaseModel):
+    product_id: int
+    quantity: int = 1
+    # add: add quantity (negative decreases), set: set the quantity (0 removes), remove: drop the line
+    op: Literal["add", "set", "remove"] = "add"
+
 class OrderResponse(OrderBase):
     id: int
     total_amount: float
@@ -0,0 +1,125 @@
+# ----------------------------------------
+# Catalog loader
+# ----------------------------------------
+# Loads categories and products from JSON arrays in the static_json format
+# into DATABASE_URL, using the same chunked bulk insert as POST /products/bulk.
+#
+#   python -m backend_api.seed static_json/product.json --categories static_json/category.json
+import argparse
+import json
+import sys
+import time
+
+from typing import List
+
+from pydantic import ValidationError
+from sqlalchemy import insert, text
+
+from .crud.products import IMPORT_CHUNK_SIZE, _validation_message, import_products
+from .database import SessionLocal
+from .models import Category
+from .schemas import CategoryCreate
+
+
+def load_categories(db, rows) -> dict:
+    """
+    Insert the categories whose id is not in the database yet. As in
+    import_products, rows that can't be inserted are reported in 'errors'
+    (with their index in rows) and skipped.
+    """
+    errors: List[dict] = []
+    created: List[int] = []
+
+    def fail(index: int, row_id, message: str):
+        errors.append({"index": index, "id": row_id, "error": message})
+
+    existing = {category_id for (category_id,) in db.query(Category.id)}
+    names = {name for (name,) in db.query(Category.name)}
+    new_rows = []
+    for index, raw in enumerate(rows):
+        row_id = raw.get("id") if isinstance(raw, dict) else None
+        try:
+            category = CategoryCreate.model_validate(raw)
+        except ValidationError as e:
+            fail(index, row_id, _validation_message(e))
+            continue
+        if not isinstance(row_id, int) or isinstance(row_id, bool):
+            fail(index, row_id, "id: an integer id is required")
+        elif row_id in existing:
+            continue  # loaded before
+        elif category.name in names:
+            fail(index, row_id, f"Category named {category.name!r} already exists")
+        else:
+            existing.add(row_id)
+            names.add(category.name)
+            new_rows.append((index, {
+                "id": row_id,
+                "name": category.name,
+                "description": category.description,
+                "is_active": category.is_active is not False,
+            }))
+
+    if new_rows:
+        try:
+            with db.begin_nested():
+                db.execute(insert(Category), [values for _, values in new_rows])
+            created = [values["id"] for _, values in new_rows]
+        except Exception:
+            # Retry row by row so only the offending rows are dropped
+            for index, values in new_rows:
+                try:
+                    with db.begin_nested():
+                        db.execute(insert(Category), [values])
+                    created.append(values["id"])
+                except Exception as e:  # database or driver error for this row only
+                    fail(index, values["id"], str(getattr(e, "orig", e)))
+        if created and db.get_bind().dialect.name == 'postgresql':
+            # Explicit ids do not advance the serial sequence
+            db.execute(text(
+                "SELECT setval(pg_get_serial_sequence('categories', 'id'), (SELECT MAX(id) FROM categories))"
+            ))
+        db.commit()
+
+    errors.sort(key=lambda error: error["index"])
+    return {"created": len(created), "failed": len(errors), "ids": created, "errors": errors}
+
+
+def _print_errors(result: dict):
+    for error in result["errors"][:50]:
+        print(f"  row {error['index']} (id {error['id']}): {error['error']}")
+    if result["failed"] > 50:
+        print(f"  ... {result['failed'] - 50} more")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Load products (and categories) from JSON files")
+    parser.add_argument("products", help="JSON array of products, e.g. static_json/product.json")
+    parser.add_argument("--categories", help="JSON array of categories to create first, e.g. static_json/category.json")
+    parser.add_argument("--chunk-size", type=int, default=IMPORT_CHUNK_SIZE, help="rows per transaction")
+    args = parser.parse_args()
+
+    db = SessionLocal()
+    try:
+        categories = None
+        if args.categories:
+            with open(args.categories, encoding="utf-8") as f:
+                categories = load_categories(db, json.load(f))
+            print(f"categories: {categories['created']} created, {categories['failed']} failed")
+            _print_errors(categories)
+
+        with open(args.products, encoding="utf-8") as f:
+            rows = json.load(f)
+        start = time.perf_counter()
+        result = import_products(db, rows, chunk_size=args.chunk_size)
+        elapsed = time.perf_counter() - start
+    finally:
+        db.close()
+
+    print(f"products: {result['created']} created, {result['failed']} failed "
+          f"in {elapsed:.2f}s ({len(rows) / elapsed if elapsed else 0:.0f} rows/s)")
+    _print_errors(result)
+    return 1 if result["failed"] or (categories and categories["failed"]) else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,60 @@
+# ----------------------------------------
+# Test setup: the app on a throwaway SQLite file
+# ----------------------------------------
+# Run from the repo root:  python -m pytest backend_api/tests
+import os
+import tempfile
+
+# The database modules read these at import time
+_tmp = tempfile.mkdtemp(prefix="umet_tests_")
+os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(_tmp, 'test.db')}"
+os.environ["CATALOG_SNAPSHOT_DIR"] = os.path.join(_tmp, "snapshot")
+os.environ.pop("DATABASE_REPLICA_URLS", None)
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import event
+
+from backend_api.crud.products import product_cache
+from backend_api.crud.users import user_cache
+from backend_api.utils.search import product_search
+from backend_api.database import Base, SessionLocal, engine
+from backend_api.main import app
+
+
+@pytest.fixture(autouse=True)
+def fresh_database():
+    """Empty tables, caches and search index for every test"""
+    Base.metadata.drop_all(bind=engine)
+    Base.metadata.create_all(bind=engine)
+    product_cache.clear()
+    user_cache.clear()
+    product_search.invalidate()
+    yield
+
+
+@pytest.fixture
+def db():
+    session = SessionLocal()
+    try:
+        yield session
+    finally:
+        session.close()
+
+
+@pytest.fixture
+def client():
+    return TestClient(app)
+
+
+@pytest.fixture
+def statements():
+    """SQL statements run on the sync engine while the test is active"""
+    seen = []
+
+    def before(conn, cursor, statement, parameters, context, executemany):
+        seen.append(statement)
+
+    event.listen(engine, "before_cursor_execute", before)
+    yield seen
+    event.remove(engine, "before_cursor_execute", before)
@@ -0,0 +1,90 @@
+import pytest
+from sqlalchemy import event, func, insert, select
+
+from backend_api.crud import orders as crud_orders
+from backend_api.database import SessionLocal, engine
+from backend_api.models import Order, Product, User
+from backend_api.schemas import CartItemOperation
+
+
+@pytest.fixture
+def products(db):
+    """A user and two products, priced 10 and 3"""
+    db.execute(insert(User), [{"uid": "buyer", "provider": "email", "identifier": "buyer@example.com"}])
+    product_ids = db.execute(insert(Product).returning(Product.id), [
+        {"name": name, "price": price, "rating": 0, "sold_count": 0, "stock_quantity": 100, "is_active": True}
+        for name, price in (("Lamp", 10), ("Bulb", 3))
+    ]).scalars().all()
+    db.commit()
+    return product_ids
+
+
+def _lines(db):
+    db.expire_all()
+    cart = crud_orders.get_user_cart(db, "buyer")
+    return {item.product_id: item.quantity for item in cart.items}, float(cart.total_amount)
+
+
+def test_batch_applies_operations_in_order(db, client, products):
+    lamp, bulb = products
+    client.post(f"/users/buyer/cart/items/?product_id={lamp}&quantity=2")
+    response = client.post("/users/buyer/cart/items:batch", json=[
+        {"product_id": lamp, "quantity": 3},
+        {"product_id": bulb, "quantity": 5, "op": "set"},
+        {"product_id": bulb, "quantity": -1},
+        {"product_id": lamp, "op": "remove"},
+        {"product_id": lamp, "quantity": 1},
+    ])
+    assert response.status_code == 200
+    assert response.json()["total_amount"] == 1 * 10 + 4 * 3
+    assert _lines(db) == ({lamp: 1, bulb: 4}, 22)
+
+
+def test_remove_only_batch_creates_no_cart(db, client, products):
+    lamp, _ = products
+    response = client.post("/users/buyer/cart/items:batch", json=[{"product_id": lamp, "op": "remove"}])
+    assert response.status_code == 404
+    assert db.scalar(select(func.count(Order.id))) == 0
+
+
+def test_batch_add_keeps_a_concurrent_add(db, products):
+    lamp, _ = products
+    crud_orders.add_item_to_cart(db, "buyer", lamp, 2)
+
+    # Another request adds 5 lamps after the batch has read the cart, before it writes
+    done = []
+
+    def concurrent_add(conn, cursor, statement, parameters, context, executemany):
+        if not done and statement.startswith("UPDATE order_items"):
+            done.append(True)
+            with SessionLocal() as other:
+                crud_orders.add_item_to_cart(other, "buyer", lamp, 5)
+
+    event.listen(engine, "before_cursor_execute", concurrent_add)
+    try:
+        with SessionLocal() as session:
+            crud_orders.apply_cart_operations(session, "buyer", [
+                CartItemOperation(product_id=lamp, quantity=1)
+            ])
+    finally:
+        event.remove(engine, "before_cursor_execute", concurrent_add)
+    assert done
+    assert _lines(db) == ({lamp: 8}, 80)
+
+
+def test_add_to_cart_deletes_lines_taken_to_zero(db, client, products):
+    lamp, bulb = products
+    client.post(f"/users/buyer/cart/items/?product_id={lamp}&quantity=2")
+    client.post(f"/users/buyer/cart/items/?product_id={bulb}&quantity=1")
+    assert client.post(f"/users/buyer/cart/items/?product_id={lamp}&quantity=-1").status_code == 200
+    assert _lines(db) == ({lamp: 1, bulb: 1}, 13)
+    assert client.post(f"/users/buyer/cart/items/?product_id={lamp}&quantity=-5").status_code == 200
+    assert _lines(db) == ({bulb: 1}, 3)
+
+
+@pytest.mark.parametrize("quantity", [0, -1])
+def test_add_to_cart_needs_a_positive_new_line(db, client, products, quantity):
+    lamp, _ = products
+    response = client.post(f"/users/buyer/cart/items/?product_id={lamp}&quantity={quantity}")
+    assert response.status_code == 400
+    assert db.scalar(select(func.count(Order.id))) == 0
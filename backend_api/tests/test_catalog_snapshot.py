@@ -0,0 +1,38 @@
+import asyncio
+import threading
+
+import httpx
+from sqlalchemy import insert
+
+from backend_api.api import catalog
+from backend_api.main import app
+from backend_api.models import Product
+from backend_api.utils.snapshot import CatalogSnapshot
+
+
+def test_concurrent_cold_snapshot_requests_finish(db, monkeypatch, tmp_path):
+    db.execute(insert(Product), [
+        {"name": f"Product {i}", "price": 1, "rating": 0, "sold_count": 0, "is_active": True}
+        for i in range(500)
+    ])
+    db.commit()
+    # Cold: nothing built yet
+    monkeypatch.setattr(catalog, "catalog_snapshot", CatalogSnapshot(directory=str(tmp_path)))
+
+    results = []
+
+    async def burst():
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+            responses = await asyncio.gather(*(client.get("/catalog/snapshot") for _ in range(4)))
+        results.extend(responses)
+
+    # A deadlocked event loop can't time itself out, so watch it from another thread
+    worker = threading.Thread(target=lambda: asyncio.run(burst()), daemon=True)
+    worker.start()
+    worker.join(timeout=20)
+
+    assert not worker.is_alive(), "cold snapshot requests deadlocked"
+    assert [response.status_code for response in results] == [200] * 4
+    assert len({response.headers["etag"] for response in results}) == 1
+    assert len(results[0].json()["products"]) == 500
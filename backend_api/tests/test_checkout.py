@@ -0,0 +1,67 @@
+import pytest
+from sqlalchemy import insert
+
+from backend_api.models import Order, OrderItem, Product, ShippingAddress, User
+
+
+@pytest.fixture
+def cart(db, client):
+    """A user with an address and a cart holding 2 units of a product with 10 in stock"""
+    db.execute(insert(User), [{"uid": "buyer", "provider": "email", "identifier": "buyer@example.com"}])
+    product_id = db.execute(insert(Product).returning(Product.id), [
+        {"name": "Lamp", "price": 25, "rating": 0, "sold_count": 0, "stock_quantity": 10, "is_active": True}
+    ]).scalar_one()
+    address_id = db.execute(insert(ShippingAddress).returning(ShippingAddress.id), [
+        {"user_uid": "buyer", "address": "1 Test Street", "is_default": True}
+    ]).scalar_one()
+    db.commit()
+    response = client.post(f"/users/buyer/cart/items/?product_id={product_id}&quantity=2")
+    assert response.status_code == 200
+    cart_id = response.json()["cart_id"]
+    assert client.put(f"/orders/{cart_id}", json={"shipping_address_id": address_id}).status_code == 200
+    return cart_id, product_id, address_id
+
+
+def _stock(db, product_id):
+    db.expire_all()
+    product = db.get(Product, product_id)
+    return product.stock_quantity, product.sold_count
+
+
+@pytest.mark.parametrize("status", [2, 3])
+def test_status_change_out_of_cart_takes_stock(db, client, cart, status):
+    cart_id, product_id, _ = cart
+    response = client.put(f"/orders/{cart_id}/status/{status}")
+    assert response.status_code == 200
+    assert response.json()["status"] == status
+    assert _stock(db, product_id) == (8, 2)
+
+
+def test_status_change_out_of_cart_checks_stock(db, client, cart):
+    cart_id, product_id, _ = cart
+    db.get(Product, product_id).stock_quantity = 1
+    db.commit()
+    assert client.put(f"/orders/{cart_id}/status/3").status_code == 400
+    assert _stock(db, product_id) == (1, 0)
+    assert db.get(Order, cart_id).status == 1
+
+
+def test_create_order_only_creates_carts(db, client, cart):
+    _, product_id, address_id = cart
+    response = client.post("/orders/", json={
+        "user_uid": "buyer", "status": 2, "shipping_address_id": address_id,
+        "items": [{"product_id": product_id, "quantity": 5, "price_per_unit": 0.01}],
+    })
+    assert response.status_code == 400
+    assert _stock(db, product_id) == (10, 0)
+    assert db.query(Order).filter(Order.status == 2).count() == 0
+
+
+@pytest.mark.parametrize("quantity", [0, -3])
+def test_checkout_rejects_non_positive_lines(db, client, cart, quantity):
+    cart_id, product_id, _ = cart
+    db.query(OrderItem).filter(OrderItem.order_id == cart_id).update({"quantity": quantity})
+    db.commit()
+    assert client.put(f"/orders/{cart_id}/status/2").status_code == 400
+    assert _stock(db, product_id) == (10, 0)
+    assert db.get(Order, cart_id).status == 1
@@ -0,0 +1,99 @@
+import time
+from datetime import datetime, timedelta, timezone
+from email.utils import format_datetime
+
+from sqlalchemy import insert, update
+from starlette.requests import Request
+
+from backend_api.models import Product
+from backend_api.utils.http_cache import Validator
+
+
+def _request(**headers):
+    return Request({
+        "type": "http", "method": "GET", "path": "/products/", "query_string": b"",
+        "headers": [(name.replace("_", "-").encode(), value.encode()) for name, value in headers.items()],
+    })
+
+
+def test_last_modified_waits_for_the_second_to_end():
+    # A change in the current second may be followed by another one in the
+    # same second, which If-Modified-Since could not tell apart
+    now = datetime.now()
+    validator = Validator(_request(), 1, last_modified=now)
+    assert validator.last_modified is None
+    assert "Last-Modified" not in validator.headers()
+    since = format_datetime(now.replace(microsecond=0).astimezone(timezone.utc), usegmt=True)
+    assert not validator.matches(_request(if_modified_since=since))
+
+
+def test_if_modified_since_for_a_past_second():
+    changed = datetime.now() - timedelta(seconds=5)
+    validator = Validator(_request(), 1, last_modified=changed)
+    since = validator.headers()["Last-Modified"]
+    assert validator.matches(_request(if_modified_since=since))
+    # A later change in the same second changes the state: the ETag decides
+    later = Validator(_request(), 2, last_modified=changed + timedelta(microseconds=1))
+    assert later.headers()["Last-Modified"] == since
+    assert not later.matches(_request(if_none_match=validator.etag, if_modified_since=since))
+    assert later.matches(_request(if_none_match=later.etag))
+
+
+def test_naive_local_times_are_sent_in_gmt(monkeypatch):
+    monkeypatch.setenv("TZ", "Asia/Ho_Chi_Minh")  # UTC+7
+    time.tzset()
+    try:
+        validator = Validator(_request(), 1, last_modified=datetime(2026, 1, 2, 12, 0, 0))
+        assert validator.headers()["Last-Modified"] == "Fri, 02 Jan 2026 05:00:00 GMT"
+    finally:
+        monkeypatch.undo()
+        time.tzset()
+
+
+def _product(**values):
+    return {"name": "Lamp", "price": 25, "rating": 0, "sold_count": 0, "stock_quantity": 10,
+            "is_active": True, **values}
+
+
+def test_product_detail_body_follows_its_etag(db, client):
+    product_id = db.execute(insert(Product).returning(Product.id), [_product()]).scalar_one()
+    db.commit()
+    first = client.get(f"/products/{product_id}")
+    assert first.json()["name"] == "Lamp"
+
+    # Written through another worker: this worker's product_cache still has the old row
+    db.execute(update(Product).where(Product.id == product_id).values(
+        name="Desk lamp", updated_at=datetime.now() + timedelta(seconds=1)))
+    db.commit()
+    second = client.get(f"/products/{product_id}", headers={"If-None-Match": first.headers["ETag"]})
+    assert second.status_code == 200
+    assert second.json()["name"] == "Desk lamp"
+
+
+def test_search_results_follow_the_catalog_etag(db, client):
+    db.execute(insert(Product), [_product()])
+    db.commit()
+    assert len(client.get("/products/", params={"q": "lamp"}).json()) == 1
+
+    # Added through another worker: this worker's search index does not have it
+    db.execute(insert(Product), [_product(name="Floor lamp")])
+    db.commit()
+    assert len(client.get("/products/", params={"q": "lamp"}).json()) == 2
+
+
+def test_product_list_etag_follows_new_rows_with_old_timestamps(db, client):
+    old = datetime.now() - timedelta(days=30)
+    row = _product(id=10, created_at=old, updated_at=old)
+    db.execute(insert(Product), [row])
+    db.commit()
+    first = client.get("/products/")
+    assert first.status_code == 200
+    assert "Last-Modified" in first.headers
+    assert client.get("/products/", headers={"If-None-Match": first.headers["ETag"]}).status_code == 304
+
+    # Imported below max(id) with the same old updated_at
+    db.execute(insert(Product), [dict(row, id=5, name="Chair")])
+    db.commit()
+    second = client.get("/products/", headers={"If-None-Match": first.headers["ETag"]})
+    assert second.status_code == 200
+    assert len(second.json()) == 2
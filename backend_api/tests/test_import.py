@@ -0,0 +1,33 @@
+from sqlalchemy import select
+
+from backend_api.crud.products import import_products
+from backend_api.models import Category, Product
+from backend_api.seed import load_categories
+
+
+def test_import_inserts_in_a_few_statements(db, statements):
+    rows = [{"name": f"Product {i}", "price": 1} for i in range(3000)]
+    rows[5] = {"id": 10000, "name": "Explicit", "price": 1}
+    rows[7] = {"name": "No price"}
+    statements.clear()
+
+    result = import_products(db, rows)
+
+    assert (result["created"], result["failed"]) == (2999, 1)
+    assert len([statement for statement in statements if statement.startswith("INSERT")]) <= 10
+    names = dict(db.execute(select(Product.id, Product.name)).all())
+    accepted = [row for index, row in enumerate(rows) if index != 7]
+    assert [names[product_id] for product_id in result["ids"]] == [row["name"] for row in accepted]
+
+
+def test_load_categories_reports_bad_rows(db):
+    result = load_categories(db, [
+        {"id": 1, "name": "Lamps"},
+        {"id": 2, "name": "Lamps"},
+        {"name": "No id"},
+        {"id": 3},
+        {"id": 1, "name": "Lamps"},
+    ])
+    assert (result["created"], result["failed"]) == (1, 3)
+    assert [error["index"] for error in result["errors"]] == [1, 2, 3]
+    assert db.scalars(select(Category.name)).all() == ["Lamps"]
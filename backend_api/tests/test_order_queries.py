@@ -0,0 +1,53 @@
+import pytest
+from sqlalchemy import insert
+
+from backend_api.crud import orders as crud_orders
+from backend_api.models import Order, OrderItem, Product, ShippingAddress, User
+from backend_api.utils.serialization import orders_response
+
+
+def _add_orders(db, user_uid, n_orders, items_per_order):
+    """n_orders delivered orders of user_uid with items_per_order lines each, on products of their own"""
+    address_id = db.execute(insert(ShippingAddress).returning(ShippingAddress.id), [
+        {"user_uid": user_uid, "address": f"{n_orders} {items_per_order} Test Street", "is_default": False}
+    ]).scalar_one()
+    product_ids = db.execute(insert(Product).returning(Product.id), [
+        {"name": f"Product {i}", "price": 10, "rating": 0, "sold_count": 0, "stock_quantity": 100,
+         "is_active": True} for i in range(items_per_order)
+    ]).scalars().all()
+    for _ in range(n_orders):
+        order_id = db.execute(insert(Order).returning(Order.id), [
+            {"user_uid": user_uid, "status": 4, "total_amount": 10 * items_per_order,
+             "shipping_address_id": address_id}
+        ]).scalar_one()
+        db.execute(insert(OrderItem), [
+            {"order_id": order_id, "product_id": product_id, "quantity": 1, "price_per_unit": 10}
+            for product_id in product_ids
+        ])
+    db.commit()
+
+
+def _count(db, statements, fetch):
+    """Statements run by fetch(db) and the serialization of its orders"""
+    db.expire_all()
+    statements.clear()
+    orders, _ = fetch(db)
+    orders_response(orders)
+    return len(orders), len(statements)
+
+
+@pytest.mark.parametrize("fetch", [
+    lambda db: crud_orders.get_orders_by_user_page(db, "buyer", limit=100),
+    lambda db: crud_orders.get_orders_page(db, status=4, limit=100),
+], ids=["get_orders_by_user_page", "get_orders_page"])
+def test_order_pages_use_a_fixed_number_of_statements(db, statements, fetch):
+    db.execute(insert(User), [{"uid": "buyer", "provider": "email", "identifier": "buyer@example.com"}])
+    _add_orders(db, "buyer", n_orders=2, items_per_order=1)
+    small = _count(db, statements, fetch)
+
+    _add_orders(db, "buyer", n_orders=30, items_per_order=5)
+    large = _count(db, statements, fetch)
+
+    assert (small[0], large[0]) == (2, 32)
+    # The page, its items and its addresses: independent of orders and items
+    assert small[1] == large[1] <= 3
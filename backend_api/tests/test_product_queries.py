@@ -0,0 +1,41 @@
+from sqlalchemy import insert
+from starlette.requests import Request
+
+from backend_api.api.products import _read_products
+from backend_api.models import Category, Product, ProductCategory
+
+
+def _add_products(db, count):
+    """count products, each in two categories"""
+    category_ids = db.execute(insert(Category).returning(Category.id), [
+        {"name": f"Category {count}-{i}"} for i in range(2)
+    ]).scalars().all()
+    product_ids = db.execute(insert(Product).returning(Product.id), [
+        {"name": f"Product {i}", "price": 10, "rating": 0, "sold_count": 0, "stock_quantity": 1, "is_active": True}
+        for i in range(count)
+    ]).scalars().all()
+    db.execute(insert(ProductCategory), [
+        {"product_id": product_id, "category_id": category_id}
+        for product_id in product_ids for category_id in category_ids
+    ])
+    db.commit()
+
+
+def _list(db, statements, limit):
+    """Statements of one GET /products/ page (validator, page, categories, serialization)"""
+    request = Request({"type": "http", "method": "GET", "path": "/products/",
+                       "query_string": f"limit={limit}".encode(), "headers": []})
+    db.expire_all()
+    statements.clear()
+    response = _read_products(db, request, skip=0, limit=limit, category_id=None, q=None, cursor=None,
+                              min_price=None, max_price=None, min_rating=None, sort=None)
+    assert response.status_code == 200
+    return len(statements)
+
+
+def test_product_pages_use_a_fixed_number_of_statements(db, statements):
+    _add_products(db, 1)
+    one = _list(db, statements, limit=1)
+    _add_products(db, 60)
+    fifty = _list(db, statements, limit=50)
+    assert one == fifty <= 3
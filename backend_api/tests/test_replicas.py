@@ -0,0 +1,34 @@
+import time
+
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from starlette.requests import Request
+
+from backend_api.utils.replicas import PIN_COOKIE, PIN_HEADER, ReplicaSet, pin_primary_after_writes
+
+
+def _request(headers=()):
+    return Request({"type": "http", "method": "GET", "path": "/", "query_string": b"",
+                    "headers": [(name.lower().encode(), value.encode()) for name, value in headers]})
+
+
+def test_write_answers_the_pin_header_and_cookie():
+    app = FastAPI()
+    app.middleware("http")(pin_primary_after_writes)
+    app.post("/write")(lambda: {})
+    app.get("/read")(lambda: {})
+
+    client = TestClient(app)
+    assert PIN_HEADER not in client.get("/read").headers
+    response = client.post("/write")
+    assert float(response.headers[PIN_HEADER]) > time.time()
+    assert response.cookies[PIN_COOKIE] == response.headers[PIN_HEADER]
+
+
+def test_reads_echoing_the_header_are_pinned():
+    # package:http (the Flutter client) sends no cookies, only the header
+    replicas = ReplicaSet([])
+    assert replicas.pinned(_request([(PIN_HEADER, f"{time.time() + 5:.3f}")]))
+    assert not replicas.pinned(_request([(PIN_HEADER, f"{time.time() - 1:.3f}")]))
+    assert not replicas.pinned(_request([(PIN_HEADER, "soon")]))
+    assert not replicas.pinned(_request())
@@ -0,0 +1,37 @@
+import pytest
+from sqlalchemy import insert
+
+from backend_api.models import Product
+from backend_api.utils.search import tokenize
+
+NAMES = ["Áo dài lụa", "Nón lá Đà Nẵng", "苹果手机壳", "Чайник электрический", "Lamp"]
+
+
+@pytest.fixture
+def products(db):
+    ids = db.execute(insert(Product).returning(Product.id), [
+        {"name": name, "price": 10, "rating": 0, "sold_count": 0, "stock_quantity": 1, "is_active": True}
+        for name in NAMES
+    ]).scalars().all()
+    db.commit()
+    return dict(zip(NAMES, ids))
+
+
+def test_tokenize_keeps_non_latin_words():
+    assert tokenize("Nón lá Đà Nẵng") == ["non", "la", "da", "nang"]
+    assert tokenize("Чайник, 2L") == tokenize("чайник 2l")
+    assert tokenize("手机壳") == ["手机", "机壳", "壳"]
+
+
+@pytest.mark.parametrize("q, name", [
+    ("áo dài", "Áo dài lụa"),
+    ("ao dai", "Áo dài lụa"),
+    ("đà nẵng", "Nón lá Đà Nẵng"),
+    ("手机", "苹果手机壳"),
+    ("壳", "苹果手机壳"),
+    ("чайник", "Чайник электрический"),
+])
+def test_search_non_ascii_query(client, products, q, name):
+    response = client.get("/products/", params={"q": q})
+    assert response.status_code == 200
+    assert [product["id"] for product in response.json()] == [products[name]]
@@ -0,0 +1,73 @@
+import random
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+from sqlalchemy import func, insert, select
+from sqlalchemy.exc import IntegrityError
+
+from backend_api.crud import shipping_address as crud_addresses
+from backend_api.database import SessionLocal
+from backend_api.models import ShippingAddress, User
+from backend_api.schemas import ShippingAddressCreate, ShippingAddressUpdate
+
+
+@pytest.fixture
+def user(db):
+    db.execute(insert(User), [{"uid": "buyer", "provider": "email", "identifier": "buyer@example.com"}])
+    db.commit()
+    return "buyer"
+
+
+def test_database_rejects_a_second_default(db, user):
+    # Enforced by the unique index on the generated default_user_uid column,
+    # which works on MySQL too
+    rows = [{"user_uid": user, "address": address, "address_hash": address, "is_default": True}
+            for address in ("1 Test Street", "2 Test Street")]
+    db.execute(insert(ShippingAddress), rows[:1])
+    with pytest.raises(IntegrityError):
+        db.execute(insert(ShippingAddress), rows[1:])
+    db.rollback()
+
+
+def test_switching_the_default(db, user):
+    crud_addresses.create_shipping_address(db, ShippingAddressCreate(address="1 Test Street"), user)
+    second = crud_addresses.create_shipping_address(
+        db, ShippingAddressCreate(address="2 Test Street", is_default=False), user)
+    crud_addresses.update_shipping_address(db, second.id, ShippingAddressUpdate(is_default=True), user)
+    defaults = db.execute(
+        select(ShippingAddress.id, ShippingAddress.default_user_uid).where(ShippingAddress.is_default == True)
+    ).all()
+    assert defaults == [(second.id, user)]
+
+
+def test_concurrent_default_writes_keep_one_default(db):
+    uids = [f"buyer-{i}" for i in range(4)]
+    db.execute(insert(User), [{"uid": uid, "provider": "email", "identifier": f"{uid}@example.com"}
+                              for uid in uids])
+    db.commit()
+    rng = random.Random(7)
+    operations = [(uid, n) for uid in uids for n in range(3)]
+    operations += [(rng.choice(uids), rng.randrange(6)) for _ in range(150)]
+
+    def write(operation):
+        uid, n = operation
+        with SessionLocal() as session:
+            address = f"{n} Test Street"
+            existing = session.scalar(select(ShippingAddress.id).where(
+                ShippingAddress.user_uid == uid, ShippingAddress.address == address))
+            session.rollback()
+            if existing is None:
+                crud_addresses.create_shipping_address(
+                    session, ShippingAddressCreate(address=address, is_default=n % 2 == 0), uid)
+            else:
+                crud_addresses.update_shipping_address(
+                    session, existing, ShippingAddressUpdate(is_default=True), uid)
+
+    with ThreadPoolExecutor(max_workers=8) as pool:
+        list(pool.map(write, operations))
+
+    defaults = dict(db.execute(
+        select(ShippingAddress.user_uid, func.count().filter(ShippingAddress.is_default == True))
+        .group_by(ShippingAddress.user_uid)
+    ).all())
+    assert defaults == {uid: 1 for uid in uids}
@@ -0,0 +1,26 @@
+# ----------------------------------------
+# Shipping address normalization (duplicate detection)
+# ----------------------------------------
+import hashlib
+import re
+import unicodedata
+from typing import Optional
+
+_SEPARATORS_RE = re.compile(r"[\W_]+")
+
+
+def normalize_address(address: Optional[str]) -> str:
+    """
+    Case, whitespace and punctuation folded: "12 Main St., Apt #4" and
+    "12 main st apt 4" normalize the same. Accents are kept, since they
+    tell streets apart (Vietnamese addresses in particular).
+    """
+    if not address:
+        return ""
+    address = unicodedata.normalize("NFKC", address).casefold()
+    return _SEPARATORS_RE.sub(" ", address).strip()
+
+
+def address_hash(address: Optional[str]) -> str:
+    """SHA-256 hex digest (64 characters) of the normalized address, stored in shipping_address.address_hash"""
+    return hashlib.sha256(normalize_address(address).encode("utf-8")).hexdigest()
@@ -1,12 +1,102 @@
 # ----------------------------------------
-# Password Hashing Utility -- havent used yet
+# Password Hashing Utility
 # ----------------------------------------
+# Passwords are hashed with scrypt and stored as
+#
+#   scrypt$<n>$<r>$<p>$<salt b64>$<hash b64>
+#
+# Older rows hold a salted SHA-256 hex digest; they still verify and are
+# re-hashed with scrypt on the next successful login (verify_password
+# reports needs_rehash). Cost parameters come from the environment:
+#
+#   PASSWORD_SCRYPT_N (16384)  CPU / memory cost (power of two)
+#   PASSWORD_SCRYPT_R (8)      block size; memory per hash is about 128 * n * r bytes
+#   PASSWORD_SCRYPT_P (1)      parallelism
+#   PASSWORD_HASH_WORKERS      threads hashing at the same time, per process
+#                              (default: CPU count, at most 4)
+#
+# Hashing takes tens of milliseconds, so the async endpoints use the *_async
+# functions, which run it in a bounded thread pool (hashlib.scrypt releases
+# the GIL) instead of on the event loop.
+import asyncio
+import base64
 import hashlib
+import hmac
 import os
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+from typing import Tuple
+
 from dotenv import load_dotenv
 
 load_dotenv()
+
+PASSWORD_SCRYPT_N = int(os.getenv("PASSWORD_SCRYPT_N", "16384"))
+PASSWORD_SCRYPT_R = int(os.getenv("PASSWORD_SCRYPT_R", "8"))
+PASSWORD_SCRYPT_P = int(os.getenv("PASSWORD_SCRYPT_P", "1"))
+PASSWORD_HASH_WORKERS = int(os.getenv("PASSWORD_HASH_WORKERS", str(min(4, os.cpu_count() or 1))))
+
+_SCHEME = "scrypt"
+_SALT_BYTES = 16
+_KEY_BYTES = 32
+
+_executor = ThreadPoolExecutor(max_workers=PASSWORD_HASH_WORKERS, thread_name_prefix="password-hash")
+
+
+def _b64(data: bytes) -> str:
+    return base64.b64encode(data).decode("ascii")
+
+
+def _scrypt(password: str, salt: bytes, n: int, r: int, p: int) -> bytes:
+    # maxmem: OpenSSL's 32 MiB default is too small for larger n / r
+    return hashlib.scrypt(
+        password.encode("utf-8"), salt=salt, n=n, r=r, p=p, dklen=_KEY_BYTES, maxmem=256 * n * r * p + (1 << 20)
+    )
+
+
+def _legacy_hash(password: str) -> str:
+    """The previous format: SHA-256 of password + PASSWORD_SALT"""
+    salt = os.getenv("PASSWORD_SALT", "default_salt")
+    return hashlib.sha256((password + salt).encode()).hexdigest()
+
+
 def hash_password(password: str) -> str:
-    """Generate SHA-256 hash of the password with salt"""
-    salt = os.getenv("PASSWORD_SALT", "default_salt")  # Always use a salt
-    return hashlib.sha256((password + salt).encode()).hexdigest()
\ No newline at end of file
+    """scrypt hash of the password with a random salt and the configured cost"""
+    salt = os.urandom(_SALT_BYTES)
+    key = _scrypt(password, salt, PASSWORD_SCRYPT_N, PASSWORD_SCRYPT_R, PASSWORD_SCRYPT_P)
+    return f"{_SCHEME}${PASSWORD_SCRYPT_N}${PASSWORD_SCRYPT_R}${PASSWORD_SCRYPT_P}${_b64(salt)}${_b64(key)}"
+
+
+def verify_password(password: str, stored_hash: str) -> Tuple[bool, bool]:
+    """
+    (valid, needs_rehash). needs_rehash is True for a valid password whose
+    hash is in the legacy format or uses other cost parameters.
+    """
+    if not stored_hash:
+        return False, False
+    if not stored_hash.startswith(_SCHEME + "$"):
+        valid = hmac.compare_digest(_legacy_hash(password).encode(), stored_hash.encode())
+        return valid, valid
+
+    try:
+        _, n, r, p, salt, key = stored_hash.split("$")
+        n, r, p = int(n), int(r), int(p)
+        expected = base64.b64decode(key)
+        actual = _scrypt(password, base64.b64decode(salt), n, r, p)
+    except (ValueError, TypeError):
+        return False, False
+    valid = hmac.compare_digest(actual, expected)
+    outdated = (n, r, p) != (PASSWORD_SCRYPT_N, PASSWORD_SCRYPT_R, PASSWORD_SCRYPT_P)
+    return valid, valid and outdated
+
+
+async def _run(fn, *args):
+    return await asyncio.get_running_loop().run_in_executor(_executor, partial(fn, *args))
+
+
+async def hash_password_async(password: str) -> str:
+    return await _run(hash_password, password)
+
+
+async def verify_password_async(password: str, stored_hash: str) -> Tuple[bool, bool]:
+    return await _run(verify_password, password, stored_hash)
@@ -0,0 +1,140 @@
+# ----------------------------------------
+# Bounded in-process caches (LRU + TTL)
+# ----------------------------------------
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Hashable
+
+from dotenv import load_dotenv
+
+load_dotenv()
+
+# Returned by get() when a key is not cached, so None can be cached as a value
+MISSING = object()
+
+
+class _Entry:
+    __slots__ = ("value", "expires_at")
+
+    def __init__(self, value: Any, expires_at: float):
+        self.value = value
+        self.expires_at = expires_at
+
+
+class LRUTTLCache:
+    """
+    Thread-safe cache holding at most maxsize entries, each for at most ttl seconds.
+    The least recently used entry is evicted when the cache is full.
+    """
+    enabled = True
+
+    def __init__(self, maxsize: int = 10000, ttl: float = 60.0):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._data: "OrderedDict[Hashable, _Entry]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._generation = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+        self.invalidations = 0
+
+    def get(self, key: Hashable) -> Any:
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None:
+                self.misses += 1
+                return MISSING
+            if entry.expires_at <= time.monotonic():
+                del self._data[key]
+                self.expirations += 1
+                self.misses += 1
+                return MISSING
+            self._data.move_to_end(key)
+            self.hits += 1
+            return entry.value
+
+    def generation(self) -> int:
+        """Token to take before loading a value from the database, see set()"""
+        return self._generation
+
+    def set(self, key: Hashable, value: Any, generation: int = None, ttl: float = None):
+        """
+        Store value. If generation is given and an invalidation happened since it
+        was taken, the value may be stale and is not stored.
+        """
+        with self._lock:
+            if generation is not None and generation != self._generation:
+                return
+            self._data[key] = _Entry(value, time.monotonic() + (self.ttl if ttl is None else ttl))
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+                self.evictions += 1
+
+    def invalidate(self, key: Hashable):
+        with self._lock:
+            self._generation += 1
+            self.invalidations += 1
+            self._data.pop(key, None)
+
+    def clear(self):
+        with self._lock:
+            self._generation += 1
+            self._data.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "enabled": True,
+                "size": len(self._data),
+                "maxsize": self.maxsize,
+                "ttl": self.ttl,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+                "evictions": self.evictions,
+                "expirations": self.expirations,
+                "invalidations": self.invalidations,
+            }
+
+
+class NullCache:
+    """Drop-in replacement used when a cache is switched off"""
+    enabled = False
+
+    def get(self, key: Hashable) -> Any:
+        return MISSING
+
+    def generation(self) -> int:
+        return 0
+
+    def set(self, key: Hashable, value: Any, generation: int = None, ttl: float = None):
+        pass
+
+    def invalidate(self, key: Hashable):
+        pass
+
+    def clear(self):
+        pass
+
+    def stats(self) -> Dict[str, Any]:
+        return {"enabled": False}
+
+
+def make_cache(prefix: str, maxsize: int, ttl: float):
+    """
+    Build a cache configured from the environment:
+    <prefix>_ENABLED (true/false), <prefix>_MAXSIZE and <prefix>_TTL (seconds).
+    """
+    enabled = os.getenv(f"{prefix}_ENABLED", "true").lower() in ("1", "true", "yes", "on")
+    if not enabled:
+        return NullCache()
+    return LRUTTLCache(
+        maxsize=int(os.getenv(f"{prefix}_MAXSIZE", maxsize)),
+        ttl=float(os.getenv(f"{prefix}_TTL", ttl)),
+    )
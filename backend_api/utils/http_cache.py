@@ -0,0 +1,68 @@
+# ----------------------------------------
+# Conditional GET (ETag / Last-Modified)
+# ----------------------------------------
+# Endpoints compute a validator from a cheap query (max(id) / max(updated_at)
+# probes, or row counts of small tables) before running the full query. When
+# the client already holds the current representation it gets a bodyless
+# 304 and the full query and serialization are skipped.
+import hashlib
+from datetime import datetime, timezone
+from email.utils import format_datetime, parsedate_to_datetime
+from typing import Any, Dict, Optional
+
+from fastapi import Request, Response
+
+
+def _as_utc(value: datetime) -> datetime:
+    # updated_at columns are stored naive in local time (datetime.now());
+    # astimezone reads naive values as local time
+    return value.astimezone(timezone.utc)
+
+
+class Validator:
+    """Strong ETag and Last-Modified for one representation of a resource"""
+
+    def __init__(self, request: Request, *state: Any, last_modified: Optional[datetime] = None):
+        # The path and query string are part of the hash, so every page,
+        # filter and sort of a list has its own ETag
+        digest = hashlib.sha1(repr((request.url.path, request.url.query, state)).encode("utf-8")).hexdigest()
+        self.etag = f'"{digest}"'
+        # Last-Modified has whole-second resolution, so it is only sent once
+        # the second of the last change is over. Sent earlier, a change later
+        # in that second would carry the same date, and a client validating
+        # with If-Modified-Since alone would get a 304 for stale data.
+        self.last_modified = None
+        if last_modified is not None:
+            now = datetime.now(last_modified.tzinfo)
+            if last_modified.replace(microsecond=0) < now.replace(microsecond=0):
+                self.last_modified = _as_utc(last_modified).replace(microsecond=0)
+
+    def headers(self) -> Dict[str, str]:
+        headers = {"ETag": self.etag, "Cache-Control": "no-cache"}
+        if self.last_modified is not None:
+            headers["Last-Modified"] = format_datetime(self.last_modified, usegmt=True)
+        return headers
+
+    def matches(self, request: Request) -> bool:
+        """
+        True when the client's copy is current. The ETag is compared first;
+        If-Modified-Since is only used without If-None-Match, and only when
+        a Last-Modified could be sent (see __init__).
+        """
+        if_none_match = request.headers.get("if-none-match")
+        if if_none_match is not None:
+            tags = [tag.strip() for tag in if_none_match.split(",")]
+            # GET uses the weak comparison, so a W/ prefix added by a proxy still matches
+            return "*" in tags or self.etag in (tag[2:] if tag.startswith("W/") else tag for tag in tags)
+
+        if_modified_since = request.headers.get("if-modified-since")
+        if if_modified_since is None or self.last_modified is None:
+            return False
+        try:
+            since = _as_utc(parsedate_to_datetime(if_modified_since))
+        except (TypeError, ValueError):
+            return False
+        return self.last_modified <= since
+
+    def not_modified(self) -> Response:
+        return Response(status_code=304, headers=self.headers())
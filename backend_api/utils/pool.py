@@ -0,0 +1,138 @@
+# ----------------------------------------
+# Connection pool settings and metrics
+# ----------------------------------------
+# Pool sizing comes from the environment so it can be tuned per deployment
+# (and per worker count) without code changes:
+#
+#   DB_POOL_SIZE (5)         connections kept open per engine
+#   DB_MAX_OVERFLOW (10)     extra connections opened under burst load
+#   DB_POOL_TIMEOUT (30)     seconds to wait for a free connection
+#   DB_POOL_RECYCLE (1800)   seconds before a connection is replaced; keep it
+#                            below the server / proxy idle timeout
+#   DB_POOL_PRE_PING (true)  test connections on checkout, so ones dropped
+#                            while idle are replaced instead of failing a request
+#
+# Each engine gets a pool subclass that times how long checkouts wait for a
+# connection; pool events count connects, checkouts and invalidations.
+import os
+import threading
+import time
+from typing import Any, Dict, Type
+
+from dotenv import load_dotenv
+from sqlalchemy import event, exc
+from sqlalchemy.engine import URL, Engine
+from sqlalchemy.pool import AsyncAdaptedQueuePool, Pool, QueuePool
+
+load_dotenv()
+
+DB_POOL_SIZE = int(os.getenv("DB_POOL_SIZE", "5"))
+DB_MAX_OVERFLOW = int(os.getenv("DB_MAX_OVERFLOW", "10"))
+DB_POOL_TIMEOUT = float(os.getenv("DB_POOL_TIMEOUT", "30"))
+DB_POOL_RECYCLE = int(os.getenv("DB_POOL_RECYCLE", "1800"))
+DB_POOL_PRE_PING = os.getenv("DB_POOL_PRE_PING", "true").lower() in ("1", "true", "yes", "on")
+
+# Checkouts waiting at least this long (seconds) are counted as slow
+_SLOW_WAIT = 0.1
+
+
+class PoolMetrics:
+    """Counters for one engine's pool; read with stats()"""
+
+    def __init__(self, name: str):
+        self.name = name
+        self.pool: Pool = None
+        self._lock = threading.Lock()
+        self.connects = 0
+        self.checkouts = 0
+        self.invalidations = 0
+        self.timeouts = 0
+        self.slow_waits = 0
+        self.wait_total = 0.0
+        self.wait_max = 0.0
+
+    def record_wait(self, seconds: float, timed_out: bool = False):
+        with self._lock:
+            self.wait_total += seconds
+            self.wait_max = max(self.wait_max, seconds)
+            if seconds >= _SLOW_WAIT:
+                self.slow_waits += 1
+            if timed_out:
+                self.timeouts += 1
+
+    def _on_connect(self, dbapi_connection, connection_record):
+        with self._lock:
+            self.connects += 1
+
+    def _on_checkout(self, dbapi_connection, connection_record, connection_proxy):
+        with self._lock:
+            self.checkouts += 1
+
+    def _on_invalidate(self, dbapi_connection, connection_record, exception):
+        with self._lock:
+            self.invalidations += 1
+
+    def attach(self, engine: Engine):
+        self.pool = engine.pool
+        # Listening on the engine keeps the listeners when dispose() recreates the pool
+        event.listen(engine, "connect", self._on_connect)
+        event.listen(engine, "checkout", self._on_checkout)
+        event.listen(engine, "invalidate", self._on_invalidate)
+        event.listen(engine, "engine_disposed", lambda e: setattr(self, "pool", e.pool))
+
+    def stats(self) -> Dict[str, Any]:
+        pool = self.pool
+        with self._lock:
+            stats = {
+                "pool": type(pool).__name__ if pool is not None else None,
+                "connects": self.connects,
+                "checkouts": self.checkouts,
+                "invalidations": self.invalidations,
+                "timeouts": self.timeouts,
+                "slow_waits": self.slow_waits,
+                "wait_avg_ms": round(self.wait_total / self.checkouts * 1000, 3) if self.checkouts else 0.0,
+                "wait_max_ms": round(self.wait_max * 1000, 3),
+            }
+        if isinstance(pool, QueuePool):
+            stats.update(
+                size=pool.size(),
+                max_overflow=pool._max_overflow,
+                checked_in=pool.checkedin(),
+                checked_out=pool.checkedout(),
+                # Negative while the pool is still below size
+                overflow=pool.overflow(),
+            )
+        return stats
+
+
+def _timed_pool(base: Type[QueuePool], metrics: PoolMetrics) -> Type[QueuePool]:
+    """Subclass of base that reports how long each checkout waited for a connection"""
+
+    class TimedPool(base):
+        def _do_get(self):
+            start = time.perf_counter()
+            try:
+                connection = super()._do_get()
+            except exc.TimeoutError:
+                metrics.record_wait(time.perf_counter() - start, timed_out=True)
+                raise
+            metrics.record_wait(time.perf_counter() - start)
+            return connection
+
+    TimedPool.__name__ = f"Timed{base.__name__}"
+    return TimedPool
+
+
+def pool_options(url: URL, metrics: PoolMetrics, is_async: bool = False) -> Dict[str, Any]:
+    """create_engine / create_async_engine keyword arguments for the configured pool"""
+    if url.get_backend_name() == "sqlite" and url.database in (None, "", ":memory:"):
+        # In-memory SQLite lives in a single connection; keep SQLAlchemy's default pool
+        return {}
+    return {
+        "poolclass": _timed_pool(AsyncAdaptedQueuePool if is_async else QueuePool, metrics),
+        "pool_size": DB_POOL_SIZE,
+        "max_overflow": DB_MAX_OVERFLOW,
+        "pool_timeout": DB_POOL_TIMEOUT,
+        "pool_recycle": DB_POOL_RECYCLE,
+        "pool_pre_ping": DB_POOL_PRE_PING,
+    }
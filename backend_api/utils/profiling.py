@@ -0,0 +1,187 @@
+# ----------------------------------------
+# Per-request SQL profiling and latency metrics
+# ----------------------------------------
+# Cursor execute hooks on every engine add each statement's count and time to
+# the profile of the request being served (a context variable set by the
+# profile_requests middleware). Per request this gives the statement count,
+# total DB time and the slowest statement:
+#
+#   DEBUG (false)                     add them as a Server-Timing header
+#   SQL_STATEMENT_LOG_THRESHOLD (20)  log requests issuing more statements (0: off)
+#
+# Request latency is also kept per route as histograms and served in the
+# Prometheus text format on /metrics (per worker process).
+import contextvars
+import logging
+import os
+import re
+import threading
+import time
+from typing import Dict, List, Optional, Tuple
+
+from dotenv import load_dotenv
+from fastapi import Request
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+load_dotenv()
+
+logger = logging.getLogger(__name__)
+
+DEBUG = os.getenv("DEBUG", "false").lower() in ("1", "true", "yes", "on")
+SQL_STATEMENT_LOG_THRESHOLD = int(os.getenv("SQL_STATEMENT_LOG_THRESHOLD", "20"))
+
+# Latency histogram buckets (seconds)
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+
+class RequestProfile:
+    __slots__ = ("statements", "db_time", "slowest_time", "slowest_statement")
+
+    def __init__(self):
+        self.statements = 0
+        self.db_time = 0.0
+        self.slowest_time = 0.0
+        self.slowest_statement: Optional[str] = None
+
+    def record(self, statement: str, seconds: float):
+        self.statements += 1
+        self.db_time += seconds
+        if seconds > self.slowest_time:
+            self.slowest_time = seconds
+            self.slowest_statement = statement
+
+
+_current_profile: contextvars.ContextVar[Optional[RequestProfile]] = contextvars.ContextVar(
+    "current_profile", default=None
+)
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault("profile_start", []).append(time.perf_counter())
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    start = conn.info["profile_start"].pop()
+    profile = _current_profile.get()
+    if profile is not None:
+        profile.record(statement, time.perf_counter() - start)
+
+def _handle_error(exception_context):
+    # The statement failed, so after_cursor_execute won't pop its start time
+    starts = exception_context.connection.info.get("profile_start") if exception_context.connection else None
+    if starts:
+        starts.pop()
+
+def profile_engine(engine: Engine):
+    """Count and time the statements of this (sync) engine; use async_engine.sync_engine for async ones"""
+    event.listen(engine, "before_cursor_execute", _before_cursor_execute)
+    event.listen(engine, "after_cursor_execute", _after_cursor_execute)
+    event.listen(engine, "handle_error", _handle_error)
+
+
+class _Histogram:
+    __slots__ = ("buckets", "count", "sum")
+
+    def __init__(self):
+        self.buckets = [0] * len(LATENCY_BUCKETS)
+        self.count = 0
+        self.sum = 0.0
+
+
+class RequestMetrics:
+    """Per-route request latency histograms plus DB statement / time totals"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._latency: Dict[Tuple[str, str], _Histogram] = {}
+        self._statements: Dict[Tuple[str, str], int] = {}
+        self._db_time: Dict[Tuple[str, str], float] = {}
+
+    def observe(self, method: str, route: str, seconds: float, profile: RequestProfile):
+        key = (method, route)
+        with self._lock:
+            histogram = self._latency.get(key)
+            if histogram is None:
+                histogram = self._latency[key] = _Histogram()
+            for i, bound in enumerate(LATENCY_BUCKETS):
+                if seconds <= bound:
+                    histogram.buckets[i] += 1
+            histogram.count += 1
+            histogram.sum += seconds
+            self._statements[key] = self._statements.get(key, 0) + profile.statements
+            self._db_time[key] = self._db_time.get(key, 0.0) + profile.db_time
+
+    def render(self) -> str:
+        """Prometheus text exposition format (version 0.0.4)"""
+        lines: List[str] = [
+            "# HELP http_request_duration_seconds Request latency by route",
+            "# TYPE http_request_duration_seconds histogram",
+        ]
+        with self._lock:
+            for (method, route), histogram in sorted(self._latency.items()):
+                labels = f'method="{method}",route="{_label(route)}"'
+                for bound, count in zip(LATENCY_BUCKETS, histogram.buckets):
+                    lines.append(f'http_request_duration_seconds_bucket{{{labels},le="{bound}"}} {count}')
+                lines.append(f'http_request_duration_seconds_bucket{{{labels},le="+Inf"}} {histogram.count}')
+                lines.append(f"http_request_duration_seconds_sum{{{labels}}} {histogram.sum:.6f}")
+                lines.append(f"http_request_duration_seconds_count{{{labels}}} {histogram.count}")
+            lines += [
+                "# HELP http_request_db_statements_total SQL statements issued by requests, by route",
+                "# TYPE http_request_db_statements_total counter",
+            ]
+            for (method, route), count in sorted(self._statements.items()):
+                lines.append(f'http_request_db_statements_total{{method="{method}",route="{_label(route)}"}} {count}')
+            lines += [
+                "# HELP http_request_db_seconds_total Time spent executing SQL by requests, by route",
+                "# TYPE http_request_db_seconds_total counter",
+            ]
+            for (method, route), seconds in sorted(self._db_time.items()):
+                lines.append(f'http_request_db_seconds_total{{method="{method}",route="{_label(route)}"}} {seconds:.6f}')
+        return "\n".join(lines) + "\n"
+
+
+def _label(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+request_metrics = RequestMetrics()
+
+
+def _server_timing(profile: RequestProfile, total: float) -> str:
+    parts = [
+        f'db;dur={profile.db_time * 1000:.2f};desc="{profile.statements} statements"',
+        f"total;dur={total * 1000:.2f}",
+    ]
+    if profile.slowest_statement is not None:
+        # Header values must be one line of latin-1 without double quotes
+        statement = re.sub(r"\s+", " ", profile.slowest_statement).replace('"', "'")[:120]
+        statement = statement.encode("latin-1", "replace").decode("latin-1")
+        parts.append(f'db-slowest;dur={profile.slowest_time * 1000:.2f};desc="{statement}"')
+    return ", ".join(parts)
+
+
+async def profile_requests(request: Request, call_next):
+    """HTTP middleware: profile the request's SQL and record its latency under its route template"""
+    profile = RequestProfile()
+    token = _current_profile.set(profile)
+    start = time.perf_counter()
+    try:
+        response = await call_next(request)
+    finally:
+        _current_profile.reset(token)
+    elapsed = time.perf_counter() - start
+
+    # The route template (e.g. /products/{product_id}) keeps the label set bounded
+    route = request.scope.get("route")
+    route_path = getattr(route, "path", None) or "unmatched"
+    request_metrics.observe(request.method, route_path, elapsed, profile)
+
+    if SQL_STATEMENT_LOG_THRESHOLD and profile.statements > SQL_STATEMENT_LOG_THRESHOLD:
+        logger.warning(
+            "%s %s issued %d SQL statements (threshold %d) in %.1f ms, %.1f ms in the database",
+            request.method, request.url.path, profile.statements, SQL_STATEMENT_LOG_THRESHOLD,
+            elapsed * 1000, profile.db_time * 1000,
+        )
+    if DEBUG:
+        response.headers["Server-Timing"] = _server_timing(profile, elapsed)
+    return response
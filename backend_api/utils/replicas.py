@@ -0,0 +1,107 @@
+# ----------------------------------------
+# Read replicas
+# ----------------------------------------
+# GET endpoints that only read the catalog take their session from
+# get_read_db (database.py), which spreads them over the engines in
+# DATABASE_REPLICA_URLS round-robin:
+#
+#   DATABASE_REPLICA_URLS     comma separated replica URLs (empty: primary only)
+#   REPLICA_STICKY_SECONDS    after a client's write, its reads stay on the primary
+#                             this long, so it reads its own writes (default 5)
+#   REPLICA_RETRY_SECONDS     a replica that failed to connect is skipped this long (default 30)
+#
+# Read-your-writes is tracked per client: successful writes answer with an
+# X-Read-Primary-Until header (and a cookie, for browsers), and reads carrying
+# it back stay on the primary until then (pin_primary_after_writes
+# middleware). The Flutter client echoes the header, since package:http keeps
+# no cookies. When every replica is down the primary serves the read.
+import itertools
+import os
+import threading
+import time
+from typing import Any, Dict, List
+
+from dotenv import load_dotenv
+from fastapi import Request
+from sqlalchemy.ext.asyncio import async_sessionmaker
+
+load_dotenv()
+
+DATABASE_REPLICA_URLS = [url.strip() for url in os.getenv("DATABASE_REPLICA_URLS", "").split(",") if url.strip()]
+REPLICA_STICKY_SECONDS = float(os.getenv("REPLICA_STICKY_SECONDS", "5"))
+REPLICA_RETRY_SECONDS = float(os.getenv("REPLICA_RETRY_SECONDS", "30"))
+
+PIN_COOKIE = "db_read_primary"
+PIN_HEADER = "X-Read-Primary-Until"
+_SAFE_METHODS = ("GET", "HEAD", "OPTIONS")
+
+
+class Replica:
+    def __init__(self, name: str, sessionmaker: async_sessionmaker):
+        self.name = name
+        self.sessionmaker = sessionmaker
+        self.down_until = 0.0
+        self.failures = 0
+        self.sessions = 0
+
+
+class ReplicaSet:
+    """Round-robin over the replicas that are not marked down"""
+
+    def __init__(self, replicas: List[Replica], retry_seconds: float = REPLICA_RETRY_SECONDS):
+        self.replicas = replicas
+        self.retry_seconds = retry_seconds
+        self._counter = itertools.count()
+        self._lock = threading.Lock()
+        self.primary_fallbacks = 0
+        self.pinned_reads = 0
+
+    def __bool__(self) -> bool:
+        return bool(self.replicas)
+
+    def candidates(self) -> List[Replica]:
+        """Healthy replicas, starting with the next one in turn"""
+        now = time.monotonic()
+        start = next(self._counter)
+        count = len(self.replicas)
+        ordered = [self.replicas[(start + i) % count] for i in range(count)]
+        return [replica for replica in ordered if replica.down_until <= now]
+
+    def mark_down(self, replica: Replica):
+        with self._lock:
+            replica.failures += 1
+            replica.down_until = time.monotonic() + self.retry_seconds
+
+    def pinned(self, request: Request) -> bool:
+        """True while the client is inside the sticky window after its own write"""
+        until = request.headers.get(PIN_HEADER) or request.cookies.get(PIN_COOKIE)
+        try:
+            return until is not None and float(until) > time.time()
+        except ValueError:
+            return False
+
+    def stats(self) -> Dict[str, Any]:
+        now = time.monotonic()
+        return {
+            "replicas": [
+                {
+                    "name": replica.name,
+                    "up": replica.down_until <= now,
+                    "sessions": replica.sessions,
+                    "failures": replica.failures,
+                }
+                for replica in self.replicas
+            ],
+            "pinned_reads": self.pinned_reads,
+            "primary_fallbacks": self.primary_fallbacks,
+        }
+
+
+async def pin_primary_after_writes(request: Request, call_next):
+    """HTTP middleware: after a successful write, keep the client's reads on the primary for a while"""
+    response = await call_next(request)
+    if request.method not in _SAFE_METHODS and response.status_code < 400:
+        until = f"{time.time() + REPLICA_STICKY_SECONDS:.3f}"
+        response.headers[PIN_HEADER] = until
+        response.set_cookie(PIN_COOKIE, until, max_age=int(REPLICA_STICKY_SECONDS) + 1, httponly=True)
+    return response
@@ -0,0 +1,236 @@
+# ----------------------------------------
+# In-process product search index
+# ----------------------------------------
+import bisect
+import math
+import os
+import re
+import threading
+import time
+import unicodedata
+from collections import Counter
+from typing import Any, Dict, FrozenSet, Iterable, List, Optional
+
+from dotenv import load_dotenv
+from sqlalchemy.orm import Session
+
+from ..models import Product, ProductCategory
+
+load_dotenv()
+
+# Seconds before the index is rebuilt from the database, so workers pick up
+# changes made by other processes. 0 disables periodic rebuilds.
+SEARCH_INDEX_MAX_AGE = float(os.getenv("SEARCH_INDEX_MAX_AGE", "300"))
+
+# Han and kana are written without spaces between words: their runs are split
+# into bigrams instead of being indexed as one word
+_CJK = "\u3040-\u30ff\u3400-\u4dbf\u4e00-\u9fff\uf900-\ufaff"
+_TOKEN_RE = re.compile(rf"(?P<cjk>[{_CJK}]+)|(?P<word>[^\W_{_CJK}]+)")
+_FOLD = str.maketrans({"đ": "d"})  # Vietnamese đ has no decomposition to strip
+_NAME_WEIGHT = 2  # a hit in the product name counts twice as much as one in the description
+_MAX_PREFIX_EXPANSION = 200
+
+
+def tokenize(text: Optional[str]) -> List[str]:
+    """
+    Casefold, strip accents and split text into words of any script. A run of
+    Chinese / Japanese characters gives its overlapping bigrams and its last
+    character, so with prefix matching any part of it can be searched.
+    """
+    if not text:
+        return []
+    text = unicodedata.normalize("NFKD", text.casefold())
+    text = "".join(c for c in text if not unicodedata.combining(c))
+    # NFC recomposes what the marks were stripped from (Hangul syllables)
+    text = unicodedata.normalize("NFC", text).translate(_FOLD)
+    tokens = []
+    for match in _TOKEN_RE.finditer(text):
+        run = match.group()
+        if match.lastgroup == "cjk":
+            tokens.extend(run[i:i + 2] for i in range(len(run) - 1))
+            tokens.append(run[-1])
+        else:
+            tokens.append(run)
+    return tokens
+
+
+class ProductSearchIndex:
+    """
+    Tokenized inverted index over product name and description, ranked with BM25.
+    Only active products are indexed; category membership is kept alongside
+    so category filtering does not need the database.
+    """
+
+    def __init__(self, k1: float = 1.2, b: float = 0.75, max_age: float = SEARCH_INDEX_MAX_AGE):
+        self.k1 = k1
+        self.b = b
+        self.max_age = max_age
+        self._lock = threading.RLock()
+        self._reset()
+        self._built_at: Optional[float] = None
+        self._version: Any = None
+
+    def _reset(self):
+        self._postings: Dict[str, Dict[int, int]] = {}
+        self._doc_terms: Dict[int, Counter] = {}
+        self._doc_len: Dict[int, int] = {}
+        self._doc_categories: Dict[int, FrozenSet[int]] = {}
+        self._total_len = 0
+        self._sorted_terms: Optional[List[str]] = None
+
+    # --- building ---
+
+    def is_stale(self) -> bool:
+        if self._built_at is None:
+            return True
+        return bool(self.max_age) and time.monotonic() - self._built_at > self.max_age
+
+    def invalidate(self):
+        """Force a full rebuild on the next search"""
+        self._built_at = None
+
+    def ensure_built(self, db: Session, version: Any = None):
+        """
+        Rebuild when stale. version is the catalog validator the results will
+        be served under: the index is rebuilt when it was built under another
+        one (e.g. a write through another worker), so results match their ETag.
+        """
+        if self.is_stale() or (version is not None and version != self._version):
+            self.rebuild(db, version)
+
+    def rebuild(self, db: Session, version: Any = None):
+        products = (
+            db.query(Product.id, Product.name, Product.description)
+            .filter(Product.is_active == True)
+            .all()
+        )
+        links = db.query(ProductCategory.product_id, ProductCategory.category_id).all()
+        categories: Dict[int, set] = {}
+        for product_id, category_id in links:
+            categories.setdefault(product_id, set()).add(category_id)
+
+        with self._lock:
+            self._reset()
+            for product_id, name, description in products:
+                self._add(product_id, name, description, categories.get(product_id, ()))
+            self._built_at = time.monotonic()
+            self._version = version
+
+    # --- incremental updates ---
+
+    def index_product(
+        self,
+        product_id: int,
+        name: Optional[str],
+        description: Optional[str],
+        category_ids: Optional[Iterable[int]] = None,
+        is_active: bool = True,
+    ):
+        """Add or replace a product. category_ids=None keeps the currently indexed categories."""
+        with self._lock:
+            if category_ids is None:
+                category_ids = self._doc_categories.get(product_id, ())
+            self._remove(product_id)
+            if is_active:
+                self._add(product_id, name, description, category_ids)
+
+    def remove_product(self, product_id: int):
+        with self._lock:
+            self._remove(product_id)
+
+    def _add(self, product_id: int, name: Optional[str], description: Optional[str], category_ids: Iterable[int]):
+        terms = Counter()
+        for token in tokenize(name):
+            terms[token] += _NAME_WEIGHT
+        for token in tokenize(description):
+            terms[token] += 1
+
+        for term, tf in terms.items():
+            if term not in self._postings:
+                self._postings[term] = {}
+                self._sorted_terms = None
+            self._postings[term][product_id] = tf
+
+        length = sum(terms.values())
+        self._doc_terms[product_id] = terms
+        self._doc_len[product_id] = length
+        self._doc_categories[product_id] = frozenset(category_ids)
+        self._total_len += length
+
+    def _remove(self, product_id: int):
+        terms = self._doc_terms.pop(product_id, None)
+        if terms is None:
+            return
+        for term in terms:
+            postings = self._postings[term]
+            postings.pop(product_id, None)
+            if not postings:
+                del self._postings[term]
+                self._sorted_terms = None
+        self._total_len -= self._doc_len.pop(product_id)
+        self._doc_categories.pop(product_id, None)
+
+    # --- querying ---
+
+    def _expand(self, token: str) -> List[str]:
+        """Terms that start with token, so partially typed words still match"""
+        if self._sorted_terms is None:
+            self._sorted_terms = sorted(self._postings)
+        terms = self._sorted_terms
+        start = bisect.bisect_left(terms, token)
+        matches = []
+        for term in terms[start:start + _MAX_PREFIX_EXPANSION]:
+            if not term.startswith(token):
+                break
+            matches.append(term)
+        return matches
+
+    def search(self, q: str, category_id: Optional[int] = None) -> List[int]:
+        """
+        Return the ids of products matching every query token (prefix match),
+        best BM25 score first.
+        """
+        tokens = list(dict.fromkeys(tokenize(q)))
+        if not tokens:
+            return []
+
+        with self._lock:
+            doc_count = len(self._doc_len)
+            if not doc_count:
+                return []
+            avg_len = self._total_len / doc_count or 1.0
+
+            scores: Optional[Dict[int, float]] = None
+            for token in tokens:
+                token_scores: Dict[int, float] = {}
+                for term in self._expand(token):
+                    postings = self._postings[term]
+                    idf = math.log(1 + (doc_count - len(postings) + 0.5) / (len(postings) + 0.5))
+                    for product_id, tf in postings.items():
+                        norm = self.k1 * (1 - self.b + self.b * self._doc_len[product_id] / avg_len)
+                        score = idf * tf * (self.k1 + 1) / (tf + norm)
+                        if score > token_scores.get(product_id, 0.0):
+                            token_scores[product_id] = score
+
+                if scores is None:
+                    scores = token_scores
+                else:
+                    scores = {
+                        product_id: score + token_scores[product_id]
+                        for product_id, score in scores.items()
+                        if product_id in token_scores
+                    }
+                if not scores:
+                    return []
+
+            if category_id:
+                scores = {
+                    product_id: score
+                    for product_id, score in scores.items()
+                    if category_id in self._doc_categories[product_id]
+                }
+
+        return sorted(scores, key=lambda product_id: (-scores[product_id], product_id))
+
+
+product_search = ProductSearchIndex()
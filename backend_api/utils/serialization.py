@@ -0,0 +1,140 @@
+# ----------------------------------------
+# Fast JSON serialization for product and order responses
+# ----------------------------------------
+# Endpoints build plain dicts straight from ORM rows and return them as an
+# already-encoded JSONBytesResponse. FastAPI skips response_model validation
+# for Response objects, so each row is converted exactly once. The dict
+# layouts below must stay in sync with ProductResponse / OrderResponse in
+# schemas.py, which still document the endpoints in OpenAPI.
+import json
+from datetime import date, datetime
+from decimal import Decimal
+from typing import Any, Dict, Iterable, List, Optional
+
+from fastapi import Response
+
+try:
+    import orjson
+except ImportError:  # orjson is optional; fall back to the stdlib encoder
+    orjson = None
+
+
+def _default(value: Any):
+    if isinstance(value, Decimal):
+        return float(value)
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+
+def dumps(content: Any) -> bytes:
+    if orjson is not None:
+        return orjson.dumps(content, default=_default)
+    return json.dumps(content, default=_default, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+
+class JSONBytesResponse(Response):
+    """JSON response that accepts plain dicts/lists or bytes that are already encoded"""
+    media_type = "application/json"
+
+    def render(self, content: Any) -> bytes:
+        if isinstance(content, (bytes, bytearray, memoryview)):
+            return bytes(content)
+        return dumps(content)
+
+
+def _number(value: Optional[Decimal]) -> Optional[float]:
+    return float(value) if value is not None else None
+
+
+def category_to_dict(category) -> Dict[str, Any]:
+    """Same layout as CategoryResponse"""
+    return {
+        "name": category.name,
+        "description": category.description,
+        "is_active": category.is_active,
+        "id": category.id,
+        "created_at": category.created_at,
+        "updated_at": category.updated_at,
+    }
+
+
+def product_to_dict(product, categories: Iterable = ()) -> Dict[str, Any]:
+    """Same layout as ProductResponse"""
+    return {
+        "name": product.name,
+        "description": product.description,
+        "image_url": product.image_url,
+        "price": _number(product.price),
+        "sold_count": product.sold_count,
+        "rating": _number(product.rating),
+        "review_count": product.review_count,
+        "delivery_info": product.delivery_info,
+        "seller_info": product.seller_info,
+        "stock_quantity": product.stock_quantity,
+        "is_active": product.is_active,
+        "id": product.id,
+        "categories": [category_to_dict(category) for category in categories],
+        "created_at": product.created_at,
+        "updated_at": product.updated_at,
+    }
+
+
+def shipping_address_to_dict(address) -> Dict[str, Any]:
+    """Same layout as ShippingAddressResponse"""
+    return {
+        "address": address.address,
+        "is_default": address.is_default,
+        "id": address.id,
+        "user_uid": address.user_uid,
+        "created_at": address.created_at,
+        "updated_at": address.updated_at,
+    }
+
+
+def order_item_to_dict(item) -> Dict[str, Any]:
+    """Same layout as OrderItemResponse"""
+    return {
+        "product_id": item.product_id,
+        "quantity": item.quantity,
+        "price_per_unit": _number(item.price_per_unit),
+        "id": item.id,
+        "created_at": item.created_at,
+    }
+
+
+def order_to_dict(order) -> Dict[str, Any]:
+    """Same layout as OrderResponse"""
+    address = order.shipping_address_obj
+    return {
+        "user_uid": order.user_uid,
+        "status": order.status,
+        "shipping_address_id": order.shipping_address_id,
+        "billing_method": order.billing_method,
+        "contact_phone": order.contact_phone,
+        "id": order.id,
+        "total_amount": _number(order.total_amount),
+        "created_at": order.created_at,
+        "updated_at": order.updated_at,
+        "items": [order_item_to_dict(item) for item in order.items],
+        "shipping_address_obj": shipping_address_to_dict(address) if address is not None else None,
+    }
+
+
+def products_response(products: List, categories_by_product: Dict[int, List], headers: Optional[Dict[str, str]] = None) -> JSONBytesResponse:
+    return JSONBytesResponse(
+        [product_to_dict(product, categories_by_product.get(product.id, ())) for product in products],
+        headers=headers,
+    )
+
+
+def product_response(product, categories: Iterable = (), headers: Optional[Dict[str, str]] = None) -> JSONBytesResponse:
+    return JSONBytesResponse(product_to_dict(product, categories), headers=headers)
+
+
+def orders_response(orders: List, headers: Optional[Dict[str, str]] = None) -> JSONBytesResponse:
+    return JSONBytesResponse([order_to_dict(order) for order in orders], headers=headers)
+
+
+def order_response(order, headers: Optional[Dict[str, str]] = None) -> JSONBytesResponse:
+    return JSONBytesResponse(order_to_dict(order), headers=headers)
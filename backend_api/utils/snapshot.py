@@ -0,0 +1,192 @@
+# ----------------------------------------
+# Pre-rendered catalog snapshot
+# ----------------------------------------
+# The whole active catalog (categories, and products with their categories
+# embedded in the ProductResponse layout) rendered to one JSON file:
+#
+#   {"version": ..., "generated_at": ..., "categories": [...], "products": [...]}
+#
+# Each product is kept as an encoded JSON fragment, so after a write only the
+# changed products are queried and re-encoded; the file is then re-assembled
+# from the fragments. Files are named after a hash of their content, written
+# atomically and served from a read-only mmap.
+import hashlib
+import mmap
+import os
+import tempfile
+import threading
+import time
+from datetime import datetime
+from typing import Dict, Iterable, List, Optional, Set
+
+from dotenv import load_dotenv
+from sqlalchemy.orm import Session
+
+from ..models import Category, Product, ProductCategory
+from .serialization import category_to_dict, dumps, product_to_dict
+
+load_dotenv()
+
+CATALOG_SNAPSHOT_DIR = os.getenv("CATALOG_SNAPSHOT_DIR", os.path.join(tempfile.gettempdir(), "umet_catalog_snapshot"))
+# Seconds before a full rebuild, so workers pick up writes made by other processes. 0 disables it.
+CATALOG_SNAPSHOT_MAX_AGE = float(os.getenv("CATALOG_SNAPSHOT_MAX_AGE", "300"))
+# Writes are folded into the next rebuild at most this often (seconds)
+CATALOG_SNAPSHOT_MIN_INTERVAL = float(os.getenv("CATALOG_SNAPSHOT_MIN_INTERVAL", "5"))
+
+_QUERY_CHUNK = 1000
+
+
+class SnapshotFile:
+    """One immutable snapshot file mapped read-only into memory"""
+
+    def __init__(self, path: str, version: str, generated_at: datetime):
+        self.path = path
+        self.version = version
+        self.generated_at = generated_at
+        with open(path, "rb") as f:
+            self._mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        self.size = len(self._mmap)
+
+    def chunks(self, chunk_size: int = 256 * 1024) -> Iterable[memoryview]:
+        view = memoryview(self._mmap)
+        for start in range(0, self.size, chunk_size):
+            yield view[start:start + chunk_size]
+
+
+class CatalogSnapshot:
+
+    def __init__(
+        self,
+        directory: str = CATALOG_SNAPSHOT_DIR,
+        max_age: float = CATALOG_SNAPSHOT_MAX_AGE,
+        min_interval: float = CATALOG_SNAPSHOT_MIN_INTERVAL,
+    ):
+        self.directory = directory
+        self.max_age = max_age
+        self.min_interval = min_interval
+        self._lock = threading.Lock()
+        self._fragments: Dict[int, bytes] = {}
+        self._categories = b"[]"
+        self._dirty: Set[int] = set()
+        self._categories_dirty = False
+        self._full = True
+        self._built_at: Optional[float] = None
+        self._file: Optional[SnapshotFile] = None
+
+    # --- change tracking ---
+
+    def mark_product(self, product_id: int):
+        """Re-render this product on the next build"""
+        self._dirty.add(product_id)
+
+    def mark_categories(self):
+        """Category rows changed; re-render the category list and every product"""
+        self._categories_dirty = True
+        self._full = True
+
+    def invalidate(self):
+        self._full = True
+
+    # --- building ---
+
+    def _needs_build(self) -> bool:
+        if self._file is None or self._full or self._built_at is None:
+            return True
+        age = time.monotonic() - self._built_at
+        if self.max_age and age > self.max_age:
+            return True
+        return bool(self._dirty or self._categories_dirty) and age >= self.min_interval
+
+    def current(self, db: Session) -> SnapshotFile:
+        """The up-to-date snapshot, rebuilding it first when needed"""
+        if self._needs_build():
+            with self._lock:
+                if self._needs_build():
+                    self._build(db)
+        return self._file
+
+    def _render_products(self, db: Session, product_ids: Optional[List[int]]) -> Dict[int, Optional[bytes]]:
+        """Encoded fragments of the given products (all active ones when None); None for inactive or missing"""
+        query = db.query(Product).filter(Product.is_active == True)
+        if product_ids is None:
+            products = query.order_by(Product.id).all()
+            rendered: Dict[int, Optional[bytes]] = {}
+        else:
+            products = []
+            for start in range(0, len(product_ids), _QUERY_CHUNK):
+                products.extend(query.filter(Product.id.in_(product_ids[start:start + _QUERY_CHUNK])).all())
+            rendered = {product_id: None for product_id in product_ids}
+
+        for start in range(0, len(products), _QUERY_CHUNK):
+            chunk = products[start:start + _QUERY_CHUNK]
+            categories: Dict[int, List[Category]] = {product.id: [] for product in chunk}
+            rows = (
+                db.query(ProductCategory.product_id, Category)
+                .join(Category, Category.id == ProductCategory.category_id)
+                .filter(ProductCategory.product_id.in_(list(categories)), Category.is_active == True)
+                .order_by(ProductCategory.product_id, ProductCategory.id)
+            )
+            for product_id, category in rows:
+                categories[product_id].append(category)
+            for product in chunk:
+                rendered[product.id] = dumps(product_to_dict(product, categories[product.id]))
+        return rendered
+
+    def _build(self, db: Session):
+        max_age_reached = (
+            self._built_at is not None and bool(self.max_age)
+            and time.monotonic() - self._built_at > self.max_age
+        )
+        full = self._full or self._file is None or max_age_reached
+        # Take the pending changes before querying, so writes that land
+        # during the build are picked up by the next one
+        dirty, self._dirty = self._dirty, set()
+        self._full = self._categories_dirty = False
+
+        if full:
+            categories = db.query(Category).filter(Category.is_active == True).order_by(Category.id).all()
+            self._categories = dumps([category_to_dict(category) for category in categories])
+            self._fragments = self._render_products(db, None)
+        elif dirty:
+            for product_id, fragment in self._render_products(db, sorted(dirty)).items():
+                if fragment is None:
+                    self._fragments.pop(product_id, None)
+                else:
+                    self._fragments[product_id] = fragment
+
+        products = b"[" + b",".join(self._fragments[product_id] for product_id in sorted(self._fragments)) + b"]"
+        digest = hashlib.sha256(self._categories)
+        digest.update(products)
+        version = digest.hexdigest()[:20]
+        generated_at = datetime.now()
+
+        if self._file is None or self._file.version != version:
+            self._file = self._write(version, generated_at, products)
+        self._built_at = time.monotonic()
+
+    def _write(self, version: str, generated_at: datetime, products: bytes) -> SnapshotFile:
+        os.makedirs(self.directory, exist_ok=True)
+        path = os.path.join(self.directory, f"catalog-{version}.json")
+        if not os.path.exists(path):
+            header = dumps({"version": version, "generated_at": generated_at})[:-1]
+            fd, tmp_path = tempfile.mkstemp(dir=self.directory, suffix=".tmp")
+            with os.fdopen(fd, "wb") as f:
+                f.write(header)
+                f.write(b',"categories":')
+                f.write(self._categories)
+                f.write(b',"products":')
+                f.write(products)
+                f.write(b"}")
+            os.replace(tmp_path, path)
+        previous = self._file
+        snapshot = SnapshotFile(path, version, generated_at)
+        if previous is not None and previous.path != path:
+            # Open maps stay readable after unlink, so in-flight responses finish
+            try:
+                os.remove(previous.path)
+            except OSError:
+                pass
+        return snapshot
+
+
+catalog_snapshot = CatalogSnapshot()
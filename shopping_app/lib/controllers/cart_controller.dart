@@ -309,19 +309,15 @@ class CartController extends ChangeNotifier {
       _cartItemsWithDetails.clear();
       notifyListeners(); // Notify UI that cart is now empty
 
-      // Add each item from the old order to the user's current cart
-      for (var item in orderToReorder.items) {
-        // Use the existing addItemToCart method in CartController
-        // This will call _cartService.addItemToCart and then loadCart()
-        await addItemToCart(item.productId, quantity: item.quantity);
-        // Note: addItemToCart already calls notifyListeners() via loadCart()
-        // If you want more granular updates or a single update after all adds,
-        // you might modify addItemToCart not to call loadCart() directly and do it once here.
-        // For simplicity, we'll let it refresh on each add.
-      }
+      // Add every item of the old order to the current cart in one request
+      await _cartService.batchUpdateCart(
+        user!.uid,
+        orderToReorder.items
+            .map((item) => {'product_id': item.productId, 'quantity': item.quantity, 'op': 'add'})
+            .toList(),
+      );
       // After all items are added, ensure the cart is fully loaded for the UI
       await loadCart();
-      _error = null; // Clear any temporary error from addItemToCart if it was caught.
       debugPrint('Successfully added items for reorder. Cart loaded.');
     } catch (e, stacktrace) {
       _error = 'Failed to reorder items: $e';
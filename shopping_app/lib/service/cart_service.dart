@@ -1,16 +1,17 @@
 // lib/services/auth_service.dart
 import 'dart:convert';
-import 'package:http/http.dart' as http;
+import '../utils/api_client.dart';
 
 import '../models/order.dart';
 import '../utils/constants.dart';
+import '../utils/http_cache.dart';
 
 class CartService {
 
   //retrieve the current cart
   Future<Order?> getUserCart(String userUid) async {
     try {
-      final response = await http.get(
+      final response = await cachedGet(
         Uri.parse('$apiBaseUrl/users/$userUid/cart/'),
         headers: {
           'Content-Type': 'application/json',
@@ -38,7 +39,7 @@ class CartService {
       int limit = 100,
     }) async {
     try {
-      final response = await http.get(
+      final response = await apiClient.get(
         Uri.parse(
           '$apiBaseUrl/users/$userUid/orders/?skip=$skip&limit=$limit'),
         headers: {
@@ -63,7 +64,7 @@ class CartService {
     {int quantity = 1
   }) async {
     try {
-      final response = await http.post(
+      final response = await apiClient.post(
         Uri.parse('$apiBaseUrl/users/$userUid/cart/items/?product_id=$productId&quantity=$quantity'),
         headers: {
           'Content-Type': 'application/json',
@@ -76,9 +77,35 @@ class CartService {
     }
   }
 
+  // Several cart changes in one request. Each operation is
+  // {'product_id': id, 'quantity': n, 'op': 'add' | 'set' | 'remove'}.
+  Future<Order> batchUpdateCart(
+    String userUid,
+    List<Map<String, dynamic>> operations,
+  ) async {
+    try {
+      final response = await apiClient.post(
+        Uri.parse('$apiBaseUrl/users/$userUid/cart/items:batch'),
+        headers: {
+          'Content-Type': 'application/json',
+        },
+        body: jsonEncode(operations),
+      );
+
+      if (response.statusCode == 200) {
+        final Map<String, dynamic> data = json.decode(response.body);
+        return Order.fromJson(data, userUid);
+      } else {
+        throw Exception('Failed to update cart: ${response.statusCode} - ${response.body}');
+      }
+    } catch (e) {
+      throw Exception('Network error: $e');
+    }
+  }
+
   Future<bool> removeOrderItem(int itemId) async {
     try {
-      final response = await http.delete(
+      final response = await apiClient.delete(
         Uri.parse('$apiBaseUrl/order-items/$itemId'),
         headers: {
           'Content-Type': 'application/json',
@@ -98,7 +125,7 @@ class CartService {
     String userUid,
     ) async {
     try {
-      final response = await http.put(
+      final response = await apiClient.put(
         Uri.parse('$apiBaseUrl/orders/$orderId'),
         headers: {
           'Content-Type': 'application/json',
@@ -125,7 +152,7 @@ class CartService {
     int status,
     ) async {
     try {
-      final response = await http.put(
+      final response = await apiClient.put(
         Uri.parse('$apiBaseUrl/orders/$orderId/status/$status'),
         headers: {
           'Content-Type': 'application/json',
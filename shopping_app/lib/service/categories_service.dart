@@ -1,8 +1,9 @@
 // lib/services/product_service.dart
 import 'dart:convert';
-import 'package:http/http.dart' as http;
+import '../utils/api_client.dart';
 import 'package:shopping_app/models/category.dart';
 import '../utils/constants.dart';
+import '../utils/http_cache.dart';
 
 
 //need postAPI to check the api need
@@ -15,7 +16,7 @@ class CategoriesService {
     int limit = 10,
   }) async {
     try {
-      final response = await http.get(
+      final response = await cachedGet(
         Uri.parse('$apiBaseUrl/categories/?skip=$skip&limit=$limit'),
         headers: {'Content-Type': 'application/json'},
       );
@@ -35,7 +36,7 @@ class CategoriesService {
 
   Future<Category> getCategoryByID(int categoryId) async {
     try {
-      final response = await http.get(
+      final response = await apiClient.get(
         Uri.parse('$apiBaseUrl/categories/$categoryId'),
         headers: {'Content-Type': 'application/json'},
       );
@@ -65,7 +66,7 @@ class CategoriesService {
         'is_active': isActive,
       };
 
-      final response = await http.post(
+      final response = await apiClient.post(
         Uri.parse('$apiBaseUrl/categories/'),
         headers: {'Content-Type': 'application/json'},
         body: json.encode(payload),
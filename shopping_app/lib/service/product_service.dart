@@ -1,8 +1,9 @@
 // lib/services/product_service.dart
 import 'dart:convert';
-import 'package:http/http.dart' as http;
+import 'package:shopping_app/models/category.dart';
 import 'package:shopping_app/models/product.dart';
 import '../utils/constants.dart';
+import '../utils/http_cache.dart';
 
 //need postAPI to check the api need
 
@@ -15,6 +16,24 @@ class ProductService {
     int limit = 100,
     int? categoryId,
     String? query,
+  }) async {
+    final page = await getProductPage(
+      skip: skip,
+      limit: limit,
+      categoryId: categoryId,
+      query: query,
+    );
+    return page.products;
+  }
+
+  // For infinite scroll: pass the nextCursor of the previous page as cursor.
+  // nextCursor is null on the last page.
+  Future<({List<Product> products, String? nextCursor})> getProductPage({
+    int skip = 0,
+    int limit = 100,
+    int? categoryId,
+    String? query,
+    String? cursor,
   }) async {
     try {
       String url = '$_apiBaseUrl/?skip=$skip&limit=$limit';
@@ -23,14 +42,20 @@ class ProductService {
       if(query != null && query.isNotEmpty) {
         url += '&q=${Uri.encodeComponent(query)}';
       }
-      final response = await http.get(
+      if(cursor != null) {
+        url += '&cursor=${Uri.encodeComponent(cursor)}';
+      }
+      final response = await cachedGet(
         Uri.parse(url),
         headers: {'Content-Type': 'application/json'},
       );
 
       if(response.statusCode == 200) {
         final List<dynamic> data = json.decode(response.body);
-        return data.map((product) => Product.fromJson(product)).toList();
+        return (
+          products: data.map((product) => Product.fromJson(product)).toList(),
+          nextCursor: response.headers['x-next-cursor'],
+        );
       } else {
         throw Exception('Failed to load products: ${response.body}');
       }
@@ -46,7 +71,7 @@ class ProductService {
     ) async {
     try {
 
-      final response = await http.get(
+      final response = await cachedGet(
         Uri.parse('$_apiBaseUrl/$productId'),
         headers: {'Content-Type': 'application/json'},
       );
@@ -65,4 +90,31 @@ class ProductService {
     }
   }
 
-}
\ No newline at end of file
+  // Whole active catalog in one request, for a cold start.
+  // Repeated calls are answered with 304 while the catalog is unchanged.
+  static Future<({List<Category> categories, List<Product> products})> getCatalogSnapshot() async {
+    try {
+      final response = await cachedGet(
+        Uri.parse('$apiBaseUrl/catalog/snapshot'),
+        headers: {'Content-Type': 'application/json'},
+      );
+
+      if(response.statusCode == 200) {
+        final Map<String, dynamic> data = json.decode(response.body);
+        final List<dynamic> categories = data['categories'];
+        final List<dynamic> products = data['products'];
+        return (
+          categories: categories.map((category) => Category.fromJson(category)).toList(),
+          products: products.map((product) => Product.fromJson(product)).toList(),
+        );
+      } else {
+        throw Exception('Failed to load catalog: ${response.body}');
+      }
+    }
+    catch (e) {
+      print('Error fetching catalog: $e');
+      rethrow;
+    }
+  }
+
+}
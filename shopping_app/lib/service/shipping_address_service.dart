@@ -1,5 +1,5 @@
 import 'dart:convert';
-import 'package:http/http.dart' as http;
+import '../utils/api_client.dart';
 
 import '../models/shipping_address.dart'; 
 import '../utils/constants.dart';
@@ -23,7 +23,7 @@ class ShippingAddressService {
     required ShippingAddressCreate addressData,
   }) async {
     try {
-      final response = await http.post(
+      final response = await apiClient.post(
         Uri.parse('$apiBaseUrl/user/$userUid/addresses/'),
         headers: _getHeaders(),
         body: jsonEncode(addressData.toJson()),
@@ -51,7 +51,7 @@ class ShippingAddressService {
     required String userUid,
   }) async {
     try {
-      final response = await http.get(
+      final response = await apiClient.get(
         Uri.parse('$apiBaseUrl/user/$userUid/addresses/'),
         headers: _getHeaders(),
       );
@@ -75,7 +75,7 @@ class ShippingAddressService {
     required String addressId,
   }) async {
     try {
-      final response = await http.get(
+      final response = await apiClient.get(
         Uri.parse('$apiBaseUrl/addresses/$addressId'),
         headers: _getHeaders(),
       );
@@ -104,8 +104,8 @@ class ShippingAddressService {
   }) async {
     try {
       // Assuming your backend uses PUT for full replacement, not PATCH for partial update
-      // If it's PATCH, change http.put to http.patch
-      final response = await http.put(
+      // If it's PATCH, change apiClient.put to apiClient.patch
+      final response = await apiClient.put(
         Uri.parse('$apiBaseUrl/user/$userUid/addresses/$addressId'),
         headers: _getHeaders(),
         body: jsonEncode(addressUpdateData.toJson()),
@@ -135,7 +135,7 @@ class ShippingAddressService {
     required int addressId,
   }) async {
     try {
-      final response = await http.delete(
+      final response = await apiClient.delete(
         Uri.parse('$apiBaseUrl/user/$userUid/addresses/$addressId'),
         headers: _getHeaders(),
       );
@@ -1,6 +1,6 @@
 // lib/services/auth_service.dart
 import 'dart:convert';
-import 'package:http/http.dart' as http;
+import '../utils/api_client.dart';
 import 'package:firebase_auth/firebase_auth.dart';
 import 'package:google_sign_in/google_sign_in.dart';
 import 'package:shopping_app/models/user.dart';
@@ -54,7 +54,7 @@ class AuthService {
       };
 
       // print('Sending payload: $payload');
-      final response = await http.post(
+      final response = await apiClient.post(
         Uri.parse('$apiBaseUrl/users/'),
         headers: {
           'Content-Type': 'application/json',
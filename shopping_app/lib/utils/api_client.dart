@@ -0,0 +1,29 @@
+// lib/utils/api_client.dart
+import 'package:http/http.dart' as http;
+
+// Shared HTTP client of the services. After a write the backend answers with
+// X-Read-Primary-Until; sending it back keeps this app's reads on the primary
+// database until then, so it sees its own writes even when reads go to
+// replicas. package:http keeps no cookies, so the header is echoed instead.
+const String _readPrimaryHeader = 'x-read-primary-until';
+
+class _ApiClient extends http.BaseClient {
+  final http.Client _inner = http.Client();
+  String? _readPrimaryUntil;
+
+  @override
+  Future<http.StreamedResponse> send(http.BaseRequest request) async {
+    final readPrimaryUntil = _readPrimaryUntil;
+    if (readPrimaryUntil != null) {
+      request.headers[_readPrimaryHeader] = readPrimaryUntil;
+    }
+    final response = await _inner.send(request);
+    final until = response.headers[_readPrimaryHeader];
+    if (until != null) {
+      _readPrimaryUntil = until;
+    }
+    return response;
+  }
+}
+
+final http.Client apiClient = _ApiClient();
@@ -0,0 +1,38 @@
+// lib/utils/http_cache.dart
+import 'package:http/http.dart' as http;
+import 'api_client.dart';
+
+// In-memory conditional GET: remembers the ETag and body of each URL and
+// sends If-None-Match on the next request. A 304 from the backend is turned
+// back into a 200 with the cached body, so callers do not change.
+class _CachedResponse {
+  final String etag;
+  final http.Response response;
+
+  _CachedResponse(this.etag, this.response);
+}
+
+final Map<String, _CachedResponse> _responses = {};
+
+Future<http.Response> cachedGet(Uri url, {Map<String, String>? headers}) async {
+  final key = url.toString();
+  final cached = _responses[key];
+  final response = await apiClient.get(
+    url,
+    headers: {
+      ...?headers,
+      if (cached != null) 'If-None-Match': cached.etag,
+    },
+  );
+
+  if (response.statusCode == 304 && cached != null) {
+    return cached.response;
+  }
+  final etag = response.headers['etag'];
+  if (response.statusCode == 200 && etag != null) {
+    _responses[key] = _CachedResponse(etag, response);
+  } else {
+    _responses.remove(key);
+  }
+  return response;
+}